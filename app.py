@@ -14,14 +14,22 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.decomposition import PCA
-from scipy import stats
+from sklearn.linear_model import LinearRegression
+from scipy import stats, sparse
 import os
 import warnings
+from live_store import LIVE_RING_PATH, LIVE_SOCKET_PATH, LiveSubscriber, RingBufferReader, live_feed_available
 warnings.filterwarnings('ignore')
 
+# Copy-on-Write lets every session slice the shared dataset without copying it
+# (always on from pandas 3.0)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
 # Detect if running on Streamlit Cloud (no Docker/live data available)
 IS_STREAMLIT_CLOUD = os.environ.get('STREAMLIT_SHARING_MODE') or not os.path.exists('/app/data')
 
@@ -265,6 +273,39 @@ st.markdown("""
         display: none !important;
     }
     
+    /* Section router (radio rendered as a tab bar) */
+    .st-key-active_tab [role="radiogroup"] {
+        gap: 6px;
+        background: var(--bg-card);
+        padding: 8px 12px;
+        border-radius: 16px;
+        border: 1px solid var(--border-color);
+        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.2);
+        flex-wrap: nowrap !important;
+        overflow-x: auto;
+    }
+    
+    .st-key-active_tab [role="radiogroup"] > label {
+        padding: 10px 18px !important;
+        border-radius: 12px !important;
+        white-space: nowrap;
+        transition: all 0.3s ease !important;
+    }
+    
+    .st-key-active_tab [role="radiogroup"] > label > div:first-child {
+        display: none;
+    }
+    
+    .st-key-active_tab [role="radiogroup"] > label:hover {
+        background: rgba(0, 212, 170, 0.1) !important;
+    }
+    
+    .st-key-active_tab [role="radiogroup"] > label:has(input:checked) {
+        background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%) !important;
+        box-shadow: 0 4px 15px rgba(0, 212, 170, 0.4) !important;
+        font-weight: 600 !important;
+    }
+    
     /* ═══════════════════════════════════════════════════════════════════════
        SIDEBAR PREMIUM STYLING
     ═══════════════════════════════════════════════════════════════════════ */
@@ -618,10 +659,84 @@ st.markdown("""
 # DATA LOADING & PREPROCESSING
 # ============================================================================
 import os
+import sys
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
 
-@st.cache_data
-def load_data():
-    """Load and preprocess the WHOOP fitness data."""
+# Columnar snapshot of the fully preprocessed frame, reused across restarts
+SNAPSHOT_DIR = os.environ.get(
+    'WHOOP_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.snapshot')
+)
+SNAPSHOT_VERSION = 4  # Bump whenever preprocess_data() changes its output
+
+# Compact in-memory schema: categoricals for low-cardinality labels, the
+# narrowest integer type that holds each count's range, and float32 for
+# continuous metrics that are only charted. Metrics behind the sidebar range
+# filters, KPIs and the metric cube stay float64 so they compare and average
+# exactly as read from the CSV.
+COMPACT_SCHEMA = {
+    # Low-cardinality labels
+    'user_id': 'category',
+    'gender': 'category',
+    'fitness_level': 'category',
+    'primary_sport': 'category',
+    'activity_type': 'category',
+    'day_of_week': 'category',
+    'workout_time_of_day': 'category',
+    'month_name': 'category',
+    'season': 'category',
+    'year_month': 'category',
+    # Small bounded integers
+    'age': 'int8',
+    'wake_ups': 'int8',
+    'workout_completed': 'int8',
+    'month': 'int8',
+    'week': 'int8',
+    'quarter': 'int8',
+    'time_to_fall_asleep_min': 'int16',
+    'resting_heart_rate': 'int16',
+    'rhr_baseline': 'int16',
+    'activity_duration_min': 'int16',
+    'avg_heart_rate': 'int16',
+    'max_heart_rate': 'int16',
+    'hr_zone_1_min': 'int16',
+    'hr_zone_2_min': 'int16',
+    'hr_zone_3_min': 'int16',
+    'hr_zone_4_min': 'int16',
+    'hr_zone_5_min': 'int16',
+    'activity_calories': 'int32',
+    'calories_burned': 'int32',
+    # Filtered / KPI metrics (full precision)
+    'recovery_score': 'float64',
+    'day_strain': 'float64',
+    'sleep_hours': 'float64',
+    'sleep_efficiency': 'float64',
+    'hrv': 'float64',
+    # Charted continuous metrics (rounded to float32, about 7 significant digits)
+    'weight_kg': 'float32',
+    'height_cm': 'float32',
+    'sleep_performance': 'float32',
+    'light_sleep_hours': 'float32',
+    'rem_sleep_hours': 'float32',
+    'deep_sleep_hours': 'float32',
+    'hrv_baseline': 'float32',
+    'respiratory_rate': 'float32',
+    'skin_temp_deviation': 'float32',
+    'activity_strain': 'float32',
+    'sleep_quality_index': 'float32',
+    'strain_to_recovery_ratio': 'float32',
+    'workout_intensity': 'float32',
+    'bmi': 'float32',
+}
+
+
+def find_data_file():
+    """Return the first existing location of whoop_fitness.csv, or None."""
     # Check multiple possible paths for compatibility with Docker and Streamlit Cloud
     possible_paths = [
         'whoop_fitness.csv',                    # Current directory (Streamlit Cloud)
@@ -630,18 +745,17 @@ def load_data():
         os.path.join(os.path.dirname(__file__), 'whoop_fitness.csv'),  # Same dir as script
     ]
     
-    df = None
     for path in possible_paths:
         if os.path.exists(path):
-            df = pd.read_csv(path)
-            break
-    
-    if df is None:
-        st.error("❌ Could not find whoop_fitness.csv. Please ensure the data file is in the correct location.")
-        st.stop()
-    
-    # Convert date column
+            return path
+    return None
+
+
+def preprocess_data(df):
+    """Derive the temporal, health and category columns used across the dashboard."""
+    # Convert date column; rows are kept in date order so date ranges are contiguous slices
     df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values('date', kind='stable').reset_index(drop=True)
     
     # Extract temporal features
     df['month'] = df['date'].dt.month
@@ -681,11 +795,1417 @@ def load_data():
     df['recovery_category'] = pd.cut(df['recovery_score'], bins=[0, 33, 66, 100],
                                      labels=['Red (Low)', 'Yellow (Moderate)', 'Green (High)'])
     
+    return apply_compact_schema(df)
+
+
+def _downcast(series, dtype):
+    """Convert a column to ``dtype``.
+    
+    Categories and float64 are lossless. float32 rounds values to single
+    precision, so it is only used for metrics that are charted, never filtered.
+    Integer types are applied only when every value is a whole number in range;
+    otherwise the column keeps its original values.
+    """
+    if dtype == 'category' or dtype.startswith('float'):
+        return series.astype(dtype)
+    
+    values = pd.to_numeric(series, errors='coerce')
+    info = np.iinfo(dtype)
+    if (values.isna().any() or (values % 1 != 0).any()
+            or values.min() < info.min or values.max() > info.max):
+        return series
+    return values.astype(dtype)
+
+
+def apply_compact_schema(df):
+    """Convert columns to COMPACT_SCHEMA dtypes and record the memory saved in df.attrs."""
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    
+    for column, dtype in COMPACT_SCHEMA.items():
+        if column in df.columns:
+            df[column] = _downcast(df[column], dtype)
+    
+    bytes_after = int(df.memory_usage(deep=True).sum())
+    df.attrs['memory_report'] = {
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_saved': bytes_before - bytes_after,
+    }
     return df
 
 
+def file_fingerprint(path, include_hash=True):
+    """Size, mtime and (optionally) SHA-256 of a file, used to validate snapshots."""
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if include_hash:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        fingerprint['sha256'] = digest.hexdigest()
+    return fingerprint
+
+
+def _snapshot_paths(source_path):
+    """Snapshot data and metadata file locations for a given source CSV."""
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    base = os.path.join(SNAPSHOT_DIR, name)
+    return base + '.arrow', base + '.meta.json'
+
+
+def load_snapshot(source_path):
+    """Load the Arrow IPC snapshot if it still matches the source file, else None."""
+    data_path, meta_path = _snapshot_paths(source_path)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('version') != SNAPSHOT_VERSION:
+            return None
+        
+        # Fast path: unchanged size and mtime; otherwise fall back to the content hash
+        current = file_fingerprint(source_path, include_hash=False)
+        if current['size'] != meta['source']['size']:
+            return None
+        if current['mtime_ns'] != meta['source']['mtime_ns']:
+            current = file_fingerprint(source_path)
+            if current['sha256'] != meta['source']['sha256']:
+                return None
+            # Same content, new mtime (e.g. re-copied file): refresh the metadata
+            meta['source'] = current
+            _write_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+        
+        df = pd.read_feather(data_path)
+        df.attrs['memory_report'] = meta.get('memory_report')
+        return df
+    except (OSError, ValueError, KeyError, ImportError):
+        return None
+
+
+def save_snapshot(df, source_path, source):
+    """Persist the preprocessed frame as an Arrow IPC snapshot next to its metadata.
+    
+    ``source`` is the fingerprint of the CSV taken before it was read; if the file
+    has changed since, the frame may come from the old file and no snapshot is saved.
+    """
+    data_path, meta_path = _snapshot_paths(source_path)
+    try:
+        current = file_fingerprint(source_path, include_hash=False)
+        if (current['size'], current['mtime_ns']) != (source['size'], source['mtime_ns']):
+            return
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        meta = {
+            'version': SNAPSHOT_VERSION,
+            'source': source,
+            'memory_report': df.attrs.get('memory_report'),
+        }
+        _write_atomic(data_path, lambda f: df.to_feather(f))
+        _write_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+    except (OSError, ValueError, ImportError):
+        # Read-only filesystem or missing pyarrow: keep serving from the CSV path
+        pass
+
+
+def _write_atomic(path, writer):
+    """Write a file through a temporary sibling and rename it into place."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            writer(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def freeze_frame(df):
+    """Rebuild ``df`` on read-only buffers so one instance can be shared by all sessions."""
+    columns = {}
+    for column in df.columns:
+        values = df[column].array
+        if isinstance(values, pd.Categorical):
+            codes = np.array(values.codes)
+            codes.flags.writeable = False
+            columns[column] = pd.Categorical.from_codes(codes, dtype=values.dtype)
+            continue
+        
+        values = df[column].to_numpy()
+        if values.dtype == object:
+            columns[column] = df[column]
+            continue
+        values = np.array(values)
+        values.flags.writeable = False
+        columns[column] = values
+    
+    frozen = pd.DataFrame(columns, index=df.index, copy=False)
+    frozen.attrs = df.attrs
+    return frozen
+
+
+def select_rows(frame, rows):
+    """Select positional ``rows`` of ``frame``, as a zero-copy slice when they are contiguous."""
+    if len(rows) == 0:
+        return frame.iloc[0:0]
+    start, stop = int(rows[0]), int(rows[-1]) + 1
+    if stop - start == len(rows):
+        return frame.iloc[start:stop]
+    return frame.take(rows)
+
+
+@st.cache_resource
+def load_data():
+    """Load and preprocess the WHOOP fitness data (one read-only copy shared by all sessions)."""
+    path = find_data_file()
+    
+    if path is None:
+        st.error("❌ Could not find whoop_fitness.csv. Please ensure the data file is in the correct location.")
+        st.stop()
+    
+    # Reuse the columnar snapshot when the CSV is unchanged
+    df = load_snapshot(path)
+    if df is None:
+        # Fingerprint first, so a CSV replaced mid-read is never stamped onto the old file's data
+        source = file_fingerprint(path)
+        df = preprocess_data(pd.read_csv(path))
+        save_snapshot(df, path, source)
+    
+    return freeze_frame(df)
+
+
+# ============================================================================
+# FILTER INDEX
+# ============================================================================
+class FilterIndex:
+    """Precomputed row index over the date-sorted dataset for the sidebar filters.
+    
+    Dates become a ``searchsorted`` slice, categorical filters become lookups
+    on integer code arrays, and range filters use presorted value arrays, so a
+    filter costs O(rows in the date range) instead of several full-frame scans.
+    """
+    
+    CATEGORY_COLUMNS = ['gender', 'fitness_level', 'age_group', 'primary_sport', 'season', 'activity_type']
+    RANGE_COLUMNS = ['recovery_score', 'day_strain']
+    
+    def __init__(self, frame, category_columns=None, range_columns=None):
+        self.size = len(frame)
+        self.days = frame['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        if np.any(np.diff(self.days) < 0):
+            raise ValueError("FilterIndex requires rows sorted by date")
+        
+        if 'workout_completed' in frame.columns:
+            self.workouts = frame['workout_completed'].to_numpy() == 1
+        
+        # Integer codes per categorical column; code -1 marks a missing value
+        self.codes = {}
+        self.categories = {}
+        for column in (self.CATEGORY_COLUMNS if category_columns is None else category_columns):
+            values = frame[column].astype('category').array
+            self.codes[column] = np.asarray(values.codes)
+            self.categories[column] = values.categories
+        
+        # Presorted copies of the range columns for selective range lookups
+        self.values = {}
+        self.sorted_values = {}
+        self.sort_order = {}
+        for column in (self.RANGE_COLUMNS if range_columns is None else range_columns):
+            values = frame[column].to_numpy()
+            order = np.argsort(values, kind='stable')
+            self.values[column] = values
+            self.sort_order[column] = order
+            self.sorted_values[column] = values[order]
+    
+    def date_span(self, start_date, end_date):
+        """Positional [start, stop) slice of rows whose date falls within the range."""
+        start = np.datetime64(start_date, 'D').astype(np.int64)
+        end = np.datetime64(end_date, 'D').astype(np.int64)
+        return (int(np.searchsorted(self.days, start, side='left')),
+                int(np.searchsorted(self.days, end, side='right')))
+    
+    def _category_mask(self, column, selected, rows):
+        """Boolean mask over ``rows`` for values of ``column`` in ``selected``, or None if unconstrained."""
+        categories = self.categories[column]
+        codes = self.codes[column][rows]
+        lookup = np.zeros(len(categories) + 1, dtype=bool)  # Last slot catches code -1
+        lookup[categories.get_indexer(list(selected))] = True
+        lookup[-1] = False
+        if lookup[:-1].all() and not (codes == -1).any():
+            return None
+        return lookup[codes]
+    
+    def _typed_bounds(self, column, bounds):
+        """``bounds`` in the dtype of ``column``, so presorted lookups and row comparisons agree.
+        
+        Integer columns round the bounds inward (2.5 <= x  becomes  3 <= x).
+        """
+        low, high = bounds
+        dtype = self.values[column].dtype
+        if np.issubdtype(dtype, np.integer):
+            return np.ceil(low), np.floor(high)
+        return dtype.type(low), dtype.type(high)
+    
+    def _range_bounds(self, column, bounds):
+        """Positions of ``bounds`` within the presorted values of ``column``."""
+        low, high = self._typed_bounds(column, bounds)
+        sorted_values = self.sorted_values[column]
+        return (int(np.searchsorted(sorted_values, low, side='left')),
+                int(np.searchsorted(sorted_values, high, side='right')))
+    
+    def ranges_unconstrained(self, ranges):
+        """True when every range in ``ranges`` includes all rows of the dataset."""
+        return all(self._range_bounds(column, bounds) == (0, self.size)
+                   for column, bounds in ranges.items())
+    
+    def _range_mask(self, column, bounds, start, stop):
+        """Boolean mask over rows [start, stop) for ``bounds`` on ``column``, or None if unconstrained."""
+        low, high = self._typed_bounds(column, bounds)
+        first, last = self._range_bounds(column, bounds)
+        if first == 0 and last == self.size:
+            return None
+        
+        # Narrow ranges: scatter the few matching rows instead of comparing the whole span
+        if (last - first) * 8 < (stop - start):
+            matches = self.sort_order[column][first:last]
+            matches = matches[(matches >= start) & (matches < stop)]
+            mask = np.zeros(stop - start, dtype=bool)
+            mask[matches - start] = True
+            return mask
+        
+        values = self.values[column][start:stop]
+        return (values >= low) & (values <= high)
+    
+    def select(self, date_range, categories=None, ranges=None):
+        """Positional rows matching the date range, category selections and value ranges."""
+        start, stop = self.date_span(*date_range)
+        if stop <= start:
+            return np.arange(0)
+        
+        span = slice(start, stop)
+        mask = None
+        for column, selected in (categories or {}).items():
+            column_mask = self._category_mask(column, selected, span)
+            if column_mask is not None:
+                mask = column_mask if mask is None else mask & column_mask
+        for column, bounds in (ranges or {}).items():
+            column_mask = self._range_mask(column, bounds, start, stop)
+            if column_mask is not None:
+                mask = column_mask if mask is None else mask & column_mask
+        
+        if mask is None:
+            return np.arange(start, stop)
+        return start + np.flatnonzero(mask)
+    
+    def refine(self, rows, categories=None, workouts_only=False):
+        """Subset of ``rows`` matching further category selections (and completed workouts)."""
+        mask = self.workouts[rows] if workouts_only else np.ones(len(rows), dtype=bool)
+        for column, selected in (categories or {}).items():
+            column_mask = self._category_mask(column, selected, rows)
+            if column_mask is not None:
+                mask &= column_mask
+        return rows[mask]
+
+
+@st.cache_resource
+def load_filter_index():
+    """Build the filter index once per process for the shared dataset."""
+    return FilterIndex(load_data())
+
+
+class TopKIndex:
+    """Descending sort orders of selected metrics, built once so top-k under any filter is a presorted walk."""
+    
+    COLUMNS = ['recovery_score', 'hrv', 'activity_calories']
+    
+    def __init__(self, frame, columns=None):
+        self.size = len(frame)
+        position_dtype = np.int32 if self.size < np.iinfo(np.int32).max else np.int64
+        self.orders = {}
+        for column in (self.COLUMNS if columns is None else columns):
+            values = frame[column].to_numpy(dtype=np.float64)
+            # Stable on the negated values: ties keep row order, matching nlargest(keep='first'); NaN sorts last and is cut
+            order = np.argsort(-values, kind='stable')
+            self.orders[column] = order[:np.count_nonzero(~np.isnan(values))].astype(position_dtype)
+    
+    def top(self, column, rows, k):
+        """Positions of the ``k`` largest values of ``column`` among ``rows``, largest first."""
+        order = self.orders[column]
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+            first, stop = rows[0], rows[-1] + 1
+            is_member = lambda block: (block >= first) & (block < stop)
+        else:
+            member = np.zeros(self.size, dtype=bool)
+            member[rows] = True
+            is_member = lambda block: member[block]
+        
+        # Walk the presorted order in growing chunks until k members are found
+        found, count, start, chunk = [], 0, 0, max(4 * k, 4096)
+        while count < k and start < len(order):
+            block = order[start:start + chunk]
+            hits = block[is_member(block)]
+            found.append(hits)
+            count += len(hits)
+            start += chunk
+            chunk *= 2
+        return np.concatenate(found)[:k].astype(np.int64) if found else np.arange(0)
+
+
+@st.cache_resource
+def load_topk_index():
+    """Build the per-metric sort orders once per process for the shared dataset."""
+    return TopKIndex(load_data())
+
+
+# ============================================================================
+# METRIC CUBE
+# ============================================================================
+CUBE_DIMENSIONS = ['gender', 'fitness_level', 'age_group', 'primary_sport', 'season']
+CUBE_METRICS = ['recovery_score', 'day_strain', 'sleep_hours', 'sleep_efficiency', 'hrv', 'workout_completed']
+
+
+class MetricCube:
+    """Daily pre-aggregate of the core metrics per demographic segment.
+    
+    Each cell holds the row count plus per-metric non-null counts, sums and sums
+    of squares for one (date, gender, fitness_level, age_group, primary_sport,
+    season) combination. KPIs, weekly trends and calendar heatmaps are answered
+    by slicing and summing cells, so their cost does not grow with row count.
+    """
+    
+    def __init__(self, frame):
+        values = frame[CUBE_METRICS].astype('float64')
+        parts = [frame[['date'] + CUBE_DIMENSIONS], values,
+                 values.notna().astype('int64').add_suffix('_n'),
+                 (values ** 2).add_suffix('_sq')]
+        cells = pd.concat(parts, axis=1)
+        cells['count'] = 1
+        cells = (cells.groupby(['date'] + CUBE_DIMENSIONS, observed=True, dropna=False)
+                 .sum().reset_index())
+        
+        # Calendar attributes are functions of the date, so they roll up for free
+        cells['week'] = cells['date'].dt.isocalendar().week.astype('int8')
+        cells['month_name'] = cells['date'].dt.month_name().astype('category')
+        cells['day_of_week'] = cells['date'].dt.day_name().astype('category')
+        
+        self.cells = cells
+        self.index = FilterIndex(cells, category_columns=CUBE_DIMENSIONS, range_columns=[])
+    
+    def select(self, date_range, selections):
+        """Positions of the cells matching the date range and dimension selections."""
+        return self.index.select(date_range, categories=selections)
+    
+    @staticmethod
+    def means(cells, keys, metrics):
+        """Per-group means of ``metrics`` over the selected cells."""
+        sums = [m for m in metrics] + [f'{m}_n' for m in metrics]
+        grouped = cells.groupby(keys, observed=True)[sums].sum()
+        return pd.DataFrame({m: grouped[m] / grouped[f'{m}_n'] for m in metrics})
+    
+    @staticmethod
+    def totals(cells):
+        """Row count and overall mean of every metric over the selected cells."""
+        sums = cells[[m for m in CUBE_METRICS] + [f'{m}_n' for m in CUBE_METRICS] + ['count']].sum()
+        result = {'count': int(sums['count'])}
+        for metric in CUBE_METRICS:
+            result[metric] = sums[metric] / sums[f'{metric}_n'] if sums[f'{metric}_n'] else np.nan
+        return result
+
+
+@st.cache_resource
+def load_metric_cube():
+    """Build the metric cube once per process for the shared dataset."""
+    return MetricCube(load_data())
+
+
+# ============================================================================
+# FILTER RESULT CACHE
+# ============================================================================
+FILTER_CACHE_MAX_BYTES = int(os.environ.get('WHOOP_FILTER_CACHE_MB', '256')) * 1024 * 1024
+
+KPI_COLUMNS = ['recovery_score', 'day_strain', 'sleep_hours', 'hrv']
+
+
+def make_filter_key(date_range, selections, ranges):
+    """Canonical, hashable form of the sidebar filter state."""
+    return (
+        tuple(str(d) for d in date_range),
+        tuple(sorted((column, tuple(sorted(map(str, values)))) for column, values in selections.items())),
+        tuple(sorted((column, (float(low), float(high))) for column, (low, high) in ranges.items())),
+    )
+
+
+def _estimate_nbytes(value):
+    """Approximate memory held by a cached value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class FilterResultCache:
+    """Thread-safe LRU of per-filter results, bounded by estimated memory and shared by all sessions."""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        
+        # Compute outside the lock so other sessions are not blocked
+        value = compute()
+        nbytes = _estimate_nbytes(value)
+        with self._lock:
+            if key not in self._entries and nbytes <= self.max_bytes:
+                self._entries[key] = (value, nbytes)
+                self.current_bytes += nbytes
+                while self.current_bytes > self.max_bytes:
+                    _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                    self.current_bytes -= evicted_bytes
+        return value
+    
+    def stats(self):
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+            }
+
+
+@st.cache_resource
+def get_filter_cache():
+    """Process-wide filter result cache."""
+    return FilterResultCache(FILTER_CACHE_MAX_BYTES)
+
+
+def compute_filter_result(frame, index, cube, date_range, selections, activities, ranges):
+    """Row selections, headline KPIs and (when applicable) metric cube cells for one filter state."""
+    rows = index.select(date_range, categories=selections, ranges=ranges)
+    workout_rows = index.refine(rows, categories={'activity_type': activities}, workouts_only=True)
+    
+    # The cube has no recovery/strain dimension, so it only answers unconstrained ranges
+    cube_rows = cube.select(date_range, selections) if index.ranges_unconstrained(ranges) else None
+    
+    kpis = {'records': len(rows), 'workouts': len(workout_rows)}
+    if cube_rows is not None:
+        totals = MetricCube.totals(select_rows(cube.cells, cube_rows))
+        for column in KPI_COLUMNS:
+            kpis[column] = float(totals[column])
+        kpis['workout_rate'] = float(totals['workout_completed']) * 100
+    else:
+        for column in KPI_COLUMNS:
+            kpis[column] = float(frame[column].to_numpy()[rows].mean(dtype=np.float64)) if len(rows) else np.nan
+        kpis['workout_rate'] = float(index.workouts[rows].mean()) * 100 if len(rows) else np.nan
+    user_codes = frame['user_id'].array.codes[rows]
+    kpis['users'] = int(np.count_nonzero(np.bincount(user_codes[user_codes >= 0]))) if len(rows) else 0
+    
+    return {'rows': rows, 'workout_rows': workout_rows, 'kpis': kpis, 'cube_rows': cube_rows}
+
+
+# ============================================================================
+# GOAL OPTIMIZER PROFILES
+# ============================================================================
+OPTIMIZER_TOP_K = 1000
+
+
+def goal_profile(frame, topk, rows, workout_rows, goal):
+    """Summary statistics behind a goal optimizer recommendation for one filter state."""
+    def top(column, candidates):
+        return select_rows(frame, topk.top(column, candidates, OPTIMIZER_TOP_K))
+    
+    if goal == "Maximize Recovery Score":
+        best = top('recovery_score', rows)
+        return best[['sleep_hours', 'day_strain', 'time_to_fall_asleep_min', 'skin_temp_deviation']].mean().to_dict()
+    if goal == "Maximize Calorie Burn":
+        best = top('activity_calories', workout_rows)
+        profile = best[['activity_duration_min', 'avg_heart_rate', 'activity_strain']].mean().to_dict()
+        profile['activity_type'] = best['activity_type'].mode().values[0]
+        return profile
+    if goal == "Optimize HRV":
+        best = top('hrv', rows)
+        return best[['deep_sleep_hours', 'rem_sleep_hours', 'sleep_efficiency', 'respiratory_rate']].mean().to_dict()
+    
+    recovery = frame['recovery_score'].to_numpy()[rows]
+    strain = frame['day_strain'].to_numpy()[rows]
+    balanced = select_rows(frame, rows[(recovery > 60) & (strain > 10)])
+    return {'sleep_hours': balanced['sleep_hours'].mean()}
+
+
+# ============================================================================
+# ACTIVITY AGGREGATION ENGINE
+# ============================================================================
+# Finest grouping any activity chart needs; every chart table is a roll-up of it
+ACTIVITY_GROUP_KEYS = ['fitness_level', 'primary_sport', 'gender', 'age_group',
+                       'workout_time_of_day', 'activity_type']
+ACTIVITY_METRICS = ['activity_calories', 'activity_duration_min', 'activity_strain', 'avg_heart_rate',
+                    'hr_zone_1_min', 'hr_zone_2_min', 'hr_zone_3_min', 'hr_zone_4_min', 'hr_zone_5_min']
+
+
+def build_activity_aggregate(workouts):
+    """Single pass over workout rows: row count, then per-metric non-null count, sum and sum of squares per group."""
+    values = workouts[ACTIVITY_METRICS].astype('float64')
+    squares = (values ** 2).add_suffix('_sq')
+    present = values.notna().astype('int64').add_suffix('_n')
+    frame = pd.concat([workouts[ACTIVITY_GROUP_KEYS], values, squares, present], axis=1)
+    frame['count'] = 1
+    return frame.groupby(ACTIVITY_GROUP_KEYS, observed=True, dropna=False).sum()
+
+
+def rollup_activity(aggregate, keys, sums=(), means=(), stds=()):
+    """Roll the fine-grained aggregate up to ``keys`` and derive sums, means and standard deviations.
+    
+    Like groupby().mean()/std(), means and standard deviations skip missing
+    values: each metric is divided by its own non-null count, not the row count.
+    """
+    grouped = aggregate.groupby(level=keys, observed=True).sum()
+    result = pd.DataFrame({'count': grouped['count']})
+    for metric in sums:
+        result[metric] = grouped[metric]
+    for metric in means:
+        result[f'{metric}_mean'] = grouped[metric] / grouped[f'{metric}_n']
+    for metric in stds:
+        n = grouped[f'{metric}_n']
+        variance = (grouped[f'{metric}_sq'] - grouped[metric] ** 2 / n) / (n - 1).where(n > 1)
+        result[f'{metric}_std'] = np.sqrt(variance.clip(lower=0))
+    return result
+
+
+# ============================================================================
+# DISTRIBUTION SUMMARIES (server-side box & violin statistics)
+# ============================================================================
+MAX_OUTLIER_POINTS = 200  # Outliers shipped per box; extremes are always kept
+KDE_GRID_SIZE = 200
+
+
+def distribution_summary(values):
+    """Quartiles, Tukey whiskers, a bounded outlier subset and a KDE curve for one sample."""
+    values = np.asarray(values, dtype=np.float64)
+    values = np.sort(values[~np.isnan(values)])
+    if len(values) == 0:
+        return None
+    
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    lower_fence, upper_fence = inside[0], inside[-1]
+    outliers = values[(values < lower_fence) | (values > upper_fence)]
+    if len(outliers) > MAX_OUTLIER_POINTS:
+        # Evenly spaced order statistics: deterministic, keeps both extremes
+        picks = np.linspace(0, len(outliers) - 1, MAX_OUTLIER_POINTS).round().astype(int)
+        outliers = outliers[picks]
+    
+    # Gaussian KDE on a binned sample (Silverman bandwidth, as Plotly's violins use)
+    spread = min(values.std(), iqr / 1.349) if iqr > 0 else values.std()
+    bandwidth = max(1.059 * spread * len(values) ** -0.2, 1e-6)
+    edges = np.linspace(values[0] - 2 * bandwidth, values[-1] + 2 * bandwidth, KDE_GRID_SIZE + 1)
+    counts, _ = np.histogram(values, bins=edges)
+    grid = (edges[:-1] + edges[1:]) / 2
+    kernel = np.exp(-0.5 * ((grid[:, None] - grid[None, :]) / bandwidth) ** 2)
+    density = kernel @ counts / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    
+    return {
+        'n': len(values), 'mean': values.mean(),
+        'q1': q1, 'median': median, 'q3': q3,
+        'lowerfence': lower_fence, 'upperfence': upper_fence,
+        'outliers': outliers, 'kde_grid': grid, 'kde_density': density,
+    }
+
+
+def grouped_summaries(frame, value_column, group_column):
+    """distribution_summary() per group label, in sorted label order."""
+    values = frame[value_column].to_numpy()
+    groups = frame[group_column].astype('category').array
+    summaries = {}
+    for code, label in enumerate(groups.categories):
+        summary = distribution_summary(values[groups.codes == code])
+        if summary is not None:
+            summaries[label] = summary
+    return summaries
+
+
+def summary_box_figure(summaries, colors, boxmode='group'):
+    """Box plot from precomputed summaries: ``{trace name: {x category: summary}}``."""
+    fig = go.Figure()
+    for i, (name, by_x) in enumerate(summaries.items()):
+        color = colors[i % len(colors)]
+        x = list(by_x)
+        stats_of = lambda key: [by_x[c][key] for c in x]
+        fig.add_trace(go.Box(
+            x=x, q1=stats_of('q1'), median=stats_of('median'), q3=stats_of('q3'),
+            lowerfence=stats_of('lowerfence'), upperfence=stats_of('upperfence'),
+            mean=stats_of('mean'), name=str(name), marker_color=color,
+            offsetgroup=str(name), boxpoints=False
+        ))
+        outlier_x = [c for c in x for _ in by_x[c]['outliers']]
+        outlier_y = np.concatenate([by_x[c]['outliers'] for c in x]) if x else []
+        fig.add_trace(go.Scatter(
+            x=outlier_x, y=outlier_y, mode='markers', name=str(name),
+            marker=dict(color=color, size=4, opacity=0.6),
+            offsetgroup=str(name), showlegend=False, hoverinfo='y'
+        ))
+    fig.update_layout(boxmode=boxmode, scattermode=boxmode)
+    return fig
+
+
+def summary_violin_figure(summaries, colors, width=0.8):
+    """Violin plot with inner box and outliers from precomputed ``{category: summary}``."""
+    fig = go.Figure()
+    labels = list(summaries)
+    for i, label in enumerate(labels):
+        summary = summaries[label]
+        color = colors[i % len(colors)]
+        half_width = summary['kde_density'] / summary['kde_density'].max() * width / 2
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([i - half_width, (i + half_width)[::-1]]),
+            y=np.concatenate([summary['kde_grid'], summary['kde_grid'][::-1]]),
+            fill='toself', mode='lines', line=dict(color=color, width=1),
+            name=str(label), hoverinfo='name'
+        ))
+        fig.add_trace(go.Box(
+            x=[i], q1=[summary['q1']], median=[summary['median']], q3=[summary['q3']],
+            lowerfence=[summary['lowerfence']], upperfence=[summary['upperfence']],
+            name=str(label), width=width / 4, marker_color=color, fillcolor='rgba(255,255,255,0.15)',
+            boxpoints=False, showlegend=False
+        ))
+        fig.add_trace(go.Scatter(
+            x=np.full(len(summary['outliers']), i), y=summary['outliers'], mode='markers',
+            marker=dict(color=color, size=4, opacity=0.6), name=str(label),
+            showlegend=False, hoverinfo='y'
+        ))
+    fig.update_xaxes(tickmode='array', tickvals=list(range(len(labels))), ticktext=[str(l) for l in labels])
+    return fig
+
+
+# ============================================================================
+# SERVER-SIDE HISTOGRAMS
+# ============================================================================
+HISTOGRAM_BINS = 30
+LIVE_HRV_RANGE = (20.0, 180.0)  # Fixed edges so live counts can be updated in place
+
+
+class Histogram:
+    """Fixed-edge histogram built with np.bincount and updatable one batch at a time.
+    
+    Values outside the edges are counted in the first/last bin so that
+    incremental add/remove calls always stay balanced.
+    """
+    
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+    
+    @classmethod
+    def uniform(cls, low, high, bins=HISTOGRAM_BINS):
+        if not high > low:
+            high = low + 1.0
+        return cls(np.linspace(low, high, bins + 1))
+    
+    def bin_ids(self, values):
+        """Bin number of each value (NaN values get -1)."""
+        values = np.asarray(values, dtype=np.float64)
+        ids = np.clip(np.searchsorted(self.edges, values, side='right') - 1, 0, len(self.counts) - 1)
+        ids[np.isnan(values)] = -1
+        return ids
+    
+    def count_ids(self, ids):
+        """Bin counts for precomputed bin ids."""
+        return np.bincount(ids[ids >= 0], minlength=len(self.counts))
+    
+    def add(self, values):
+        self.counts += self.count_ids(self.bin_ids(values))
+        return self
+    
+    def remove(self, values):
+        self.counts -= self.count_ids(self.bin_ids(values))
+        return self
+    
+    def copy(self):
+        clone = Histogram(self.edges)
+        clone.counts = self.counts.copy()
+        return clone
+    
+    def bar_trace(self, counts=None, **kwargs):
+        """Pre-binned bar trace (bin centres, full-width bars)."""
+        counts = self.counts if counts is None else counts
+        return go.Bar(x=(self.edges[:-1] + self.edges[1:]) / 2, y=counts,
+                      width=np.diff(self.edges), **kwargs)
+
+
+class BinnedColumns:
+    """Per-row bin ids over the whole dataset so any filter's histogram is one bincount."""
+    
+    def __init__(self, frame, columns, bins=HISTOGRAM_BINS):
+        self.histograms = {}
+        self.ids = {}
+        for column in columns:
+            values = frame[column].to_numpy()
+            histogram = Histogram.uniform(float(np.nanmin(values)), float(np.nanmax(values)), bins)
+            self.histograms[column] = histogram
+            self.ids[column] = histogram.bin_ids(values).astype(np.int16)
+    
+    def counts(self, column, rows):
+        return self.histograms[column].count_ids(self.ids[column][rows])
+
+
+def density_grids(frame, x_column, y_column, group_column, x_range, y_range, bins=(50, 42)):
+    """2D count grids of (x, y) per group, rasterized for all rows in a single bincount pass.
+    
+    Returns (x_centers, y_centers, {group: counts[y, x]}); points outside the
+    ranges are clamped into the edge bins.
+    """
+    x_bins, y_bins = bins
+    x_edges = np.linspace(*x_range, x_bins + 1)
+    y_edges = np.linspace(*y_range, y_bins + 1)
+    x = frame[x_column].to_numpy(dtype=np.float64)
+    y = frame[y_column].to_numpy(dtype=np.float64)
+    groups = frame[group_column].astype('category').array
+    
+    valid = ~(np.isnan(x) | np.isnan(y)) & (groups.codes >= 0)
+    x_ids = np.clip(np.searchsorted(x_edges, x[valid], side='right') - 1, 0, x_bins - 1)
+    y_ids = np.clip(np.searchsorted(y_edges, y[valid], side='right') - 1, 0, y_bins - 1)
+    cell_ids = (groups.codes[valid].astype(np.int64) * y_bins + y_ids) * x_bins + x_ids
+    counts = np.bincount(cell_ids, minlength=len(groups.categories) * y_bins * x_bins)
+    counts = counts.reshape(len(groups.categories), y_bins, x_bins)
+    
+    grids = {label: counts[code] for code, label in enumerate(groups.categories) if counts[code].any()}
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, grids
+
+
+@st.cache_resource
+def load_binned_columns():
+    """Bin the histogram columns of the shared dataset once per process."""
+    return BinnedColumns(load_data(), ['recovery_score'])
+
+
+# ============================================================================
+# RFM SEGMENTATION MODELS
+# ============================================================================
+RFM_FEATURES = ['Recency', 'Frequency', 'Monetary']
+RFM_K_RANGE = range(2, 9)
+RFM_MINIBATCH_USERS = int(os.environ.get('WHOOP_RFM_MINIBATCH_USERS', '5000'))
+RFM_SILHOUETTE_SAMPLE = 2000
+RFM_MAX_FILTERS = 16  # Filter states whose fitted models are retained
+
+
+def build_rfm(frame):
+    """Per-user Recency (days since last record), Frequency (workouts) and Monetary (calories).
+    
+    Returns the RFM table and its standardized feature matrix.
+    """
+    rfm = frame.groupby('user_id', observed=True).agg(
+        last_date=('date', 'max'),
+        Frequency=('workout_completed', 'sum'),
+        Monetary=('calories_burned', 'sum'),
+    )
+    rfm.insert(0, 'Recency', (frame['date'].max() - rfm.pop('last_date')).dt.days)
+    rfm = rfm[RFM_FEATURES].reset_index()
+    rfm = rfm.replace([np.inf, -np.inf], np.nan).dropna().reset_index(drop=True)
+    return rfm, StandardScaler().fit_transform(rfm[RFM_FEATURES])
+
+
+def fit_rfm_model(features, k):
+    """Cluster scaled RFM features into ``k`` segments, switching to MiniBatchKMeans for large user counts."""
+    if len(features) >= RFM_MINIBATCH_USERS:
+        model = MiniBatchKMeans(n_clusters=k, random_state=42, n_init=3, batch_size=1024)
+    else:
+        model = KMeans(n_clusters=k, random_state=42, n_init=10)
+    labels = model.fit_predict(features)
+    
+    silhouette = np.nan
+    if 1 < len(np.unique(labels)) < len(features):
+        silhouette = silhouette_score(features, labels, random_state=42,
+                                      sample_size=min(len(features), RFM_SILHOUETTE_SAMPLE))
+    return {
+        'labels': labels,
+        'inertia': float(model.inertia_),
+        'silhouette': float(silhouette),
+        'algorithm': type(model).__name__,
+    }
+
+
+class RFMModelPool:
+    """Fits every k in ``RFM_K_RANGE`` for a filter state on background workers and keeps the results."""
+    
+    def __init__(self, max_workers=2, max_filters=RFM_MAX_FILTERS):
+        self.max_filters = max_filters
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='rfm-kmeans')
+        self._sweeps = OrderedDict()  # filter key -> {k: Future}
+        self._claimed = set()  # Futures handed out by submit(), never cancelled
+        self._lock = threading.Lock()
+    
+    def submit(self, key, features, first_k=None):
+        """Queue the k sweep for ``key`` (``first_k`` ahead of the rest) unless it is already known.
+        
+        Returns the future for ``first_k`` (None without one); it is marked as claimed
+        so evicting ``key`` never cancels a fit that a caller may be waiting on.
+        """
+        with self._lock:
+            if key in self._sweeps:
+                self._sweeps.move_to_end(key)
+            else:
+                order = sorted(RFM_K_RANGE, key=lambda k: k != first_k)
+                self._sweeps[key] = {k: self._executor.submit(fit_rfm_model, features, k) for k in order}
+            future = self._sweeps[key].get(first_k)
+            if future is not None:
+                self._claimed.add(future)
+            while len(self._sweeps) > self.max_filters:
+                _, futures = self._sweeps.popitem(last=False)
+                for queued in futures.values():
+                    # Unclaimed queued fits are dropped; claimed ones run to completion for their waiters
+                    if queued not in self._claimed:
+                        queued.cancel()
+                    self._claimed.discard(queued)
+            return future
+    
+    def get(self, key, features, k):
+        """Fitted model for (``key``, ``k``), waiting only for that fit if it is still running."""
+        return self.submit(key, features, first_k=k).result()
+    
+    def sweep(self, key):
+        """Results of the fits for ``key`` that have finished so far, by k."""
+        with self._lock:
+            futures = dict(self._sweeps.get(key, {}))
+        return {k: f.result() for k, f in sorted(futures.items()) if f.done() and not f.cancelled()}
+
+
+@st.cache_resource
+def get_rfm_model_pool():
+    """Process-wide pool of background RFM clustering fits."""
+    return RFMModelPool(max_workers=int(os.environ.get('WHOOP_RFM_WORKERS', '2')))
+
+
+# ============================================================================
+# COHORT RETENTION ENGINE
+# ============================================================================
+COHORT_GRANULARITIES = {'Monthly': 'M', 'Weekly': 'W'}
+
+
+def period_codes(dates, granularity):
+    """Integer period numbers for datetime64 values: months or Monday-based weeks since 1970."""
+    if granularity == 'M':
+        return dates.astype('datetime64[M]').astype(np.int64)
+    # 1970-01-01 was a Thursday; shift by 3 days so weeks start on Monday
+    return (dates.astype('datetime64[D]').astype(np.int64) + 3) // 7
+
+
+def period_labels(codes, granularity):
+    """Display labels for period numbers ('YYYY-MM', or the week's Monday)."""
+    if granularity == 'M':
+        return np.datetime_as_string(np.asarray(codes).astype('datetime64[M]'))
+    return np.datetime_as_string((np.asarray(codes) * 7 - 3).astype('datetime64[D]'))
+
+
+def cohort_retention(frame, granularity='M', max_periods=12):
+    """Retention % of users with a workout N periods after their first record, by cohort.
+    
+    Cohorts are assigned from each user's first record in ``frame``; cells count
+    distinct users, and cohorts or periods with no workouts are left empty.
+    """
+    users = frame['user_id'].astype('category').array
+    user_codes = users.codes.astype(np.int64)
+    periods = period_codes(frame['date'].to_numpy(), granularity)
+    valid = user_codes >= 0
+    if not valid.any():
+        return pd.DataFrame(dtype=np.float64)
+    
+    # First period per user
+    first = np.full(len(users.categories), np.iinfo(np.int64).max)
+    np.minimum.at(first, user_codes[valid], periods[valid])
+    first_period = first[first != np.iinfo(np.int64).max].min()
+    
+    # Distinct (user, offset) pairs among workouts; offsets past the display window are dropped
+    workouts = valid & (frame['workout_completed'].to_numpy() == 1)
+    workout_users = user_codes[workouts]
+    offsets = periods[workouts] - first[workout_users]
+    keep = offsets < max_periods
+    pairs = np.unique(workout_users[keep] * max_periods + offsets[keep])
+    pair_users, pair_offsets = np.divmod(pairs, max_periods)
+    
+    # Distinct users per (cohort, offset) cell
+    cohort_ids = first[pair_users] - first_period
+    n_cohorts = int(cohort_ids.max()) + 1 if len(cohort_ids) else 0
+    counts = np.bincount(cohort_ids * max_periods + pair_offsets,
+                         minlength=n_cohorts * max_periods).reshape(n_cohorts, max_periods)
+    
+    present = np.flatnonzero(counts.any(axis=1))[:max_periods]
+    counts = counts[present].astype(np.float64)
+    counts[counts == 0] = np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        retention = counts / counts[:, :1] * 100
+    return pd.DataFrame(retention,
+                        index=period_labels(present + first_period, granularity),
+                        columns=[str(i) for i in range(max_periods)])
+
+
+# ============================================================================
+# ACTIVITY CO-OCCURRENCE
+# ============================================================================
+def _key_codes(series):
+    """Dense non-negative integer codes for a key column (-1 for missing)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.array.codes.astype(np.int64), len(series.cat.categories)
+    codes, uniques = pd.factorize(series)
+    return codes.astype(np.int64), len(uniques)
+
+
+def activity_cooccurrence(workouts, basket_columns=('user_id', 'week'), item_column='activity_type'):
+    """Number of baskets (e.g. user-weeks) in which each pair of activities both appear.
+    
+    Builds a binary basket x activity incidence matrix and returns ``X.T @ X``;
+    the diagonal holds the number of baskets containing each activity.
+    """
+    items = workouts[item_column].astype('category').array
+    item_codes = items.codes.astype(np.int64)
+    valid = item_codes >= 0
+    
+    # Mixed-radix basket key from the key columns' codes
+    basket_key = np.zeros(len(workouts), dtype=np.int64)
+    for column in basket_columns:
+        codes, cardinality = _key_codes(workouts[column])
+        valid &= codes >= 0
+        basket_key = basket_key * (cardinality + 1) + codes
+    
+    baskets, basket_ids = np.unique(basket_key[valid], return_inverse=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(basket_ids), dtype=np.int32), (basket_ids, item_codes[valid])),
+        shape=(len(baskets), len(items.categories))
+    )
+    incidence.data[:] = 1  # Duplicates were summed on construction; an activity counts once per basket
+    counts = (incidence.T @ incidence).toarray()
+    
+    # Activities present, in order of first appearance
+    present = pd.unique(item_codes[valid])
+    labels = items.categories[present]
+    return pd.DataFrame(counts[np.ix_(present, present)].astype(float), index=labels, columns=labels)
+
+
+# ============================================================================
+# ASSOCIATION RULE MINING (BITSET APRIORI)
+# ============================================================================
+# Behavior items: group -> (column, None for categorical labels | (band edges, band labels))
+ASSOCIATION_ITEMS = {
+    'Recovery': ('recovery_category', None),
+    'Sleep': ('sleep_hours', ([6, 7, 8], ['<6h', '6-7h', '7-8h', '≥8h'])),
+    'Strain': ('day_strain', ([10, 14, 18], ['Light (<10)', 'Moderate (10-14)', 'High (14-18)', 'All Out (≥18)'])),
+    'Workout Time': ('workout_time_of_day', None),
+    'Activity': ('activity_type', None),
+}
+ASSOCIATION_MIN_SUPPORT = 0.01  # Itemsets are mined once at this floor; the UI thresholds filter above it
+ASSOCIATION_MAX_ITEMS = 3
+
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def pack_bits(mask):
+    """Pack a boolean mask into a uint64 bitset (zero padded)."""
+    packed = np.packbits(mask)
+    packed = np.concatenate([packed, np.zeros(-len(packed) % 8, dtype=np.uint8)])
+    return packed.view(np.uint64)
+
+
+def popcount(bits):
+    """Number of set bits in a uint64 bitset."""
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(bits).sum(dtype=np.int64))
+    return int(_POPCOUNT_TABLE[bits.view(np.uint8)].sum(dtype=np.int64))
+
+
+def encode_transactions(frame, items=ASSOCIATION_ITEMS):
+    """One packed bitset over the rows of ``frame`` per (group, label) behavior item."""
+    bitsets = {}
+    for group, (column, bands) in items.items():
+        if bands is None:
+            values = frame[column].astype('category').array
+            codes, labels = values.codes, values.categories
+        else:
+            edges, labels = bands
+            x = frame[column].to_numpy(dtype=np.float64)
+            codes = np.where(np.isnan(x), -1, np.searchsorted(edges, x, side='right'))
+        for code, label in enumerate(labels):
+            bitsets[(group, str(label))] = pack_bits(codes == code)
+    return bitsets
+
+
+def mine_itemsets(bitsets, n_rows, min_support=ASSOCIATION_MIN_SUPPORT, max_items=ASSOCIATION_MAX_ITEMS):
+    """Apriori over item bitsets: support of every frequent itemset (sorted tuples of items).
+    
+    Candidates join two frequent itemsets sharing a prefix, skip items of the same
+    group (bands are mutually exclusive) and must have all subsets frequent.
+    """
+    if n_rows == 0:
+        return {}
+    min_count = max(min_support * n_rows, 1)
+    supports, level = {}, {}
+    for item, bits in bitsets.items():
+        count = popcount(bits)
+        if count >= min_count:
+            supports[(item,)] = count / n_rows
+            level[(item,)] = bits
+    
+    for size in range(2, max_items + 1):
+        keys = sorted(level)
+        next_level = {}
+        for i, left in enumerate(keys):
+            for right in keys[i + 1:]:
+                if left[:-1] != right[:-1]:
+                    break
+                if left[-1][0] == right[-1][0]:
+                    continue
+                candidate = left + right[-1:]
+                if any(candidate[:j] + candidate[j + 1:] not in supports for j in range(size - 2)):
+                    continue
+                bits = level[left] & bitsets[right[-1]]
+                count = popcount(bits)
+                if count >= min_count:
+                    supports[candidate] = count / n_rows
+                    next_level[candidate] = bits
+        level = next_level
+    return supports
+
+
+def association_rules(supports):
+    """Every rule A → C derivable from the frequent itemsets, with support, confidence and lift."""
+    rules = []
+    for itemset, support in supports.items():
+        for size in range(1, len(itemset)):
+            for antecedent in combinations(itemset, size):
+                consequent = tuple(item for item in itemset if item not in antecedent)
+                confidence = support / supports[antecedent]
+                rules.append({
+                    'Rule': ' + '.join(f"{g}: {l}" for g, l in antecedent) + ' → '
+                            + ' + '.join(f"{g}: {l}" for g, l in consequent),
+                    'Support': support,
+                    'Confidence': confidence,
+                    'Lift': confidence / supports[consequent],
+                    'Items': len(itemset),
+                })
+    return pd.DataFrame(rules, columns=['Rule', 'Support', 'Confidence', 'Lift', 'Items'])
+
+
+# ============================================================================
+# WHAT-IF SCENARIO MODEL
+# ============================================================================
+WHATIF_FEATURES = ['sleep_hours', 'sleep_efficiency', 'day_strain', 'rest_days_per_week']
+WHATIF_TARGETS = ['recovery_score', 'hrv']
+# Scenario grid axes; they match the What-If slider ranges and steps
+WHATIF_AXES = {
+    'sleep_hours': np.arange(4.0, 10.01, 0.5),
+    'sleep_efficiency': np.arange(50, 101, 1, dtype=np.float64),
+    'day_strain': np.arange(0.0, 21.01, 0.5),
+    'rest_days_per_week': np.arange(0, 5, 1, dtype=np.float64),
+}
+
+
+def weekly_rest_days(frame):
+    """For each row, the share of non-workout days in that user's week, scaled to a 7-day week."""
+    users = frame['user_id'].astype('category').array.codes.astype(np.int64)
+    weeks = period_codes(frame['date'].to_numpy(), 'W')
+    weeks = weeks - weeks.min() if len(weeks) else weeks
+    _, week_ids = np.unique(users * (int(weeks.max(initial=0)) + 1) + weeks, return_inverse=True)
+    rest = np.bincount(week_ids, weights=frame['workout_completed'].to_numpy() == 0)
+    return 7 * rest[week_ids] / np.bincount(week_ids)[week_ids]
+
+
+def fit_whatif_model(frame):
+    """Multi-output linear regression of recovery and HRV on sleep, efficiency, strain and rest days.
+    
+    Returns the fitted model, baseline means and its predictions over the full
+    ``WHATIF_AXES`` grid, indexed [sleep, efficiency, strain, rest days, target].
+    """
+    data = frame[WHATIF_FEATURES[:3] + WHATIF_TARGETS].astype(np.float64)
+    data['rest_days_per_week'] = weekly_rest_days(frame)
+    data = data.dropna()
+    
+    regression = LinearRegression()
+    if len(data) > len(WHATIF_FEATURES):
+        regression.fit(data[WHATIF_FEATURES].to_numpy(), data[WHATIF_TARGETS].to_numpy())
+    else:
+        regression.coef_ = np.zeros((len(WHATIF_TARGETS), len(WHATIF_FEATURES)))
+        regression.intercept_ = data[WHATIF_TARGETS].mean().to_numpy()
+    
+    model = {'regression': regression, 'baseline': data.mean().to_dict(), 'rows': len(data)}
+    model['grid'] = predict_scenarios(model, *WHATIF_AXES.values(), mesh=True)
+    return model
+
+
+def predict_scenarios(model, sleep_hours, sleep_efficiency, day_strain, rest_days_per_week, mesh=False):
+    """Predicted (recovery, HRV) for a batch of scenarios in one matrix product.
+    
+    Inputs broadcast against each other; with ``mesh=True`` they are treated as
+    grid axes and every combination is evaluated. The last axis holds the targets.
+    """
+    inputs = np.meshgrid(sleep_hours, sleep_efficiency, day_strain, rest_days_per_week, indexing='ij') if mesh \
+        else np.broadcast_arrays(sleep_hours, sleep_efficiency, day_strain, rest_days_per_week)
+    features = np.stack([np.asarray(x, dtype=np.float64).ravel() for x in inputs], axis=1)
+    regression = model['regression']
+    predictions = features @ regression.coef_.T + regression.intercept_
+    predictions[:, 0] = np.clip(predictions[:, 0], 0, 100)
+    predictions[:, 1] = np.maximum(predictions[:, 1], 20)
+    return predictions.reshape(inputs[0].shape + (len(WHATIF_TARGETS),))
+
+
+def grid_position(axis, value):
+    """Index of the grid point on ``axis`` nearest to ``value``."""
+    return int(np.abs(WHATIF_AXES[axis] - value).argmin())
+
+
+# ============================================================================
+# STREAMING CORRELATION
+# ============================================================================
+CORRELATION_COLUMNS = ['recovery_score', 'day_strain', 'sleep_hours', 'sleep_efficiency',
+                       'hrv', 'resting_heart_rate', 'deep_sleep_hours', 'rem_sleep_hours', 'calories_burned']
+
+
+class CorrelationAccumulator:
+    """Running pairwise counts, means, second moments and co-moments of a set of columns.
+    
+    Batches are folded in with the Welford/Chan update, accumulators built on
+    separate partitions can be merged, and batches can be removed again for
+    sliding windows. Like DataFrame.corr, missing values are dropped per pair
+    of columns: entry [i, j] of every matrix covers the rows where both i and
+    j are present.
+    """
+    
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+    
+    @classmethod
+    def from_values(cls, columns, values):
+        """Accumulator over the rows of a 2D array (or frame) of ``columns``."""
+        return cls(columns).update(values)
+    
+    @classmethod
+    def from_ranks(cls, columns, values):
+        """Accumulator over average ranks, so ``corr()`` gives Spearman's correlation.
+        
+        As in DataFrame.corr(method='spearman'), each pair of columns is ranked
+        among the rows where both are present; only pairs whose gaps differ are
+        re-ranked on their own.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        ranks = np.full(values.shape, np.nan)
+        for i in range(values.shape[1]):
+            ranks[valid[:, i], i] = stats.rankdata(values[valid[:, i], i])
+        accumulator = cls.from_values(columns, ranks)
+        
+        for i, j in combinations(range(values.shape[1]), 2):
+            both = valid[:, i] & valid[:, j]
+            if np.array_equal(both, valid[:, i]) and np.array_equal(both, valid[:, j]):
+                continue
+            pair = np.column_stack([stats.rankdata(values[both, i]), stats.rankdata(values[both, j])])
+            n, mean, m2, comoment = cls._batch_stats(pair)
+            for (a, b), (x, y) in (((i, j), (0, 1)), ((j, i), (1, 0))):
+                accumulator.n[a, b] = n[x, y]
+                accumulator.mean[a, b] = mean[x, y]
+                accumulator.m2[a, b] = m2[x, y]
+                accumulator.comoment[a, b] = comoment[x, y]
+        return accumulator
+    
+    @classmethod
+    def merge_all(cls, columns, counts, means, m2s, comoments):
+        """Merge many partitions at once from stacked (P, k, k) counts, means, second moments and co-moments."""
+        merged = cls(columns)
+        merged.n = counts.sum(axis=0)
+        merged.mean = np.divide((counts * means).sum(axis=0), merged.n, out=np.zeros_like(merged.n), where=merged.n > 0)
+        deviations = means - merged.mean
+        merged.m2 = m2s.sum(axis=0) + (counts * deviations ** 2).sum(axis=0)
+        merged.comoment = comoments.sum(axis=0) + (counts * deviations * deviations.transpose(0, 2, 1)).sum(axis=0)
+        return merged
+    
+    @staticmethod
+    def pairwise_moments(n, sums, squares, cross, shift):
+        """(mean, m2, comoment) from pairwise sums of values shifted by ``shift``.
+    
+        ``sums[..., i, j]`` and ``squares[..., i, j]`` sum column i (and its
+        square) over the rows where i and j are present; ``cross`` sums the
+        products. Shifting by roughly the column means first keeps the
+        subtraction of the squared means from cancelling.
+        """
+        mean = np.divide(sums, n, out=np.zeros_like(sums), where=n > 0)
+        m2 = squares - n * mean ** 2
+        comoment = cross - n * mean * np.swapaxes(mean, -1, -2)
+        return mean + shift[:, None], m2, comoment
+    
+    @staticmethod
+    def column_shift(values, valid):
+        """Each column's mean over its present values (0 for an empty column)."""
+        counts = valid.sum(axis=0)
+        return np.divide(np.where(valid, values, 0).sum(axis=0), counts, out=np.zeros(values.shape[1]), where=counts > 0)
+    
+    @classmethod
+    def _batch_stats(cls, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values.reshape(-1, values.shape[-1])
+        valid = ~np.isnan(values)
+        present = valid.astype(np.float64)
+        shift = cls.column_shift(values, valid)
+        shifted = np.where(valid, values - shift, 0)
+        n = present.T @ present
+        mean, m2, comoment = cls.pairwise_moments(n, shifted.T @ present, (shifted ** 2).T @ present,
+                                                  shifted.T @ shifted, shift)
+        return n, mean, m2, comoment
+    
+    def _combine(self, n, mean, m2, comoment):
+        total = self.n + n
+        weight = np.divide(self.n * n, total, out=np.zeros_like(total), where=total > 0)
+        delta = mean - self.mean
+        self.comoment = self.comoment + comoment + delta * delta.T * weight
+        self.m2 = self.m2 + m2 + delta ** 2 * weight
+        self.mean = self.mean + delta * np.divide(n, total, out=np.zeros_like(total), where=total > 0)
+        self.n = total
+    
+    def update(self, values):
+        """Fold a batch of rows into the accumulator."""
+        self._combine(*self._batch_stats(values))
+        return self
+    
+    def merge(self, other):
+        """Fold another accumulator over the same columns into this one."""
+        self._combine(other.n, other.mean, other.m2, other.comoment)
+        return self
+    
+    def remove(self, values):
+        """Take a batch of previously added rows back out of the accumulator."""
+        n, mean, m2, comoment = self._batch_stats(values)
+        remaining = self.n - n
+        kept = remaining > 0
+        remaining_mean = np.divide(self.n * self.mean - n * mean, remaining, out=np.zeros_like(remaining), where=kept)
+        weight = np.divide(remaining * n, self.n, out=np.zeros_like(remaining), where=kept)
+        delta = mean - remaining_mean
+        self.comoment = np.where(kept, self.comoment - comoment - delta * delta.T * weight, 0)
+        self.m2 = np.where(kept, self.m2 - m2 - delta ** 2 * weight, 0)
+        self.mean = remaining_mean
+        self.n = np.maximum(remaining, 0)
+        return self
+    
+    def copy(self):
+        """Independent copy, e.g. to merge into without touching a cached accumulator."""
+        clone = CorrelationAccumulator(self.columns)
+        clone.n, clone.mean, clone.m2, clone.comoment = self.n.copy(), self.mean.copy(), self.m2.copy(), self.comoment.copy()
+        return clone
+    
+    def corr(self):
+        """Pearson correlation matrix, each entry over the rows where both columns are present."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matrix = np.clip(self.comoment / np.sqrt(self.m2 * self.m2.T), -1, 1)
+        return pd.DataFrame(matrix, index=self.columns, columns=self.columns)
+
+
+class DailyCorrelationPartitions:
+    """One correlation accumulator per calendar day, so date-range-only filters merge O(days) partitions."""
+    
+    def __init__(self, frame, columns=CORRELATION_COLUMNS):
+        self.columns = list(columns)
+        days = frame['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        if np.any(np.diff(days) < 0):
+            raise ValueError("DailyCorrelationPartitions requires rows sorted by date")
+        values = frame[self.columns].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        present = valid.astype(np.float64)
+        shift = CorrelationAccumulator.column_shift(values, valid)
+        shifted = np.where(valid, values - shift, 0)
+    
+        self.days, starts = np.unique(days, return_index=True)
+        k = len(self.columns)
+        counts, sums, squares, cross = (np.empty((len(self.days), k, k)) for _ in range(4))
+        for i in range(k):
+            counts[:, i] = np.add.reduceat(present[:, i, None] * present, starts)
+            sums[:, i] = np.add.reduceat(shifted[:, i, None] * present, starts)
+            squares[:, i] = np.add.reduceat(shifted[:, i, None] ** 2 * present, starts)
+            cross[:, i] = np.add.reduceat(shifted[:, i, None] * shifted, starts)
+        self.counts = counts
+        self.means, self.m2s, self.comoments = CorrelationAccumulator.pairwise_moments(counts, sums, squares, cross, shift)
+    
+    def between(self, start_date, end_date):
+        """Merged accumulator for all rows dated within [start_date, end_date]."""
+        first = np.searchsorted(self.days, np.datetime64(start_date, 'D').astype(np.int64), side='left')
+        last = np.searchsorted(self.days, np.datetime64(end_date, 'D').astype(np.int64), side='right')
+        return CorrelationAccumulator.merge_all(self.columns, self.counts[first:last], self.means[first:last],
+                                                self.m2s[first:last], self.comoments[first:last])
+
+
+@st.cache_resource
+def load_correlation_partitions():
+    """Build the per-day correlation partitions once per process for the shared dataset."""
+    return DailyCorrelationPartitions(load_data())
+
+
+@st.cache_resource
+def get_live_feed():
+    """Process-wide live feed: one push-channel subscription, backed by a read-only mapping of the ring."""
+    return LiveSubscriber(LIVE_SOCKET_PATH, RingBufferReader(LIVE_RING_PATH))
+
+
+def read_live_feed(feed, state_key='live_feed'):
+    """This session's live window, extended with only the records published since its last run.
+    
+    Returns (epoch, window) with the window indexed by record sequence number,
+    or (None, None) when no generator has published a ring.
+    """
+    status = feed.status()
+    if status is None:
+        return None, None
+    epoch, window = st.session_state.get(state_key, (None, None))
+    if window is not None and status[0] == epoch:
+        new_epoch, new = feed.records_since(int(window.index[-1]) + 1 if len(window) else 0)
+        if new_epoch == epoch:
+            kept = window[window.index >= status[1]]
+            window = pd.concat([kept, new]) if len(new) else kept
+            st.session_state[state_key] = (epoch, window)
+            return epoch, window
+    
+    # First run, or the generator restarted with a new ring
+    epoch, window = feed.records_since(0)
+    st.session_state[state_key] = (epoch, window)
+    return epoch, window
+
+
+def live_window_changes(window, state_key, epoch=None):
+    """Rows that entered and left a live window since the previous run of this session.
+    
+    ``window`` is indexed by increasing, contiguous record sequence numbers from
+    the feed identified by ``epoch``; returns (entered, left, first_run). The
+    caller stores (epoch, window) under ``state_key`` only once the aggregate
+    built from these changes has been saved, so a failed update is redone in
+    full on the next run instead of leaving the two out of step.
+    """
+    previous_epoch, previous = st.session_state.get(state_key, (None, None))
+    if previous is None or previous_epoch != epoch:
+        return window, window.iloc[:0], True
+    last_seen = previous.index[-1] if len(previous) else -1
+    first_kept = window.index[0] if len(window) else np.inf
+    return window[window.index > last_seen], previous[previous.index < first_kept], False
+
+
 # Load data
 df = load_data()
+filter_index = load_filter_index()
+metric_cube = load_metric_cube()
+topk_index = load_topk_index()
 
 
 # ============================================================================
@@ -738,8 +2258,7 @@ with st.sidebar:
             </div>
             """, unsafe_allow_html=True)
         else:
-            live_data_path = '/app/data/live_data.csv'
-            if os.path.exists(live_data_path):
+            if live_feed_available(LIVE_RING_PATH):
                 st.markdown("""
                 <div style='background: rgba(34, 197, 94, 0.1); border: 1px solid rgba(34, 197, 94, 0.3); 
                             padding: 0.5rem; border-radius: 8px; margin-top: 0.5rem;'>
@@ -1078,27 +2597,57 @@ with st.sidebar:
     """, unsafe_allow_html=True)
 
 
-# Apply filters (including new recovery and strain filters)
-mask = (
-    (df['date'].dt.date >= date_range[0]) &
-    (df['date'].dt.date <= date_range[1]) &
-    (df['gender'].isin(selected_gender)) &
-    (df['fitness_level'].isin(selected_fitness)) &
-    (df['age_group'].isin(selected_age)) &
-    (df['primary_sport'].isin(selected_sports)) &
-    (df['season'].isin(selected_seasons)) &
-    (df['recovery_score'] >= recovery_range[0]) &
-    (df['recovery_score'] <= recovery_range[1]) &
-    (df['day_strain'] >= strain_range[0]) &
-    (df['day_strain'] <= strain_range[1])
+# Apply filters (including new recovery and strain filters) through the precomputed index,
+# reusing the result of any filter combination viewed recently by any session
+filter_selections = {
+    'gender': selected_gender,
+    'fitness_level': selected_fitness,
+    'age_group': selected_age,
+    'primary_sport': selected_sports,
+    'season': selected_seasons,
+}
+filter_ranges = {
+    'recovery_score': recovery_range,
+    'day_strain': strain_range,
+}
+filter_key = make_filter_key(
+    date_range, {**filter_selections, 'activity_type': selected_activities}, filter_ranges
 )
-filtered_df = df[mask].copy()
+filter_cache = get_filter_cache()
+filter_result = filter_cache.get_or_compute(
+    ('filter', filter_key),
+    lambda: compute_filter_result(df, filter_index, metric_cube, date_range, filter_selections,
+                                  selected_activities, filter_ranges)
+)
+kpis = filter_result['kpis']
+filtered_df = select_rows(df, filter_result['rows'])
 
 # Activity filter for workout data
-workout_df = filtered_df[
-    (filtered_df['workout_completed'] == 1) & 
-    (filtered_df['activity_type'].isin(selected_activities))
-]
+workout_df = select_rows(df, filter_result['workout_rows'])
+
+
+def metric_means(keys, metrics):
+    """Per-group metric means for the current filters, from the cube when it covers them."""
+    cube_rows = filter_result['cube_rows']
+    if cube_rows is not None:
+        return MetricCube.means(select_rows(metric_cube.cells, cube_rows), keys, metrics)
+    return filtered_df.groupby(keys, observed=True)[metrics].mean()
+
+
+def get_grouped_summaries(frame_name, value_column, group_column):
+    """Cached per-group distribution summaries of the filtered (or workout) rows."""
+    frame = workout_df if frame_name == 'workout' else filtered_df
+    return filter_cache.get_or_compute(
+        ('summaries', filter_key, frame_name, value_column, group_column),
+        lambda: grouped_summaries(frame, value_column, group_column)
+    )
+
+
+def get_activity_aggregate():
+    """Fine-grained activity aggregate for the current filters, shared through the filter cache."""
+    return filter_cache.get_or_compute(
+        ('activity_aggregate', filter_key), lambda: build_activity_aggregate(workout_df)
+    )
 
 # Update sidebar with live filter stats
 with st.sidebar:
@@ -1126,8 +2675,8 @@ with st.sidebar:
     """, unsafe_allow_html=True)
     
     # Unique users and workouts stats
-    unique_users = filtered_df['user_id'].nunique()
-    total_workouts = len(workout_df)
+    unique_users = kpis['users']
+    total_workouts = kpis['workouts']
     
     st.markdown(f"""
     <div style='display: flex; justify-content: space-around; margin-top: 1rem; text-align: center;'>
@@ -1142,6 +2691,13 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
     
+    cache_stats = filter_cache.stats()
+    st.caption(
+        f"⚡ Filter cache: {cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses "
+        f"({cache_stats['hit_rate']:.0%}) · {cache_stats['entries']} entries · "
+        f"{cache_stats['bytes'] / 1e6:.1f} MB"
+    )
+    
     # Footer
     st.markdown("""
     <div style='margin-top: 2rem; padding-top: 1rem; border-top: 1px solid rgba(255,255,255,0.1); text-align: center;'>
@@ -1170,40 +2726,42 @@ st.markdown("### 📊 Key Performance Indicators")
 col1, col2, col3, col4, col5, col6 = st.columns(6)
 
 with col1:
-    avg_recovery = filtered_df['recovery_score'].mean()
+    avg_recovery = kpis['recovery_score']
     st.metric("Avg Recovery", f"{avg_recovery:.1f}%", 
               delta=f"{avg_recovery - 65:.1f}% vs baseline")
 
 with col2:
-    avg_strain = filtered_df['day_strain'].mean()
+    avg_strain = kpis['day_strain']
     st.metric("Avg Day Strain", f"{avg_strain:.1f}", 
               delta=f"{avg_strain - 10:.1f} vs baseline")
 
 with col3:
-    avg_sleep = filtered_df['sleep_hours'].mean()
+    avg_sleep = kpis['sleep_hours']
     st.metric("Avg Sleep", f"{avg_sleep:.1f}h", 
               delta=f"{avg_sleep - 7:.1f}h vs recommended")
 
 with col4:
-    avg_hrv = filtered_df['hrv'].mean()
+    avg_hrv = kpis['hrv']
     st.metric("Avg HRV", f"{avg_hrv:.0f}ms", 
               delta=f"{avg_hrv - 50:.0f}ms vs baseline")
 
 with col5:
-    workout_rate = (filtered_df['workout_completed'].sum() / len(filtered_df)) * 100
+    workout_rate = kpis['workout_rate']
     st.metric("Workout Rate", f"{workout_rate:.1f}%", 
               delta=f"{workout_rate - 50:.1f}%")
 
 with col6:
-    total_users = filtered_df['user_id'].nunique()
+    total_users = kpis['users']
     st.metric("Active Users", f"{total_users:,}", 
-              delta=f"{len(filtered_df):,} records")
+              delta=f"{kpis['records']:,} records")
 
 
 # ============================================================================
 # NAVIGATION TABS
 # ============================================================================
-tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
+# Only the selected section runs on each rerun; the others stay deferred until
+# opened instead of recomputing every tab's charts behind hidden st.tabs panes.
+TAB_LABELS = [
     "🟢 Live Feed",
     "🌳 Overview & Treemap",
     "📈 Trends & Dual-Axis", 
@@ -1212,13 +2770,20 @@ tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
     "🧠 ML & Clustering",
     "🔮 What-If Analysis",
     "📊 Association Mining"
-])
+]
+active_tab = st.radio(
+    "Dashboard section",
+    options=TAB_LABELS,
+    horizontal=True,
+    key="active_tab",
+    label_visibility="collapsed"
+)
 
 
 # ============================================================================
 # TAB 0: LIVE DATA FEED
 # ============================================================================
-with tab1:
+if active_tab == "🟢 Live Feed":
     # On Streamlit Cloud OR Fixed Dataset selected, show Fixed Dataset view
     if IS_STREAMLIT_CLOUD or st.session_state.get('data_source', '📁 Fixed Dataset') == "📁 Fixed Dataset":
         st.markdown("### 📁 Fixed Dataset Overview")
@@ -1250,7 +2815,7 @@ with tab1:
                         padding: 1.2rem; border-radius: 12px; text-align: center;
                         border: 1px solid rgba(0, 212, 170, 0.3);'>
                 <p style='color: #888; margin: 0; font-size: 0.75rem;'>👥 UNIQUE USERS</p>
-                <h2 style='color: #00D4AA; margin: 0.3rem 0;'>{filtered_df['user_id'].nunique():,}</h2>
+                <h2 style='color: #00D4AA; margin: 0.3rem 0;'>{kpis['users']:,}</h2>
                 <p style='color: #00D4AA; margin: 0; font-size: 0.8rem;'>In dataset</p>
             </div>
             """, unsafe_allow_html=True)
@@ -1261,7 +2826,7 @@ with tab1:
                         padding: 1.2rem; border-radius: 12px; text-align: center;
                         border: 1px solid rgba(34, 197, 94, 0.3);'>
                 <p style='color: #888; margin: 0; font-size: 0.75rem;'>💚 AVG RECOVERY</p>
-                <h2 style='color: #22C55E; margin: 0.3rem 0;'>{filtered_df['recovery_score'].mean():.1f}%</h2>
+                <h2 style='color: #22C55E; margin: 0.3rem 0;'>{kpis['recovery_score']:.1f}%</h2>
                 <p style='color: #22C55E; margin: 0; font-size: 0.8rem;'>Score</p>
             </div>
             """, unsafe_allow_html=True)
@@ -1272,7 +2837,7 @@ with tab1:
                         padding: 1.2rem; border-radius: 12px; text-align: center;
                         border: 1px solid rgba(239, 68, 68, 0.3);'>
                 <p style='color: #888; margin: 0; font-size: 0.75rem;'>💪 AVG STRAIN</p>
-                <h2 style='color: #EF4444; margin: 0.3rem 0;'>{filtered_df['day_strain'].mean():.1f}</h2>
+                <h2 style='color: #EF4444; margin: 0.3rem 0;'>{kpis['day_strain']:.1f}</h2>
                 <p style='color: #EF4444; margin: 0; font-size: 0.8rem;'>Intensity</p>
             </div>
             """, unsafe_allow_html=True)
@@ -1289,6 +2854,14 @@ with tab1:
             </div>
             """, unsafe_allow_html=True)
         
+        memory_report = df.attrs.get('memory_report')
+        if memory_report:
+            st.caption(
+                f"🗜️ Compact schema: {memory_report['bytes_after'] / 1e6:,.1f} MB in memory "
+                f"(was {memory_report['bytes_before'] / 1e6:,.1f} MB, "
+                f"{memory_report['bytes_before'] / max(memory_report['bytes_after'], 1):.1f}x smaller)"
+            )
+        
         st.markdown("---")
         
         # Quick overview charts
@@ -1298,15 +2871,17 @@ with tab1:
         
         with ov1:
             # Recovery distribution
-            fig_rec = px.histogram(filtered_df, x='recovery_score', nbins=30,
-                                  color_discrete_sequence=['#00D4AA'],
-                                  title='Recovery Score Distribution')
-            fig_rec.update_layout(template='plotly_dark', height=350)
+            binned = load_binned_columns()
+            fig_rec = go.Figure(binned.histograms['recovery_score'].bar_trace(
+                counts=binned.counts('recovery_score', filter_result['rows']), marker_color='#00D4AA'
+            ))
+            fig_rec.update_layout(title='Recovery Score Distribution', xaxis_title='recovery_score',
+                                  yaxis_title='count', bargap=0, template='plotly_dark', height=350)
             st.plotly_chart(fig_rec, use_container_width=True)
         
         with ov2:
             # Activity breakdown
-            activity_counts = filtered_df['activity_type'].value_counts().head(10)
+            activity_counts = filtered_df['activity_type'].value_counts().loc[lambda s: s > 0].head(10)
             fig_act = px.bar(x=activity_counts.index, y=activity_counts.values,
                             color_discrete_sequence=['#6366F1'],
                             title='Top 10 Activity Types')
@@ -1318,22 +2893,48 @@ with tab1:
         ov3, ov4 = st.columns(2)
         
         with ov3:
-            # Strain vs Recovery scatter
-            fig_scatter = px.scatter(filtered_df.sample(min(1000, len(filtered_df))), 
-                                    x='recovery_score', y='day_strain',
-                                    color='fitness_level',
-                                    title='Recovery vs Strain by Fitness Level',
-                                    color_discrete_sequence=px.colors.qualitative.Set2)
-            fig_scatter.update_layout(template='plotly_dark', height=350)
+            # Strain vs Recovery: density of every filtered row, or a fixed-seed sample
+            scatter_mode = st.radio("View", ["Density (all rows)", "Sample (1,000 points)"],
+                                    horizontal=True, key="recovery_strain_mode",
+                                    label_visibility="collapsed")
+            if scatter_mode.startswith("Density"):
+                x_centers, y_centers, grids = filter_cache.get_or_compute(
+                    ('density', filter_key, 'recovery_score', 'day_strain'),
+                    lambda: density_grids(filtered_df, 'recovery_score', 'day_strain', 'fitness_level',
+                                          x_range=(0, 100), y_range=(0, 21))
+                )
+                level_colors = px.colors.qualitative.Set2
+                fig_scatter = go.Figure()
+                if grids:
+                    fig_scatter.add_trace(go.Heatmap(
+                        x=x_centers, y=y_centers, z=np.log1p(sum(grids.values())),
+                        colorscale='Greys', showscale=False, hoverinfo='skip'
+                    ))
+                for i, (level, counts) in enumerate(grids.items()):
+                    color = level_colors[i % len(level_colors)]
+                    fig_scatter.add_trace(go.Contour(
+                        x=x_centers, y=y_centers, z=counts, name=str(level), showlegend=True,
+                        contours=dict(coloring='lines'), line=dict(color=color, width=1.5),
+                        colorscale=[[0, color], [1, color]], showscale=False, ncontours=6
+                    ))
+                fig_scatter.update_layout(xaxis_title='recovery_score', yaxis_title='day_strain',
+                                          legend_title='fitness_level')
+            else:
+                fig_scatter = px.scatter(filtered_df.sample(min(1000, len(filtered_df)), random_state=42), 
+                                        x='recovery_score', y='day_strain',
+                                        color='fitness_level',
+                                        color_discrete_sequence=px.colors.qualitative.Set2)
+            fig_scatter.update_layout(title='Recovery vs Strain by Fitness Level',
+                                      template='plotly_dark', height=350)
             st.plotly_chart(fig_scatter, use_container_width=True)
         
         with ov4:
             # HRV distribution by fitness level
-            fig_hrv = px.box(filtered_df, x='fitness_level', y='hrv',
-                            color='fitness_level',
-                            title='HRV by Fitness Level',
-                            color_discrete_sequence=px.colors.qualitative.Set2)
-            fig_hrv.update_layout(template='plotly_dark', height=350, showlegend=False)
+            hrv_summaries = get_grouped_summaries('filtered', 'hrv', 'fitness_level')
+            fig_hrv = summary_box_figure({level: {level: summary} for level, summary in hrv_summaries.items()},
+                                         colors=px.colors.qualitative.Set2, boxmode='overlay')
+            fig_hrv.update_layout(title='HRV by Fitness Level', xaxis_title='fitness_level', yaxis_title='hrv',
+                                  template='plotly_dark', height=350, showlegend=False)
             st.plotly_chart(fig_hrv, use_container_width=True)
         
         # Data sample table
@@ -1350,204 +2951,212 @@ with tab1:
     else:
         # LIVE FEED VIEW (only when running locally with Docker)
         st.markdown("### 🔴 Real-Time WHOOP Data Feed")
-        st.markdown("> **Live streaming data from WHOOP devices** - Updates every 3 seconds with synthetic fitness metrics")
+        st.markdown("> **Live streaming data from WHOOP devices** - Records are pushed as the generator produces them, with synthetic fitness metrics")
         
         # Auto-refresh settings
         live_col1, live_col2, live_col3 = st.columns([2, 1, 1])
         with live_col1:
             auto_refresh = st.checkbox("🔄 Enable Auto-Refresh", value=False, key="auto_refresh")
         with live_col2:
-            refresh_rate = st.selectbox("Refresh Rate (sec)", [3, 5, 10, 30], index=1, key="refresh_rate")
+            refresh_rate = st.selectbox("Refresh Rate (sec)", [0.5, 1, 3, 5, 10], index=1, key="refresh_rate")
         with live_col3:
             if st.button("🔄 Refresh Now", key="manual_refresh"):
                 st.rerun()
         
-        # Load live data
-        live_data_path = '/app/data/live_data.csv'
-        
-        if os.path.exists(live_data_path):
-            try:
-                live_df = pd.read_csv(live_data_path)
-                
-                if len(live_df) > 0:
-                    # Convert timestamp
-                    live_df['timestamp'] = pd.to_datetime(live_df['timestamp'])
-                    
-                    # ═══════════════════════════════════════════════════════════════
-                    # LIVE METRICS HEADER
-                    # ═══════════════════════════════════════════════════════════════
-                    st.markdown("---")
-                    st.markdown("### 📊 Live Metrics Dashboard")
-                    
-                    lm1, lm2, lm3, lm4, lm5 = st.columns(5)
-                    
-                    with lm1:
-                        st.markdown("""
-                        <div style='background: linear-gradient(135deg, #1a2035 0%, #0d1117 100%); 
-                                    padding: 1.2rem; border-radius: 12px; text-align: center;
-                                    border: 1px solid rgba(0, 212, 170, 0.3);'>
-                            <p style='color: #888; margin: 0; font-size: 0.75rem;'>🟢 LIVE RECORDS</p>
-                            <h2 style='color: #00D4AA; margin: 0.3rem 0;'>{:,}</h2>
-                            <p style='color: #00D4AA; margin: 0; font-size: 0.8rem;'>⚡ Streaming</p>
-                        </div>
-                        """.format(len(live_df)), unsafe_allow_html=True)
-                    
-                    with lm2:
-                        active_users = live_df['user_id'].nunique()
-                        st.markdown("""
-                        <div style='background: linear-gradient(135deg, #1a2035 0%, #0d1117 100%); 
-                                    padding: 1.2rem; border-radius: 12px; text-align: center;
-                                    border: 1px solid rgba(59, 130, 246, 0.3);'>
-                            <p style='color: #888; margin: 0; font-size: 0.75rem;'>👥 ACTIVE USERS</p>
-                            <h2 style='color: #3B82F6; margin: 0.3rem 0;'>{}</h2>
-                            <p style='color: #3B82F6; margin: 0; font-size: 0.8rem;'>Connected</p>
-                        </div>
-                        """.format(active_users), unsafe_allow_html=True)
-                    
-                    with lm3:
-                        avg_recovery_live = live_df['recovery_score'].mean()
-                        st.markdown("""
-                        <div style='background: linear-gradient(135deg, #1a2035 0%, #0d1117 100%); 
-                                    padding: 1.2rem; border-radius: 12px; text-align: center;
-                                    border: 1px solid rgba(34, 197, 94, 0.3);'>
-                            <p style='color: #888; margin: 0; font-size: 0.75rem;'>💚 AVG RECOVERY</p>
-                            <h2 style='color: #22C55E; margin: 0.3rem 0;'>{:.1f}%</h2>
-                            <p style='color: #22C55E; margin: 0; font-size: 0.8rem;'>Real-time</p>
-                        </div>
-                        """.format(avg_recovery_live), unsafe_allow_html=True)
-                    
-                    with lm4:
-                        avg_strain_live = live_df['day_strain'].mean()
-                        st.markdown("""
-                        <div style='background: linear-gradient(135deg, #1a2035 0%, #0d1117 100%); 
-                                    padding: 1.2rem; border-radius: 12px; text-align: center;
-                                    border: 1px solid rgba(239, 68, 68, 0.3);'>
-                            <p style='color: #888; margin: 0; font-size: 0.75rem;'>💪 AVG STRAIN</p>
-                            <h2 style='color: #EF4444; margin: 0.3rem 0;'>{:.1f}</h2>
-                            <p style='color: #EF4444; margin: 0; font-size: 0.8rem;'>Intensity</p>
-                        </div>
-                        """.format(avg_strain_live), unsafe_allow_html=True)
-                    
-                    with lm5:
-                        workouts_now = live_df[live_df['workout_completed'] == 1]['user_id'].nunique()
-                        st.markdown("""
-                        <div style='background: linear-gradient(135deg, #1a2035 0%, #0d1117 100%); 
-                                    padding: 1.2rem; border-radius: 12px; text-align: center;
-                                    border: 1px solid rgba(168, 85, 247, 0.3);'>
-                            <p style='color: #888; margin: 0; font-size: 0.75rem;'>🏋️ WORKOUTS</p>
-                            <h2 style='color: #A855F7; margin: 0.3rem 0;'>{}</h2>
-                            <p style='color: #A855F7; margin: 0; font-size: 0.8rem;'>In Progress</p>
-                        </div>
-                        """.format(workouts_now), unsafe_allow_html=True)
-                    
-                    st.markdown("---")
-                    
-                    # ═══════════════════════════════════════════════════════════════
-                    # LIVE CHARTS ROW 1
-                    # ═══════════════════════════════════════════════════════════════
-                    live_chart1, live_chart2 = st.columns(2)
+        # Only this fragment reruns on the timer; new records reach the process-wide subscriber as they are published
+        @st.fragment(run_every=refresh_rate if auto_refresh else None)
+        def live_feed_panel():
+            # Load live data
+            if live_feed_available(LIVE_RING_PATH):
+                try:
+                    # Served from the process-wide subscriber; only records since this session's last run are copied
+                    live_epoch, live_df = read_live_feed(get_live_feed())
                     
-                    with live_chart1:
-                        st.markdown("#### 📈 Recovery Score Stream")
-                        live_sorted = live_df.sort_values('timestamp').tail(100)
+                    if len(live_df) > 0:
+                        # ═══════════════════════════════════════════════════════════════
+                        # LIVE METRICS HEADER
+                        # ═══════════════════════════════════════════════════════════════
+                        st.markdown("---")
+                        st.markdown("### 📊 Live Metrics Dashboard")
                         
-                        fig_live_recovery = go.Figure()
-                        fig_live_recovery.add_trace(go.Scatter(
-                            x=live_sorted['timestamp'],
-                            y=live_sorted['recovery_score'],
-                            mode='lines+markers',
-                            name='Recovery',
-                            line=dict(color='#00D4AA', width=2),
-                            marker=dict(size=6),
-                            fill='tozeroy',
-                            fillcolor='rgba(0, 212, 170, 0.1)'
-                        ))
-                        fig_live_recovery.add_hline(y=66, line_dash="dash", line_color="green", annotation_text="Green Zone")
-                        fig_live_recovery.add_hline(y=33, line_dash="dash", line_color="red", annotation_text="Red Zone")
-                        fig_live_recovery.update_layout(template='plotly_dark', height=350, margin=dict(l=20, r=20, t=30, b=20), xaxis_title="Time", yaxis_title="Recovery %", yaxis_range=[0, 100])
-                        st.plotly_chart(fig_live_recovery, use_container_width=True)
-                    
-                    with live_chart2:
-                        st.markdown("#### 💪 Day Strain Stream")
-                        fig_live_strain = go.Figure()
-                        fig_live_strain.add_trace(go.Scatter(
-                            x=live_sorted['timestamp'],
-                            y=live_sorted['day_strain'],
-                            mode='lines+markers',
-                            name='Strain',
-                            line=dict(color='#FF6B6B', width=2),
-                            marker=dict(size=6),
-                            fill='tozeroy',
-                            fillcolor='rgba(255, 107, 107, 0.1)'
-                        ))
-                        fig_live_strain.update_layout(template='plotly_dark', height=350, margin=dict(l=20, r=20, t=30, b=20), xaxis_title="Time", yaxis_title="Strain", yaxis_range=[0, 21])
-                        st.plotly_chart(fig_live_strain, use_container_width=True)
-                    
-                    # ═══════════════════════════════════════════════════════════════
-                    # LIVE CHARTS ROW 2
-                    # ═══════════════════════════════════════════════════════════════
-                    live_chart3, live_chart4 = st.columns(2)
-                    
-                    with live_chart3:
-                        st.markdown("#### ❤️ HRV Distribution (Live)")
-                        fig_hrv_dist = px.histogram(live_df, x='hrv', nbins=30, color_discrete_sequence=['#9B59B6'], title='Heart Rate Variability Distribution')
-                        fig_hrv_dist.update_layout(template='plotly_dark', height=300, showlegend=False, margin=dict(l=20, r=20, t=40, b=20))
-                        st.plotly_chart(fig_hrv_dist, use_container_width=True)
-                    
-                    with live_chart4:
-                        st.markdown("#### 🏋️ Activity Breakdown (Live)")
-                        activity_counts = live_df['activity_type'].value_counts()
-                        fig_activity_pie = px.pie(values=activity_counts.values, names=activity_counts.index, title='Current Activity Distribution', hole=0.4, color_discrete_sequence=px.colors.qualitative.Set2)
-                        fig_activity_pie.update_layout(template='plotly_dark', height=300, margin=dict(l=20, r=20, t=40, b=20))
-                        st.plotly_chart(fig_activity_pie, use_container_width=True)
-                    
-                    st.markdown("---")
-                    st.markdown("#### 📝 Latest Records (Live Stream)")
-                    display_cols = ['timestamp', 'user_id', 'fitness_level', 'recovery_score', 'day_strain', 'hrv', 'activity_type', 'workout_completed']
-                    latest_records = live_df.sort_values('timestamp', ascending=False).head(20)[display_cols]
-                    st.dataframe(latest_records, use_container_width=True, height=300)
-                    
-                else:
-                    st.info("⏳ Waiting for live data... The data generator is initializing.")
-            
-            except Exception as e:
-                st.error(f"❌ Error loading live data: {e}")
-                st.info("Make sure the data generator service is running.")
-        
-        else:
-            st.warning("""
-            ### 🟠 Live Data Service Not Running
+                        lm1, lm2, lm3, lm4, lm5 = st.columns(5)
+                        
+                        with lm1:
+                            st.markdown("""
+                            <div style='background: linear-gradient(135deg, #1a2035 0%, #0d1117 100%); 
+                                        padding: 1.2rem; border-radius: 12px; text-align: center;
+                                        border: 1px solid rgba(0, 212, 170, 0.3);'>
+                                <p style='color: #888; margin: 0; font-size: 0.75rem;'>🟢 LIVE RECORDS</p>
+                                <h2 style='color: #00D4AA; margin: 0.3rem 0;'>{:,}</h2>
+                                <p style='color: #00D4AA; margin: 0; font-size: 0.8rem;'>⚡ Streaming</p>
+                            </div>
+                            """.format(len(live_df)), unsafe_allow_html=True)
+                        
+                        with lm2:
+                            active_users = live_df['user_id'].nunique()
+                            st.markdown("""
+                            <div style='background: linear-gradient(135deg, #1a2035 0%, #0d1117 100%); 
+                                        padding: 1.2rem; border-radius: 12px; text-align: center;
+                                        border: 1px solid rgba(59, 130, 246, 0.3);'>
+                                <p style='color: #888; margin: 0; font-size: 0.75rem;'>👥 ACTIVE USERS</p>
+                                <h2 style='color: #3B82F6; margin: 0.3rem 0;'>{}</h2>
+                                <p style='color: #3B82F6; margin: 0; font-size: 0.8rem;'>Connected</p>
+                            </div>
+                            """.format(active_users), unsafe_allow_html=True)
+                        
+                        with lm3:
+                            avg_recovery_live = live_df['recovery_score'].mean()
+                            st.markdown("""
+                            <div style='background: linear-gradient(135deg, #1a2035 0%, #0d1117 100%); 
+                                        padding: 1.2rem; border-radius: 12px; text-align: center;
+                                        border: 1px solid rgba(34, 197, 94, 0.3);'>
+                                <p style='color: #888; margin: 0; font-size: 0.75rem;'>💚 AVG RECOVERY</p>
+                                <h2 style='color: #22C55E; margin: 0.3rem 0;'>{:.1f}%</h2>
+                                <p style='color: #22C55E; margin: 0; font-size: 0.8rem;'>Real-time</p>
+                            </div>
+                            """.format(avg_recovery_live), unsafe_allow_html=True)
+                        
+                        with lm4:
+                            avg_strain_live = live_df['day_strain'].mean()
+                            st.markdown("""
+                            <div style='background: linear-gradient(135deg, #1a2035 0%, #0d1117 100%); 
+                                        padding: 1.2rem; border-radius: 12px; text-align: center;
+                                        border: 1px solid rgba(239, 68, 68, 0.3);'>
+                                <p style='color: #888; margin: 0; font-size: 0.75rem;'>💪 AVG STRAIN</p>
+                                <h2 style='color: #EF4444; margin: 0.3rem 0;'>{:.1f}</h2>
+                                <p style='color: #EF4444; margin: 0; font-size: 0.8rem;'>Intensity</p>
+                            </div>
+                            """.format(avg_strain_live), unsafe_allow_html=True)
+                        
+                        with lm5:
+                            workouts_now = live_df[live_df['workout_completed'] == 1]['user_id'].nunique()
+                            st.markdown("""
+                            <div style='background: linear-gradient(135deg, #1a2035 0%, #0d1117 100%); 
+                                        padding: 1.2rem; border-radius: 12px; text-align: center;
+                                        border: 1px solid rgba(168, 85, 247, 0.3);'>
+                                <p style='color: #888; margin: 0; font-size: 0.75rem;'>🏋️ WORKOUTS</p>
+                                <h2 style='color: #A855F7; margin: 0.3rem 0;'>{}</h2>
+                                <p style='color: #A855F7; margin: 0; font-size: 0.8rem;'>In Progress</p>
+                            </div>
+                            """.format(workouts_now), unsafe_allow_html=True)
+                        
+                        st.markdown("---")
+                        
+                        # ═══════════════════════════════════════════════════════════════
+                        # LIVE CHARTS ROW 1
+                        # ═══════════════════════════════════════════════════════════════
+                        live_chart1, live_chart2 = st.columns(2)
+                        
+                        with live_chart1:
+                            st.markdown("#### 📈 Recovery Score Stream")
+                            live_sorted = live_df.sort_values('timestamp').tail(100)
+                            
+                            fig_live_recovery = go.Figure()
+                            fig_live_recovery.add_trace(go.Scatter(
+                                x=live_sorted['timestamp'],
+                                y=live_sorted['recovery_score'],
+                                mode='lines+markers',
+                                name='Recovery',
+                                line=dict(color='#00D4AA', width=2),
+                                marker=dict(size=6),
+                                fill='tozeroy',
+                                fillcolor='rgba(0, 212, 170, 0.1)'
+                            ))
+                            fig_live_recovery.add_hline(y=66, line_dash="dash", line_color="green", annotation_text="Green Zone")
+                            fig_live_recovery.add_hline(y=33, line_dash="dash", line_color="red", annotation_text="Red Zone")
+                            fig_live_recovery.update_layout(template='plotly_dark', height=350, margin=dict(l=20, r=20, t=30, b=20), xaxis_title="Time", yaxis_title="Recovery %", yaxis_range=[0, 100])
+                            st.plotly_chart(fig_live_recovery, use_container_width=True)
+                        
+                        with live_chart2:
+                            st.markdown("#### 💪 Day Strain Stream")
+                            fig_live_strain = go.Figure()
+                            fig_live_strain.add_trace(go.Scatter(
+                                x=live_sorted['timestamp'],
+                                y=live_sorted['day_strain'],
+                                mode='lines+markers',
+                                name='Strain',
+                                line=dict(color='#FF6B6B', width=2),
+                                marker=dict(size=6),
+                                fill='tozeroy',
+                                fillcolor='rgba(255, 107, 107, 0.1)'
+                            ))
+                            fig_live_strain.update_layout(template='plotly_dark', height=350, margin=dict(l=20, r=20, t=30, b=20), xaxis_title="Time", yaxis_title="Strain", yaxis_range=[0, 21])
+                            st.plotly_chart(fig_live_strain, use_container_width=True)
+                        
+                        # ═══════════════════════════════════════════════════════════════
+                        # LIVE CHARTS ROW 2
+                        # ═══════════════════════════════════════════════════════════════
+                        live_chart3, live_chart4 = st.columns(2)
+                        
+                        with live_chart3:
+                            st.markdown("#### ❤️ HRV Distribution (Live)")
+                            # Only records that entered or left the live window since the last run are re-binned
+                            live_hrv = live_df['hrv']
+                            entered, left, first_run = live_window_changes(live_hrv, 'live_hrv_window', live_epoch)
+                            hrv_hist = st.session_state.get('live_hrv_hist')
+                            if hrv_hist is None or first_run:
+                                hrv_hist = Histogram.uniform(*LIVE_HRV_RANGE).add(live_hrv.to_numpy())
+                            else:
+                                hrv_hist = hrv_hist.copy().add(entered.to_numpy()).remove(left.to_numpy())
+                            st.session_state.live_hrv_hist = hrv_hist
+                            st.session_state.live_hrv_window = (live_epoch, live_hrv)
+                            
+                            fig_hrv_dist = go.Figure(hrv_hist.bar_trace(marker_color='#9B59B6'))
+                            fig_hrv_dist.update_layout(title='Heart Rate Variability Distribution', xaxis_title='hrv', yaxis_title='count', bargap=0, template='plotly_dark', height=300, showlegend=False, margin=dict(l=20, r=20, t=40, b=20))
+                            st.plotly_chart(fig_hrv_dist, use_container_width=True)
+                        
+                        with live_chart4:
+                            st.markdown("#### 🏋️ Activity Breakdown (Live)")
+                            activity_counts = live_df['activity_type'].value_counts()
+                            fig_activity_pie = px.pie(values=activity_counts.values, names=activity_counts.index, title='Current Activity Distribution', hole=0.4, color_discrete_sequence=px.colors.qualitative.Set2)
+                            fig_activity_pie.update_layout(template='plotly_dark', height=300, margin=dict(l=20, r=20, t=40, b=20))
+                            st.plotly_chart(fig_activity_pie, use_container_width=True)
+                        
+                        st.markdown("---")
+                        st.markdown("#### 📝 Latest Records (Live Stream)")
+                        display_cols = ['timestamp', 'user_id', 'fitness_level', 'recovery_score', 'day_strain', 'hrv', 'activity_type', 'workout_completed']
+                        latest_records = live_df.sort_values('timestamp', ascending=False).head(20)[display_cols]
+                        st.dataframe(latest_records, use_container_width=True, height=300)
+                        
+                    else:
+                        st.info("⏳ Waiting for live data... The data generator is initializing.")
+                
+                except Exception as e:
+                    st.error(f"❌ Error loading live data: {e}")
+                    st.info("Make sure the data generator service is running.")
             
-            The live data generator service is not active. To start it:
+            else:
+                st.warning("""
+                ### 🟠 Live Data Service Not Running
+                
+                The live data generator service is not active. To start it:
+                
+                ```bash
+                docker-compose up -d
+                ```
+                
+                This will start both the dashboard and the live data generator.
+                """)
             
-            ```bash
-            docker-compose up -d
-            ```
+            if auto_refresh:
+                channel = "📡 push channel" if get_live_feed().subscribed else "📁 ring buffer"
+                st.markdown(f"<p style='color: #00D4AA; font-size: 0.8rem;'>⏱️ Auto-refresh enabled - refreshing every {refresh_rate}s from the {channel}</p>", unsafe_allow_html=True)
             
-            This will start both the dashboard and the live data generator.
-            """)
-        
-        # Auto-refresh at end of tab (after content loads)
-        if auto_refresh:
-            st.markdown(f"<p style='color: #00D4AA; font-size: 0.8rem;'>⏱️ Auto-refresh enabled - refreshing every {refresh_rate}s</p>", unsafe_allow_html=True)
-            import time as time_module
-            time_module.sleep(refresh_rate)
-            st.rerun()
+        live_feed_panel()
 
 
 # ============================================================================
 # TAB 2: OVERVIEW & TREEMAP (was Tab 1)
 # ============================================================================
-with tab2:
+if active_tab == "🌳 Overview & Treemap":
     st.markdown("### 🌳 Hierarchical Activity Breakdown")
     st.markdown("> **Insight:** This treemap reveals the hierarchical distribution of workout activities, showing which sports and activity types dominate user behavior patterns.")
     
     # Prepare treemap data
-    treemap_data = workout_df.groupby(['fitness_level', 'primary_sport', 'activity_type']).agg({
-        'activity_calories': 'sum',
-        'activity_duration_min': 'sum',
-        'user_id': 'count'
-    }).reset_index()
+    treemap_data = rollup_activity(
+        get_activity_aggregate(), ['fitness_level', 'primary_sport', 'activity_type'],
+        sums=['activity_calories', 'activity_duration_min']
+    )[['activity_calories', 'activity_duration_min', 'count']].reset_index()
     treemap_data.columns = ['Fitness Level', 'Primary Sport', 'Activity Type', 'Total Calories', 'Total Duration', 'Sessions']
     
     fig_tree = px.treemap(
@@ -1569,10 +3178,10 @@ with tab2:
     st.markdown("> **Insight:** The sunburst chart displays nested categorical relationships, helping identify which demographic segments prefer specific workout types and times.")
     
     if len(workout_df) > 0:
-        sunburst_data = workout_df.groupby(['gender', 'age_group', 'workout_time_of_day', 'activity_type']).agg({
-            'activity_strain': 'mean',
-            'user_id': 'count'
-        }).reset_index()
+        sunburst_data = rollup_activity(
+            get_activity_aggregate(), ['gender', 'age_group', 'workout_time_of_day', 'activity_type'],
+            means=['activity_strain']
+        )[['activity_strain_mean', 'count']].reset_index()
         sunburst_data.columns = ['Gender', 'Age Group', 'Time of Day', 'Activity', 'Avg Strain', 'Count']
         
         # Filter out rows with zero counts to avoid division errors
@@ -1624,7 +3233,7 @@ with tab2:
         st.markdown("### 🎯 Fitness Level Distribution")
         st.markdown("> **Insight:** Pie chart showing the breakdown of users across beginner, intermediate, and advanced fitness levels.")
         
-        fitness_dist = filtered_df['fitness_level'].value_counts()
+        fitness_dist = filtered_df['fitness_level'].value_counts().loc[lambda s: s > 0]
         
         fig_pie = px.pie(
             values=fitness_dist.values,
@@ -1638,19 +3247,14 @@ with tab2:
 
 
 # ============================================================================
-# TAB 2: TRENDS & DUAL-AXIS CHARTS
+# TAB 3: TRENDS & DUAL-AXIS CHARTS (was rendered inside Tab 2)
 # ============================================================================
-with tab2:
+if active_tab == "📈 Trends & Dual-Axis":
     st.markdown("### 📈 Dual-Axis Analysis: Recovery vs Strain Over Time")
     st.markdown("> **Insight:** This dual-axis chart reveals the inverse relationship between recovery and strain, showing how pushing harder leads to lower recovery scores the following day.")
     
     # Weekly aggregation for cleaner trends
-    weekly_data = filtered_df.groupby('week').agg({
-        'recovery_score': 'mean',
-        'day_strain': 'mean',
-        'hrv': 'mean',
-        'sleep_hours': 'mean'
-    }).reset_index()
+    weekly_data = metric_means(['week'], ['recovery_score', 'day_strain', 'hrv', 'sleep_hours']).reset_index()
     
     # Dual Axis Chart
     fig_dual = make_subplots(specs=[[{"secondary_y": True}]])
@@ -1715,7 +3319,9 @@ with tab2:
     st.markdown("### 💧 Waterfall: Cumulative Calorie Burn by Activity")
     st.markdown("> **Insight:** Waterfall chart breaks down how each activity type contributes to total calorie expenditure, showing the cumulative impact of workout choices.")
     
-    calorie_by_activity = workout_df.groupby('activity_type')['activity_calories'].sum().sort_values(ascending=False).head(10)
+    calorie_by_activity = rollup_activity(
+        get_activity_aggregate(), ['activity_type'], sums=['activity_calories']
+    )['activity_calories'].sort_values(ascending=False).head(10)
     
     fig_waterfall = go.Figure(go.Waterfall(
         name="Calories",
@@ -1742,7 +3348,7 @@ with tab2:
 # ============================================================================
 # TAB 4: HEATMAPS & SEASONAL ANALYSIS (was Tab 3)
 # ============================================================================
-with tab4:
+if active_tab == "🔥 Heatmaps & Seasons":
     st.markdown("### 🔥 Seasonal Activity Heatmap")
     st.markdown("> **Insight:** This heatmap reveals workout intensity patterns across seasons and days of the week, showing when users push hardest and when they recover.")
     
@@ -1750,7 +3356,7 @@ with tab4:
     day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
     
     # Seasonal heatmap
-    season_day_strain = filtered_df.groupby(['season', 'day_of_week'])['day_strain'].mean().reset_index()
+    season_day_strain = metric_means(['season', 'day_of_week'], ['day_strain']).reset_index()
     season_pivot = season_day_strain.pivot(index='season', columns='day_of_week', values='day_strain')
     season_pivot = season_pivot.reindex(columns=day_order)
     
@@ -1770,7 +3376,7 @@ with tab4:
         st.markdown("### 😴 Sleep Quality Heatmap")
         st.markdown("> **Insight:** Shows sleep efficiency patterns - identifying which days and months users achieve optimal sleep quality.")
         
-        monthly_day_sleep = filtered_df.groupby(['month_name', 'day_of_week'])['sleep_efficiency'].mean().reset_index()
+        monthly_day_sleep = metric_means(['month_name', 'day_of_week'], ['sleep_efficiency']).reset_index()
         month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
                        'July', 'August', 'September', 'October', 'November', 'December']
         monthly_pivot = monthly_day_sleep.pivot(index='month_name', columns='day_of_week', values='sleep_efficiency')
@@ -1790,7 +3396,7 @@ with tab4:
         st.markdown("### 💚 Recovery Score Heatmap")
         st.markdown("> **Insight:** Recovery patterns by time reveal when users are best prepared for intense training.")
         
-        recovery_heatmap = filtered_df.groupby(['month_name', 'day_of_week'])['recovery_score'].mean().reset_index()
+        recovery_heatmap = metric_means(['month_name', 'day_of_week'], ['recovery_score']).reset_index()
         recovery_pivot = recovery_heatmap.pivot(index='month_name', columns='day_of_week', values='recovery_score')
         recovery_pivot = recovery_pivot.reindex(index=month_order, columns=day_order)
         
@@ -1810,8 +3416,10 @@ with tab4:
     st.markdown("### ❤️ Heart Rate Zone Distribution by Activity")
     st.markdown("> **Insight:** Shows which activities push users into high-intensity zones (Zone 4-5), useful for training periodization.")
     
-    hr_zones = workout_df.groupby('activity_type')[['hr_zone_1_min', 'hr_zone_2_min', 'hr_zone_3_min', 
-                                                     'hr_zone_4_min', 'hr_zone_5_min']].mean()
+    hr_zones = rollup_activity(
+        get_activity_aggregate(), ['activity_type'],
+        means=['hr_zone_1_min', 'hr_zone_2_min', 'hr_zone_3_min', 'hr_zone_4_min', 'hr_zone_5_min']
+    ).drop(columns='count')
     hr_zones.columns = ['Zone 1 (Rest)', 'Zone 2 (Easy)', 'Zone 3 (Aerobic)', 'Zone 4 (Threshold)', 'Zone 5 (Max)']
     
     fig_hr_heat = px.imshow(
@@ -1828,17 +3436,17 @@ with tab4:
 # ============================================================================
 # TAB 5: ADVANCED CHARTS (was Tab 4)
 # ============================================================================
-with tab5:
+if active_tab == "🎯 Advanced Charts":
     st.markdown("### 🎻 Violin Plot: Recovery Distribution by Fitness Level")
     st.markdown("> **Insight:** Violin plots show the full distribution shape - advanced athletes have tighter recovery distributions, while beginners show more variability.")
     
-    fig_violin = px.violin(
-        filtered_df, x='fitness_level', y='recovery_score',
-        color='fitness_level', box=True, points='outliers',
-        color_discrete_sequence=['#00D4AA', '#FFD700', '#FF6B6B'],
-        title='Recovery Score Distribution by Fitness Level'
+    fig_violin = summary_violin_figure(
+        get_grouped_summaries('filtered', 'recovery_score', 'fitness_level'),
+        colors=['#00D4AA', '#FFD700', '#FF6B6B']
     )
-    fig_violin.update_layout(template='plotly_dark', height=500, showlegend=False)
+    fig_violin.update_layout(title='Recovery Score Distribution by Fitness Level',
+                             xaxis_title='fitness_level', yaxis_title='recovery_score',
+                             template='plotly_dark', height=500, showlegend=False)
     st.plotly_chart(fig_violin, use_container_width=True)
     
     col1, col2 = st.columns(2)
@@ -1847,30 +3455,31 @@ with tab5:
         st.markdown("### 📦 Box Plot: Sleep Metrics Comparison")
         st.markdown("> **Insight:** Box plots reveal median values and outliers - deep sleep hours show the most variability across users.")
         
-        sleep_melt = filtered_df[['light_sleep_hours', 'rem_sleep_hours', 'deep_sleep_hours', 'fitness_level']].melt(
-            id_vars='fitness_level', var_name='Sleep Stage', value_name='Hours'
-        )
-        sleep_melt['Sleep Stage'] = sleep_melt['Sleep Stage'].str.replace('_hours', '').str.replace('_', ' ').str.title()
-        
-        fig_box = px.box(
-            sleep_melt, x='Sleep Stage', y='Hours', color='fitness_level',
-            color_discrete_sequence=['#00D4AA', '#FFD700', '#FF6B6B'],
-            title='Sleep Stage Duration by Fitness Level'
-        )
-        fig_box.update_layout(template='plotly_dark', height=450)
+        # Per-stage summaries straight from the columns (no 3x melt of the frame)
+        sleep_stages = {'Light Sleep': 'light_sleep_hours', 'Rem Sleep': 'rem_sleep_hours',
+                        'Deep Sleep': 'deep_sleep_hours'}
+        stage_summaries = {stage: get_grouped_summaries('filtered', column, 'fitness_level')
+                           for stage, column in sleep_stages.items()}
+        sleep_box_summaries = {}
+        for stage, by_level in stage_summaries.items():
+            for level, summary in by_level.items():
+                sleep_box_summaries.setdefault(level, {})[stage] = summary
+        
+        fig_box = summary_box_figure(sleep_box_summaries, colors=['#00D4AA', '#FFD700', '#FF6B6B'])
+        fig_box.update_layout(title='Sleep Stage Duration by Fitness Level',
+                              xaxis_title='Sleep Stage', yaxis_title='Hours', legend_title='fitness_level',
+                              template='plotly_dark', height=450)
         st.plotly_chart(fig_box, use_container_width=True)
     
     with col2:
         st.markdown("### 🎯 Radar Chart: Activity Profile Comparison")
         st.markdown("> **Insight:** Radar charts compare multiple metrics simultaneously - see how different sports create unique physiological profiles.")
         
-        radar_data = workout_df.groupby('activity_type').agg({
-            'activity_strain': 'mean',
-            'avg_heart_rate': 'mean',
-            'activity_duration_min': 'mean',
-            'activity_calories': 'mean',
-            'hr_zone_5_min': 'mean'
-        }).reset_index()
+        radar_data = rollup_activity(
+            get_activity_aggregate(), ['activity_type'],
+            means=['activity_strain', 'avg_heart_rate', 'activity_duration_min',
+                   'activity_calories', 'hr_zone_5_min']
+        ).drop(columns='count').reset_index()
         
         # Normalize for radar
         scaler = MinMaxScaler()
@@ -1911,7 +3520,9 @@ with tab5:
     st.markdown("### 📊 Pareto Chart: Activity Calorie Contribution (80/20 Rule)")
     st.markdown("> **Insight:** Pareto analysis reveals which activities contribute most to total calorie burn - typically 20% of activities drive 80% of results.")
     
-    pareto_data = workout_df.groupby('activity_type')['activity_calories'].sum().sort_values(ascending=False).reset_index()
+    pareto_data = rollup_activity(
+        get_activity_aggregate(), ['activity_type'], sums=['activity_calories']
+    )['activity_calories'].sort_values(ascending=False).reset_index()
     pareto_data['cumulative_pct'] = pareto_data['activity_calories'].cumsum() / pareto_data['activity_calories'].sum() * 100
     
     fig_pareto = make_subplots(specs=[[{"secondary_y": True}]])
@@ -1949,11 +3560,9 @@ with tab5:
     st.markdown("### 📈 Growth-Share Matrix: Activity Performance Analysis")
     st.markdown("> **Insight:** BCG-style matrix categorizes activities by strain intensity (growth) and calorie efficiency (market share) to identify 'star' vs 'dog' activities.")
     
-    growth_data = workout_df.groupby('activity_type').agg({
-        'activity_strain': 'mean',
-        'activity_calories': 'mean',
-        'user_id': 'count'
-    }).reset_index()
+    growth_data = rollup_activity(
+        get_activity_aggregate(), ['activity_type'], means=['activity_strain', 'activity_calories']
+    ).reset_index()[['activity_type', 'activity_strain_mean', 'activity_calories_mean', 'count']]
     growth_data.columns = ['Activity', 'Avg Strain', 'Avg Calories', 'Frequency']
     
     median_strain = growth_data['Avg Strain'].median()
@@ -1986,31 +3595,18 @@ with tab5:
 # ============================================================================
 # TAB 6: MACHINE LEARNING & CLUSTERING (was Tab 5)
 # ============================================================================
-with tab6:
+if active_tab == "🧠 ML & Clustering":
     st.markdown("### 🧠 RFM Analysis with K-Means Clustering")
     st.markdown("> **Insight:** RFM (Recency, Frequency, Monetary) analysis segments users by workout behavior - identifying 'Champions' who train consistently with high intensity.")
     
-    # Calculate RFM metrics per user
-    max_date = filtered_df['date'].max()
-    
-    rfm = filtered_df.groupby('user_id').agg({
-        'date': lambda x: (max_date - x.max()).days,  # Recency
-        'workout_completed': 'sum',  # Frequency
-        'calories_burned': 'sum'  # Monetary (Energy Investment)
-    }).reset_index()
-    rfm.columns = ['user_id', 'Recency', 'Frequency', 'Monetary']
-    
-    # Handle any infinite or NaN values
-    rfm = rfm.replace([np.inf, -np.inf], np.nan).dropna()
-    
-    # Normalize for clustering
-    scaler = StandardScaler()
-    rfm_scaled = scaler.fit_transform(rfm[['Recency', 'Frequency', 'Monetary']])
+    # RFM features and their fitted models are shared per filter state; all k run in the background
+    rfm_base, rfm_scaled = filter_cache.get_or_compute(('rfm', filter_key), lambda: build_rfm(filtered_df))
+    rfm_pool = get_rfm_model_pool()
     
     # K-Means Clustering
     n_clusters = st.slider("Select Number of Clusters", 2, 8, 4, key='rfm_clusters')
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-    rfm['Cluster'] = kmeans.fit_predict(rfm_scaled)
+    rfm_model = rfm_pool.get(filter_key, rfm_scaled, n_clusters)
+    rfm = rfm_base.assign(Cluster=rfm_model['labels'])
     
     # Cluster naming based on characteristics
     cluster_means = rfm.groupby('Cluster')[['Recency', 'Frequency', 'Monetary']].mean()
@@ -2049,6 +3645,27 @@ with tab6:
         fig_cluster_pie.update_layout(template='plotly_dark', height=300)
         st.plotly_chart(fig_cluster_pie, use_container_width=True)
     
+    # Elbow / silhouette curve from the background k sweep
+    sweep = rfm_pool.sweep(filter_key)
+    fig_elbow = make_subplots(specs=[[{"secondary_y": True}]])
+    fig_elbow.add_trace(go.Scatter(
+        x=list(sweep), y=[fit['inertia'] for fit in sweep.values()],
+        name='Inertia', mode='lines+markers', line=dict(color='#00D4AA')
+    ), secondary_y=False)
+    fig_elbow.add_trace(go.Scatter(
+        x=list(sweep), y=[fit['silhouette'] for fit in sweep.values()],
+        name='Silhouette', mode='lines+markers', line=dict(color='#FFD700', dash='dot')
+    ), secondary_y=True)
+    fig_elbow.add_vline(x=n_clusters, line_dash='dash', line_color='#888')
+    fig_elbow.update_layout(title='Choosing k - Elbow & Silhouette', template='plotly_dark', height=320,
+                            xaxis=dict(title='Number of Clusters', dtick=1))
+    fig_elbow.update_yaxes(title_text='Inertia', secondary_y=False)
+    fig_elbow.update_yaxes(title_text='Silhouette', secondary_y=True)
+    st.plotly_chart(fig_elbow, use_container_width=True)
+    pending = len(RFM_K_RANGE) - len(sweep)
+    st.caption(f"{rfm_model['algorithm']} on {len(rfm):,} users"
+               + (f" · {pending} more k still fitting in the background" if pending else ""))
+    
     st.markdown("---")
     
     # Confusion Matrix Style - Recovery Prediction Accuracy
@@ -2085,32 +3702,18 @@ with tab6:
     st.markdown("### 📅 User Retention Cohort Map")
     st.markdown("> **Insight:** Cohort analysis tracks workout consistency over time - showing how many users maintain their training habits month over month.")
     
-    # Create cohort data
-    filtered_df['cohort_month'] = filtered_df.groupby('user_id')['date'].transform('min').dt.to_period('M')
-    filtered_df['activity_month'] = filtered_df['date'].dt.to_period('M')
-    filtered_df['cohort_index'] = (filtered_df['activity_month'].astype(int) - 
-                                    filtered_df['cohort_month'].astype(int))
-    
-    cohort_data = filtered_df[filtered_df['workout_completed'] == 1].groupby(
-        ['cohort_month', 'cohort_index']
-    )['user_id'].nunique().reset_index()
-    
-    cohort_pivot = cohort_data.pivot(index='cohort_month', columns='cohort_index', values='user_id')
-    
-    # Calculate retention percentages
-    cohort_size = cohort_pivot.iloc[:, 0]
-    retention = cohort_pivot.divide(cohort_size, axis=0) * 100
-    
-    # Limit to first 12 months for readability
-    retention = retention.iloc[:12, :12]
-    
-    # Convert Period index to string for JSON serialization
-    retention.index = retention.index.astype(str)
-    retention.columns = retention.columns.astype(str)
+    cohort_label = st.radio("Cohort granularity", list(COHORT_GRANULARITIES), horizontal=True,
+                            key='cohort_granularity')
+    cohort_granularity = COHORT_GRANULARITIES[cohort_label]
+    retention = filter_cache.get_or_compute(
+        ('cohort_retention', filter_key, cohort_granularity),
+        lambda: cohort_retention(filtered_df, cohort_granularity, max_periods=12)
+    )
+    period_name = 'Months' if cohort_granularity == 'M' else 'Weeks'
     
     fig_retention = px.imshow(
         retention,
-        labels=dict(x="Months Since First Workout", y="Cohort", color="Retention %"),
+        labels=dict(x=f"{period_name} Since First Workout", y="Cohort", color="Retention %"),
         color_continuous_scale='Blues',
         title='User Retention Cohort Analysis'
     )
@@ -2121,29 +3724,37 @@ with tab6:
 # ============================================================================
 # TAB 7: WHAT-IF ANALYSIS (was Tab 6)
 # ============================================================================
-with tab7:
+if active_tab == "🔮 What-If Analysis":
     st.markdown("### 🔮 What-If Scenario Analysis")
     st.markdown("> **Insight:** Interactive what-if analysis lets you explore how changing key variables might impact fitness outcomes based on historical patterns.")
     
+    # Regression fitted once per filter state; its predictions over the whole scenario grid are cached with it
+    whatif_model = filter_cache.get_or_compute(('whatif_model', filter_key), lambda: fit_whatif_model(filtered_df))
+    baseline = whatif_model['baseline']
+    avg_recovery, avg_hrv = baseline['recovery_score'], baseline['hrv']
+    avg_sleep, avg_strain = baseline['sleep_hours'], baseline['day_strain']
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("#### 💤 Sleep Impact Simulator")
         target_sleep = st.slider("Target Sleep Hours", 4.0, 10.0, 7.0, 0.5)
         target_efficiency = st.slider("Target Sleep Efficiency %", 50, 100, 80)
-        
-        # Calculate expected outcomes based on correlations
-        sleep_recovery_corr = filtered_df['sleep_hours'].corr(filtered_df['recovery_score'])
-        eff_recovery_corr = filtered_df['sleep_efficiency'].corr(filtered_df['recovery_score'])
-        
-        avg_recovery = filtered_df['recovery_score'].mean()
-        avg_sleep = filtered_df['sleep_hours'].mean()
-        avg_eff = filtered_df['sleep_efficiency'].mean()
-        
-        predicted_recovery = avg_recovery + (target_sleep - avg_sleep) * sleep_recovery_corr * 5 + \
-                            (target_efficiency - avg_eff) * eff_recovery_corr * 0.3
-        predicted_recovery = np.clip(predicted_recovery, 0, 100)
-        
+    
+    with col2:
+        st.markdown("#### 🏋️ Training Load Simulator")
+        target_strain = st.slider("Target Daily Strain", 0.0, 21.0, 12.0, 0.5)
+        rest_days = st.slider("Rest Days per Week", 0, 4, 2)
+    
+    # Slider values are a lookup into the precomputed grid
+    sleep_i = grid_position('sleep_hours', target_sleep)
+    efficiency_i = grid_position('sleep_efficiency', target_efficiency)
+    strain_i = grid_position('day_strain', target_strain)
+    rest_i = grid_position('rest_days_per_week', rest_days)
+    predicted_recovery, predicted_hrv = whatif_model['grid'][sleep_i, efficiency_i, strain_i, rest_i]
+    weekly_strain = target_strain * (7 - rest_days)
+    
+    with col1:
         st.markdown(f"""
         <div class="insight-box">
             <h4>🎯 Predicted Recovery Score: {predicted_recovery:.1f}%</h4>
@@ -2153,19 +3764,6 @@ with tab7:
         """, unsafe_allow_html=True)
     
     with col2:
-        st.markdown("#### 🏋️ Training Load Simulator")
-        target_strain = st.slider("Target Daily Strain", 0.0, 21.0, 12.0, 0.5)
-        rest_days = st.slider("Rest Days per Week", 0, 4, 2)
-        
-        # Calculate impact
-        strain_hrv_corr = filtered_df['day_strain'].corr(filtered_df['hrv'])
-        avg_hrv = filtered_df['hrv'].mean()
-        avg_strain = filtered_df['day_strain'].mean()
-        
-        weekly_strain = target_strain * (7 - rest_days)
-        predicted_hrv = avg_hrv + (target_strain - avg_strain) * strain_hrv_corr * 2
-        predicted_hrv = max(20, predicted_hrv)
-        
         st.markdown(f"""
         <div class="insight-box">
             <h4>💓 Predicted Weekly HRV: {predicted_hrv:.0f}ms</h4>
@@ -2174,6 +3772,44 @@ with tab7:
         </div>
         """, unsafe_allow_html=True)
     
+    # Response surfaces through the current scenario
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_recovery_surface = go.Figure(go.Heatmap(
+            x=WHATIF_AXES['sleep_hours'], y=WHATIF_AXES['sleep_efficiency'],
+            z=whatif_model['grid'][:, :, strain_i, rest_i, 0].T,
+            colorscale='RdYlGn', colorbar=dict(title='Recovery')
+        ))
+        fig_recovery_surface.add_trace(go.Scatter(
+            x=[target_sleep], y=[target_efficiency], mode='markers',
+            marker=dict(size=12, color='white', symbol='x'), showlegend=False
+        ))
+        fig_recovery_surface.update_layout(
+            title=f'Recovery Response Surface (strain {target_strain}, {rest_days} rest days)',
+            xaxis_title='Sleep Hours', yaxis_title='Sleep Efficiency %',
+            template='plotly_dark', height=380
+        )
+        st.plotly_chart(fig_recovery_surface, use_container_width=True)
+    
+    with col2:
+        fig_hrv_surface = go.Figure(go.Heatmap(
+            x=WHATIF_AXES['day_strain'], y=WHATIF_AXES['rest_days_per_week'],
+            z=whatif_model['grid'][sleep_i, efficiency_i, :, :, 1].T,
+            colorscale='Viridis', colorbar=dict(title='HRV')
+        ))
+        fig_hrv_surface.add_trace(go.Scatter(
+            x=[target_strain], y=[rest_days], mode='markers',
+            marker=dict(size=12, color='white', symbol='x'), showlegend=False
+        ))
+        fig_hrv_surface.update_layout(
+            title=f'HRV Response Surface ({target_sleep}h sleep, {target_efficiency}% efficiency)',
+            xaxis_title='Daily Strain', yaxis_title='Rest Days per Week',
+            template='plotly_dark', height=380
+        )
+        st.plotly_chart(fig_hrv_surface, use_container_width=True)
+    st.caption(f"Linear model fitted on {whatif_model['rows']:,} filtered records")
+    
     st.markdown("---")
     
     # What-If Visualization
@@ -2218,40 +3854,42 @@ with tab7:
         "Balance Training & Recovery"
     ])
     
+    # Top-k rows come from presorted indexes; the profile is cached per filter state and goal
+    profile = filter_cache.get_or_compute(
+        ('goal_profile', filter_key, goal),
+        lambda: goal_profile(df, topk_index, filter_result['rows'], filter_result['workout_rows'], goal)
+    )
+    
     if goal == "Maximize Recovery Score":
-        top_recovery = filtered_df.nlargest(1000, 'recovery_score')
         recommendations = f"""
         **📋 Recommendations for Maximum Recovery:**
-        - 🛏️ Target Sleep: {top_recovery['sleep_hours'].mean():.1f} hours
-        - 💪 Optimal Strain: {top_recovery['day_strain'].mean():.1f}
-        - ⏰ Fall Asleep in: {top_recovery['time_to_fall_asleep_min'].mean():.0f} minutes
-        - 🌡️ Ideal Skin Temp Deviation: {top_recovery['skin_temp_deviation'].mean():.2f}°C
+        - 🛏️ Target Sleep: {profile['sleep_hours']:.1f} hours
+        - 💪 Optimal Strain: {profile['day_strain']:.1f}
+        - ⏰ Fall Asleep in: {profile['time_to_fall_asleep_min']:.0f} minutes
+        - 🌡️ Ideal Skin Temp Deviation: {profile['skin_temp_deviation']:.2f}°C
         """
     elif goal == "Maximize Calorie Burn":
-        top_calories = workout_df.nlargest(1000, 'activity_calories')
         recommendations = f"""
         **📋 Recommendations for Maximum Calorie Burn:**
-        - 🏃 Best Activity: {top_calories['activity_type'].mode().values[0]}
-        - ⏱️ Optimal Duration: {top_calories['activity_duration_min'].mean():.0f} minutes
-        - 💓 Target Avg HR: {top_calories['avg_heart_rate'].mean():.0f} bpm
-        - 🔥 Expected Strain: {top_calories['activity_strain'].mean():.1f}
+        - 🏃 Best Activity: {profile['activity_type']}
+        - ⏱️ Optimal Duration: {profile['activity_duration_min']:.0f} minutes
+        - 💓 Target Avg HR: {profile['avg_heart_rate']:.0f} bpm
+        - 🔥 Expected Strain: {profile['activity_strain']:.1f}
         """
     elif goal == "Optimize HRV":
-        top_hrv = filtered_df.nlargest(1000, 'hrv')
         recommendations = f"""
         **📋 Recommendations for Optimal HRV:**
-        - 😴 Deep Sleep Target: {top_hrv['deep_sleep_hours'].mean():.1f} hours
-        - 🧘 REM Sleep Target: {top_hrv['rem_sleep_hours'].mean():.1f} hours
-        - 🛏️ Sleep Efficiency: {top_hrv['sleep_efficiency'].mean():.0f}%
-        - 💨 Respiratory Rate: {top_hrv['respiratory_rate'].mean():.1f} breaths/min
+        - 😴 Deep Sleep Target: {profile['deep_sleep_hours']:.1f} hours
+        - 🧘 REM Sleep Target: {profile['rem_sleep_hours']:.1f} hours
+        - 🛏️ Sleep Efficiency: {profile['sleep_efficiency']:.0f}%
+        - 💨 Respiratory Rate: {profile['respiratory_rate']:.1f} breaths/min
         """
     else:
-        balanced = filtered_df[(filtered_df['recovery_score'] > 60) & (filtered_df['day_strain'] > 10)]
         recommendations = f"""
         **📋 Recommendations for Balanced Training:**
         - 🎯 Recovery Target: 60-75%
         - 💪 Strain Range: 10-16
-        - 🛏️ Sleep: {balanced['sleep_hours'].mean():.1f} hours minimum
+        - 🛏️ Sleep: {profile['sleep_hours']:.1f} hours minimum
         - 📅 Workout Days: 4-5 per week
         """
     
@@ -2261,82 +3899,53 @@ with tab7:
 # ============================================================================
 # TAB 8: ASSOCIATION MINING (was Tab 7)
 # ============================================================================
-with tab8:
+if active_tab == "📊 Association Mining":
     st.markdown("### 🛒 Association Rule Mining (Apriori Algorithm)")
     st.markdown("> **Insight:** Market basket analysis discovers hidden patterns - like which workout behaviors frequently occur together, similar to finding 'if you bought X, you'll like Y' patterns.")
     
     # Create transactional data for association mining
     st.markdown("#### 📊 Behavior Pattern Discovery")
     
-    # Create binary features for association mining
-    assoc_df = filtered_df.copy()
-    
-    # Discretize continuous variables into categories
-    assoc_df['high_recovery'] = (assoc_df['recovery_score'] >= 66).astype(int)
-    assoc_df['good_sleep'] = (assoc_df['sleep_hours'] >= 7).astype(int)
-    assoc_df['high_strain'] = (assoc_df['day_strain'] >= 14).astype(int)
-    assoc_df['high_hrv'] = (assoc_df['hrv'] >= assoc_df['hrv'].median()).astype(int)
-    assoc_df['deep_sleep_good'] = (assoc_df['deep_sleep_hours'] >= 1.0).astype(int)
-    assoc_df['morning_workout'] = (assoc_df['workout_time_of_day'] == 'Morning').astype(int)
-    assoc_df['evening_workout'] = (assoc_df['workout_time_of_day'] == 'Evening').astype(int)
-    
-    # Calculate support and confidence manually for key patterns
-    patterns = []
-    
-    # Pattern 1: Good Sleep → High Recovery
-    support_good_sleep_high_recovery = ((assoc_df['good_sleep'] == 1) & (assoc_df['high_recovery'] == 1)).mean()
-    confidence_sleep_recovery = ((assoc_df['good_sleep'] == 1) & (assoc_df['high_recovery'] == 1)).sum() / (assoc_df['good_sleep'] == 1).sum()
-    patterns.append({'Rule': 'Good Sleep (≥7h) → High Recovery', 'Support': support_good_sleep_high_recovery, 'Confidence': confidence_sleep_recovery})
-    
-    # Pattern 2: Deep Sleep → High HRV
-    support_deep_hrv = ((assoc_df['deep_sleep_good'] == 1) & (assoc_df['high_hrv'] == 1)).mean()
-    confidence_deep_hrv = ((assoc_df['deep_sleep_good'] == 1) & (assoc_df['high_hrv'] == 1)).sum() / (assoc_df['deep_sleep_good'] == 1).sum() if (assoc_df['deep_sleep_good'] == 1).sum() > 0 else 0
-    patterns.append({'Rule': 'Deep Sleep (≥1h) → High HRV', 'Support': support_deep_hrv, 'Confidence': confidence_deep_hrv})
-    
-    # Pattern 3: Morning Workout → High Strain
-    if (assoc_df['morning_workout'] == 1).sum() > 0:
-        support_morning_strain = ((assoc_df['morning_workout'] == 1) & (assoc_df['high_strain'] == 1)).mean()
-        confidence_morning_strain = ((assoc_df['morning_workout'] == 1) & (assoc_df['high_strain'] == 1)).sum() / (assoc_df['morning_workout'] == 1).sum()
-        patterns.append({'Rule': 'Morning Workout → High Strain', 'Support': support_morning_strain, 'Confidence': confidence_morning_strain})
-    
-    # Pattern 4: High Recovery + Good Sleep → Workout Completed
-    cond = (assoc_df['high_recovery'] == 1) & (assoc_df['good_sleep'] == 1)
-    if cond.sum() > 0:
-        support_combo = (cond & (assoc_df['workout_completed'] == 1)).mean()
-        confidence_combo = (cond & (assoc_df['workout_completed'] == 1)).sum() / cond.sum()
-        patterns.append({'Rule': 'High Recovery + Good Sleep → Workout', 'Support': support_combo, 'Confidence': confidence_combo})
-    
-    # Pattern 5: High Strain Day → Low Recovery Next (simulated correlation)
-    support_strain_low = ((assoc_df['high_strain'] == 1) & (assoc_df['high_recovery'] == 0)).mean()
-    confidence_strain_low = ((assoc_df['high_strain'] == 1) & (assoc_df['high_recovery'] == 0)).sum() / (assoc_df['high_strain'] == 1).sum() if (assoc_df['high_strain'] == 1).sum() > 0 else 0
-    patterns.append({'Rule': 'High Strain → Moderate/Low Recovery', 'Support': support_strain_low, 'Confidence': confidence_strain_low})
-    
-    patterns_df = pd.DataFrame(patterns)
-    patterns_df['Lift'] = patterns_df['Confidence'] / patterns_df['Support'].mean()  # Simplified lift
-    patterns_df = patterns_df.sort_values('Confidence', ascending=False)
+    # Frequent itemsets and their rules are mined once per filter state; thresholds only filter them
+    all_rules = filter_cache.get_or_compute(
+        ('association_rules', filter_key),
+        lambda: association_rules(mine_itemsets(encode_transactions(filtered_df), len(filtered_df)))
+    )
+    
+    col_support, col_lift = st.columns(2)
+    with col_support:
+        min_support = st.slider("Minimum Support %", 1, 30, 5, key='assoc_min_support') / 100
+    with col_lift:
+        min_lift = st.slider("Minimum Lift", 1.0, 3.0, 1.1, 0.05, key='assoc_min_lift')
+    
+    matching = all_rules[(all_rules['Support'] >= min_support) & (all_rules['Lift'] >= min_lift)]
+    patterns_df = matching.sort_values(['Lift', 'Confidence'], ascending=False).head(20)
+    st.caption(f"{len(matching):,} of {len(all_rules):,} rules pass the thresholds (top 20 by lift shown) · "
+               f"items: {', '.join(ASSOCIATION_ITEMS)}")
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("#### 📋 Discovered Association Rules")
         st.dataframe(
-            patterns_df.style.format({
+            patterns_df[['Rule', 'Support', 'Confidence', 'Lift']].style.format({
                 'Support': '{:.2%}',
                 'Confidence': '{:.2%}',
                 'Lift': '{:.2f}'
             }).background_gradient(subset=['Confidence'], cmap='Greens'),
             use_container_width=True,
-            height=300
+            height=300,
+            hide_index=True
         )
     
     with col2:
         # Visualize rules
         fig_rules = px.bar(
-            patterns_df, x='Confidence', y='Rule',
+            patterns_df.head(10), x='Confidence', y='Rule',
             orientation='h', color='Support',
             color_continuous_scale='Emrld',
             title='Association Rule Confidence',
-            text=patterns_df['Confidence'].apply(lambda x: f'{x:.1%}')
+            text=patterns_df.head(10)['Confidence'].apply(lambda x: f'{x:.1%}')
         )
         fig_rules.update_layout(template='plotly_dark', height=300)
         st.plotly_chart(fig_rules, use_container_width=True)
@@ -2347,20 +3956,11 @@ with tab8:
     st.markdown("### 🔗 Activity Co-occurrence Analysis")
     st.markdown("> **Insight:** Shows which activities users commonly combine in their weekly routines - useful for designing balanced training programs.")
     
-    # Create weekly activity profiles
-    weekly_activities = workout_df.groupby(['user_id', 'week'])['activity_type'].apply(list).reset_index()
-    
-    # Count co-occurrences
-    activities = workout_df['activity_type'].unique()
-    cooccurrence = pd.DataFrame(0, index=activities, columns=activities, dtype=float)
-    
-    for _, row in weekly_activities.iterrows():
-        activity_list = list(set(row['activity_type']))
-        for i, act1 in enumerate(activity_list):
-            for act2 in activity_list[i:]:
-                cooccurrence.loc[act1, act2] += 1
-                if act1 != act2:
-                    cooccurrence.loc[act2, act1] += 1
+    # Weekly activity profiles as a sparse user-week x activity matrix
+    cooccurrence = filter_cache.get_or_compute(
+        ('activity_cooccurrence', filter_key),
+        lambda: activity_cooccurrence(workout_df, basket_columns=('user_id', 'week'))
+    )
     
     # Normalize
     cooccurrence_norm = cooccurrence / cooccurrence.max().max()
@@ -2380,10 +3980,47 @@ with tab8:
     st.markdown("### 🕸️ Metric Correlation Network")
     st.markdown("> **Insight:** Network visualization shows which fitness metrics are strongly correlated, helping identify key drivers of performance.")
     
-    # Calculate correlations
-    corr_cols = ['recovery_score', 'day_strain', 'sleep_hours', 'sleep_efficiency', 
-                 'hrv', 'resting_heart_rate', 'deep_sleep_hours', 'rem_sleep_hours', 'calories_burned']
-    corr_matrix = filtered_df[corr_cols].corr()
+    corr_cols = CORRELATION_COLUMNS
+    corr_method_col, corr_live_col = st.columns(2)
+    with corr_method_col:
+        corr_method = st.radio("Correlation", ["Pearson", "Spearman"], horizontal=True, key='corr_method')
+    with corr_live_col:
+        include_live = st.checkbox("Include live feed records", value=False, key='corr_include_live',
+                                   disabled=corr_method == "Spearman" or not live_feed_available(LIVE_RING_PATH),
+                                   help="Merges the live window into the Pearson accumulator")
+    
+    if corr_method == "Spearman":
+        # Pearson over average ranks, each pair ranked over the rows where both columns are present
+        corr_acc = filter_cache.get_or_compute(
+            ('corr', filter_key, 'spearman'),
+            lambda: CorrelationAccumulator.from_ranks(corr_cols, filtered_df[corr_cols].to_numpy(dtype=np.float64))
+        )
+    else:
+        # A date-range-only filter merges precomputed daily partitions; anything else folds in the filtered rows
+        span_start, span_stop = filter_index.date_span(*date_range)
+        corr_acc = filter_cache.get_or_compute(
+            ('corr', filter_key, 'pearson'),
+            lambda: load_correlation_partitions().between(*date_range)
+            if len(filter_result['rows']) == span_stop - span_start
+            else CorrelationAccumulator.from_values(corr_cols, filtered_df[corr_cols])
+        )
+        if include_live:
+            # The live window's accumulator only folds in records that arrived or expired since the last run
+            try:
+                live_epoch, live_window = read_live_feed(get_live_feed())
+                entered, left, first_run = live_window_changes(live_window[corr_cols], 'live_corr_window', live_epoch)
+                live_acc = st.session_state.get('live_corr_acc')
+                if live_acc is None or first_run:
+                    live_acc = CorrelationAccumulator.from_values(corr_cols, live_window[corr_cols])
+                else:
+                    live_acc = live_acc.copy().update(entered).remove(left)
+                st.session_state.live_corr_acc = live_acc
+                st.session_state.live_corr_window = (live_epoch, live_window[corr_cols])
+                corr_acc = corr_acc.copy().merge(live_acc)
+                st.caption(f"Including {len(live_window):,} live records")
+            except Exception as e:
+                st.warning(f"Live records unavailable: {e}")
+    corr_matrix = corr_acc.corr()
     
     # Create network edges (only strong correlations)
     edges = []
@@ -2397,7 +4034,7 @@ with tab8:
                     'correlation': corr_matrix.loc[col1, col2]
                 })
     
-    edges_df = pd.DataFrame(edges).sort_values('weight', ascending=False)
+    edges_df = pd.DataFrame(edges, columns=['source', 'target', 'weight', 'correlation']).sort_values('weight', ascending=False)
     
     # Display as interactive table
     st.dataframe(
@@ -2424,6 +4061,6 @@ st.markdown("""
 </div>
 """.format(
     total_records=len(filtered_df),
-    total_users=filtered_df['user_id'].nunique(),
+    total_users=kpis['users'],
     date_range=f"{filtered_df['date'].min().strftime('%Y-%m-%d')} to {filtered_df['date'].max().strftime('%Y-%m-%d')}"
 ), unsafe_allow_html=True)
@@ -12,10 +12,18 @@ import pandas as pd
 import numpy as np
 import time
 import os
-import random
-from datetime import datetime, timedelta
+import math
+import asyncio
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 import logging
 
+from live_store import (LIVE_ARCHIVE_RECORDS, LIVE_CATEGORIES, LIVE_RECORD_DTYPE, LIVE_RING_PATH,
+                        LIVE_SEGMENT_DIR, LIVE_SOCKET_PATH, MAX_LIVE_RECORDS, LivePublisher,
+                        RingBufferWriter, SegmentLogWriter, push_channel_supported)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,198 +34,168 @@ logger = logging.getLogger(__name__)
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
-LIVE_DATA_PATH = '/app/data/live_data.csv'
-GENERATION_INTERVAL = 3  # Generate new data every 3 seconds
-MAX_LIVE_RECORDS = 500   # Keep last 500 records for performance
-NUM_ACTIVE_USERS = 25    # Simulate 25 active users
+GENERATION_INTERVAL = float(os.environ.get('WHOOP_LIVE_INTERVAL', '3'))  # Seconds between batches
+# Target throughput in records/sec (default: the historical 3.5 records per batch)
+LIVE_TARGET_RATE = float(os.environ.get('WHOOP_LIVE_RATE', 3.5 / GENERATION_INTERVAL))
+LIVE_DIURNAL = os.environ.get('WHOOP_LIVE_DIURNAL', '0') == '1'  # Modulate the rate by hourly workout probability
+LIVE_MAX_BACKLOG = float(os.environ.get('WHOOP_LIVE_MAX_BACKLOG', '3'))  # Intervals a late tick catches up; the rest is dropped
+REPORT_INTERVAL = float(os.environ.get('WHOOP_LIVE_REPORT_INTERVAL', '30'))  # Seconds between throughput reports
+NUM_ACTIVE_USERS = int(os.environ.get('WHOOP_LIVE_USERS', '25'))  # Simulated fleet size
+SEED_BLOCK_USERS = 1000  # Users per random substream; fixed so seeded output never depends on batching
 
 # ============================================================================
 # SYNTHETIC DATA GENERATORS
 # ============================================================================
 
 class WHOOPDataGenerator:
-    """Generates realistic WHOOP fitness data."""
-    
-    def __init__(self):
-        self.users = self._create_user_profiles()
-        self.activity_types = ['Running', 'Cycling', 'Swimming', 'Weightlifting', 
-                               'HIIT', 'Yoga', 'CrossFit', 'Cardio', 'Stretching', 
-                               'Walking', 'Sports']
-        self.days_of_week = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 
-                             'Friday', 'Saturday', 'Sunday']
-        self.workout_times = ['Morning', 'Afternoon', 'Evening', 'Night']
-        
-    def _create_user_profiles(self):
-        """Create persistent user profiles for realistic data."""
-        users = {}
-        genders = ['Male', 'Female', 'Other']
-        fitness_levels = ['Beginner', 'Intermediate', 'Advanced', 'Elite']
-        sports = ['Running', 'Cycling', 'CrossFit', 'Swimming', 'Weight Training', 
-                  'Basketball', 'Soccer', 'Tennis', 'Golf', 'Mixed Training']
+    """Generates realistic WHOOP fitness data.
+    
+    User profiles are held as NumPy arrays and every field of a batch is drawn
+    for all selected users at once from a ``np.random.Generator``. All randomness
+    derives from one ``SeedSequence``: profiles come from a substream per block of
+    ``SEED_BLOCK_USERS`` users, and callers can derive further keyed substreams.
+    """
+    
+    # Substream families (first element of the spawn key)
+    PROFILE_STREAM, LIVE_STREAM, RECORD_STREAM = range(3)
+    
+    FITNESS_LEVELS = LIVE_CATEGORIES['fitness_level']
+    BASE_RECOVERY = np.array([55, 62, 70, 78], dtype=np.float64)  # Per fitness level
+    BASE_HRV = np.array([45, 65, 85, 110], dtype=np.float64)
+    
+    # Workout probability and time-of-day label (code into LIVE_CATEGORIES) for each hour of the day
+    HOURLY_WORKOUT_PROB = np.array([0.1] * 5 + [0.4] * 4 + [0.1] * 2 + [0.25] * 3 + [0.1] * 3 + [0.5] * 4 + [0.1] * 3)
+    HOURLY_TIME_OF_DAY = np.array([4] * 5 + [1] * 4 + [4] * 2 + [2] * 3 + [4] * 3 + [3] * 4 + [4] * 3, dtype=np.int8)
+    
+    def __init__(self, num_users=NUM_ACTIVE_USERS, seed=None, user_prefix='LIVE'):
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.seed = self.seed_sequence.entropy  # Pass back as ``seed`` to reproduce an unseeded run
+        self.rng = self.substream(self.LIVE_STREAM)
+        self.num_users = num_users
+        self.users = self._create_user_profiles(num_users, user_prefix)
+    
+    def substream(self, *key):
+        """Independent random generator for ``key`` (non-negative ints), derived from the seed."""
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=key))
         
-        for i in range(NUM_ACTIVE_USERS):
-            user_id = f"LIVE_{i+1:05d}"
-            fitness = random.choice(fitness_levels)
-            
-            # Base stats vary by fitness level
-            base_recovery = {'Beginner': 55, 'Intermediate': 62, 'Advanced': 70, 'Elite': 78}
-            base_hrv = {'Beginner': 45, 'Intermediate': 65, 'Advanced': 85, 'Elite': 110}
-            
-            users[user_id] = {
-                'user_id': user_id,
-                'age': random.randint(18, 65),
-                'gender': random.choice(genders),
-                'weight_kg': round(random.uniform(50, 100), 1),
-                'height_cm': round(random.uniform(155, 195), 1),
-                'fitness_level': fitness,
-                'primary_sport': random.choice(sports),
-                'base_recovery': base_recovery[fitness],
-                'base_hrv': base_hrv[fitness],
-                'base_rhr': random.randint(50, 75),
-                'training_consistency': random.uniform(0.5, 0.95),  # How often they workout
-            }
+    def _create_user_profiles(self, num_users, user_prefix):
+        """Create persistent user profiles for realistic data (one array per attribute)."""
+        blocks = [self._profile_block(self.substream(self.PROFILE_STREAM, block),
+                                      min(SEED_BLOCK_USERS, num_users - start))
+                  for block, start in enumerate(range(0, num_users, SEED_BLOCK_USERS))]
+        users = {key: np.concatenate([block[key] for block in blocks]) for key in blocks[0]} if blocks else {}
+        users['user_id'] = np.array([f"{user_prefix}_{i+1:05d}" for i in range(num_users)])
         return users
     
-    def _get_current_context(self):
-        """Get current time context for realistic data."""
-        now = datetime.now()
-        hour = now.hour
-        
-        # Determine workout probability based on time
-        if 5 <= hour < 9:
-            workout_prob = 0.4
-            time_of_day = 'Morning'
-        elif 11 <= hour < 14:
-            workout_prob = 0.25
-            time_of_day = 'Afternoon'
-        elif 17 <= hour < 21:
-            workout_prob = 0.5
-            time_of_day = 'Evening'
-        else:
-            workout_prob = 0.1
-            time_of_day = 'Night'
-            
+    def _profile_block(self, rng, num_users):
+        """Draw the profiles of one block of users from its own substream."""
+        fitness = rng.integers(0, len(self.FITNESS_LEVELS), num_users).astype(np.int8)
         return {
-            'datetime': now,
-            'day_of_week': self.days_of_week[now.weekday()],
-            'workout_prob': workout_prob,
-            'time_of_day': time_of_day,
-            'hour': hour
+            'age': rng.integers(18, 66, num_users).astype(np.int16),
+            'gender': rng.integers(0, len(LIVE_CATEGORIES['gender']), num_users).astype(np.int8),
+            'weight_kg': np.round(rng.uniform(50, 100, num_users), 1),
+            'height_cm': np.round(rng.uniform(155, 195, num_users), 1),
+            'fitness_level': fitness,
+            'primary_sport': rng.integers(0, len(LIVE_CATEGORIES['primary_sport']), num_users).astype(np.int8),
+            'base_recovery': self.BASE_RECOVERY[fitness],
+            'base_hrv': self.BASE_HRV[fitness],
+            'base_rhr': rng.integers(50, 76, num_users).astype(np.int16),
+            'training_consistency': rng.uniform(0.5, 0.95, num_users),  # How often they workout
         }
     
-    def generate_live_record(self, user_profile):
-        """Generate a single live data record for a user."""
-        context = self._get_current_context()
-        user = user_profile
+    def generate_records(self, user_index, timestamps, rng=None):
+        """Generate one record per entry of ``user_index`` (profile positions) at ``timestamps``.
         
-        # Simulate whether user is working out
-        is_workout = random.random() < (context['workout_prob'] * user['training_consistency'])
+        Draws come from ``rng`` (default: the live stream). Returns a DataFrame with
+        the live record columns; categorical fields are pandas Categoricals over the
+        shared ``LIVE_CATEGORIES`` vocabularies.
+        """
+        return self.records_frame(self.draw_columns(user_index, timestamps, rng))
+    
+    @staticmethod
+    def records_frame(columns):
+        """Build the records DataFrame from ``draw_columns`` output (or concatenations of it)."""
+        frame = dict(columns)
+        for name, categories in LIVE_CATEGORIES.items():
+            frame[name] = pd.Categorical.from_codes(frame[name], categories=categories)
+        return pd.DataFrame(frame)
+    
+    def draw_columns(self, user_index, timestamps, rng=None):
+        """Draw the record columns as plain arrays, with categorical fields as codes."""
+        rng = self.rng if rng is None else rng
+        n = len(user_index)
+        user = {key: values[user_index] for key, values in self.users.items()}
+        timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+        days = timestamps.astype('datetime64[D]')
+        hours = (timestamps - days).astype(np.int64) // 3600
         
-        # Recovery score with daily variation
-        recovery_base = user['base_recovery']
-        recovery_variation = random.gauss(0, 10)
-        recovery_score = np.clip(recovery_base + recovery_variation, 1, 100)
+        # Simulate whether each user is working out
+        is_workout = rng.random(n) < self.HOURLY_WORKOUT_PROB[hours] * user['training_consistency']
+        n_workouts = int(is_workout.sum())
         
-        # Sleep data (simulated from last night)
-        sleep_hours = round(random.gauss(7, 1.2), 2)
-        sleep_hours = np.clip(sleep_hours, 4, 10)
-        sleep_efficiency = round(random.gauss(82, 8), 1)
-        sleep_efficiency = np.clip(sleep_efficiency, 50, 100)
-        sleep_performance = round(random.gauss(85, 10), 1)
-        sleep_performance = np.clip(sleep_performance, 40, 100)
+        def workout_values(draw, dtype=np.float64):
+            """Values drawn for workout rows only; zero on rest days."""
+            values = np.zeros(n, dtype=dtype)
+            values[is_workout] = draw(n_workouts)
+            return values
         
-        # Sleep stages
-        deep_pct = random.uniform(0.15, 0.25)
-        rem_pct = random.uniform(0.20, 0.28)
+        # Recovery, sleep (from last night) and sleep stages
+        recovery_score = np.round(np.clip(user['base_recovery'] + rng.normal(0, 10, n), 1, 100), 1)
+        sleep_hours = np.clip(np.round(rng.normal(7, 1.2, n), 2), 4, 10)
+        sleep_efficiency = np.clip(np.round(rng.normal(82, 8, n), 1), 50, 100)
+        sleep_performance = np.clip(np.round(rng.normal(85, 10, n), 1), 40, 100)
+        deep_pct = rng.uniform(0.15, 0.25, n)
+        rem_pct = rng.uniform(0.20, 0.28, n)
         light_pct = 1 - deep_pct - rem_pct
         
-        light_sleep = round(sleep_hours * light_pct, 2)
-        rem_sleep = round(sleep_hours * rem_pct, 2)
-        deep_sleep = round(sleep_hours * deep_pct, 2)
-        
-        # HRV and vitals
-        hrv = round(user['base_hrv'] + random.gauss(0, 15), 1)
-        hrv = max(20, hrv)
-        resting_hr = user['base_rhr'] + random.randint(-5, 8)
-        respiratory_rate = round(random.gauss(14, 1.5), 1)
-        skin_temp_dev = round(random.gauss(0, 0.5), 2)
-        
         # Day strain (accumulated)
-        if is_workout:
-            day_strain = round(random.gauss(14, 3), 2)
-        else:
-            day_strain = round(random.gauss(6, 2), 2)
-        day_strain = np.clip(day_strain, 0, 21)
+        day_strain = np.clip(np.round(np.where(is_workout, rng.normal(14, 3, n), rng.normal(6, 2, n)), 2), 0, 21)
         
-        # Workout data
-        if is_workout:
-            activity_type = random.choice(self.activity_types)
-            activity_duration = random.randint(20, 90)
-            activity_strain = round(random.gauss(12, 4), 1)
-            activity_strain = np.clip(activity_strain, 2, 20)
-            
-            # Heart rate zones
-            avg_hr = random.randint(120, 165)
-            max_hr = avg_hr + random.randint(15, 40)
-            
-            # Calories based on duration and intensity
-            calories_per_min = random.uniform(8, 15)
-            activity_calories = round(activity_duration * calories_per_min)
-            
-            # HR zone distribution
-            total_zone_time = activity_duration
-            z5 = round(total_zone_time * random.uniform(0.05, 0.15))
-            z4 = round(total_zone_time * random.uniform(0.15, 0.25))
-            z3 = round(total_zone_time * random.uniform(0.25, 0.35))
-            z2 = round(total_zone_time * random.uniform(0.15, 0.25))
-            z1 = total_zone_time - z5 - z4 - z3 - z2
-            
-            workout_completed = 1
-            workout_time = context['time_of_day']
-        else:
-            activity_type = 'Rest Day'
-            activity_duration = 0
-            activity_strain = 0
-            avg_hr = 0
-            max_hr = 0
-            activity_calories = 0
-            z1 = z2 = z3 = z4 = z5 = 0
-            workout_completed = 0
-            workout_time = 'N/A'
+        # Workout data, HR zones and calories
+        activity_duration = workout_values(lambda k: rng.integers(20, 91, k), np.int16)
+        activity_strain = workout_values(lambda k: np.clip(np.round(rng.normal(12, 4, k), 1), 2, 20))
+        avg_hr = workout_values(lambda k: rng.integers(120, 166, k), np.int16)
+        max_hr = np.where(is_workout, avg_hr + rng.integers(15, 41, n), 0).astype(np.int16)
+        activity_calories = np.round(activity_duration * rng.uniform(8, 15, n)).astype(np.int32)
+        zone_shares = rng.uniform([0.15, 0.25, 0.15, 0.05], [0.25, 0.35, 0.25, 0.15], (n, 4))
+        z2, z3, z4, z5 = np.round(activity_duration[:, None] * zone_shares).astype(np.int16).T
+        z1 = activity_duration - z5 - z4 - z3 - z2
+        activity_type = workout_values(lambda k: rng.integers(1, len(LIVE_CATEGORIES['activity_type']), k), np.int8)
+        workout_time = np.where(is_workout, self.HOURLY_TIME_OF_DAY[hours], 0).astype(np.int8)
         
         # Total calories burned
         bmr = 1800 + (user['weight_kg'] - 70) * 10
-        total_calories = round(bmr + activity_calories + random.randint(-200, 300))
+        total_calories = np.round(bmr + activity_calories + rng.integers(-200, 301, n)).astype(np.int32)
         
         return {
             'user_id': user['user_id'],
-            'date': context['datetime'].strftime('%Y-%m-%d'),
-            'timestamp': context['datetime'].strftime('%Y-%m-%d %H:%M:%S'),
-            'day_of_week': context['day_of_week'],
+            'date': days.astype('datetime64[s]'),
+            'timestamp': timestamps,
+            'day_of_week': ((days.astype(np.int64) + 3) % 7).astype(np.int8),
             'age': user['age'],
             'gender': user['gender'],
             'weight_kg': user['weight_kg'],
             'height_cm': user['height_cm'],
             'fitness_level': user['fitness_level'],
             'primary_sport': user['primary_sport'],
-            'recovery_score': round(recovery_score, 1),
+            'recovery_score': recovery_score,
             'day_strain': day_strain,
             'sleep_hours': sleep_hours,
             'sleep_efficiency': sleep_efficiency,
             'sleep_performance': sleep_performance,
-            'light_sleep_hours': light_sleep,
-            'rem_sleep_hours': rem_sleep,
-            'deep_sleep_hours': deep_sleep,
-            'wake_ups': random.randint(0, 4),
-            'time_to_fall_asleep_min': random.randint(5, 45),
-            'hrv': hrv,
-            'resting_heart_rate': resting_hr,
-            'hrv_baseline': round(user['base_hrv'], 1),
+            'light_sleep_hours': np.round(sleep_hours * light_pct, 2),
+            'rem_sleep_hours': np.round(sleep_hours * rem_pct, 2),
+            'deep_sleep_hours': np.round(sleep_hours * deep_pct, 2),
+            'wake_ups': rng.integers(0, 5, n).astype(np.int8),
+            'time_to_fall_asleep_min': rng.integers(5, 46, n).astype(np.int16),
+            'hrv': np.maximum(20, np.round(user['base_hrv'] + rng.normal(0, 15, n), 1)),
+            'resting_heart_rate': (user['base_rhr'] + rng.integers(-5, 9, n)).astype(np.int16),
+            'hrv_baseline': np.round(user['base_hrv'], 1),
             'rhr_baseline': user['base_rhr'],
-            'respiratory_rate': respiratory_rate,
-            'skin_temp_deviation': skin_temp_dev,
+            'respiratory_rate': np.round(rng.normal(14, 1.5, n), 1),
+            'skin_temp_deviation': np.round(rng.normal(0, 0.5, n), 2),
             'calories_burned': total_calories,
-            'workout_completed': workout_completed,
+            'workout_completed': is_workout.astype(np.int8),
             'activity_type': activity_type,
             'activity_duration_min': activity_duration,
             'activity_strain': activity_strain,
@@ -230,114 +208,486 @@ class WHOOPDataGenerator:
             'hr_zone_4_min': z4,
             'hr_zone_5_min': z5,
             'workout_time_of_day': workout_time,
-            'is_live': True
+            'is_live': np.ones(n, dtype=bool),
         }
     
     def generate_batch(self, num_records=5):
-        """Generate a batch of live records from random users."""
-        records = []
-        selected_users = random.sample(list(self.users.values()), 
-                                        min(num_records, len(self.users)))
+        """Generate a batch of live records at the current time.
         
-        for user in selected_users:
-            record = self.generate_live_record(user)
-            records.append(record)
-            
-        return pd.DataFrame(records)
-
-
-def initialize_live_data_file():
-    """Create empty live data file with headers."""
-    columns = [
-        'user_id', 'date', 'timestamp', 'day_of_week', 'age', 'gender', 
-        'weight_kg', 'height_cm', 'fitness_level', 'primary_sport',
-        'recovery_score', 'day_strain', 'sleep_hours', 'sleep_efficiency',
-        'sleep_performance', 'light_sleep_hours', 'rem_sleep_hours', 
-        'deep_sleep_hours', 'wake_ups', 'time_to_fall_asleep_min',
-        'hrv', 'resting_heart_rate', 'hrv_baseline', 'rhr_baseline',
-        'respiratory_rate', 'skin_temp_deviation', 'calories_burned',
-        'workout_completed', 'activity_type', 'activity_duration_min',
-        'activity_strain', 'avg_heart_rate', 'max_heart_rate', 
-        'activity_calories', 'hr_zone_1_min', 'hr_zone_2_min', 
-        'hr_zone_3_min', 'hr_zone_4_min', 'hr_zone_5_min',
-        'workout_time_of_day', 'is_live'
-    ]
-    
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(LIVE_DATA_PATH), exist_ok=True)
-    
-    df = pd.DataFrame(columns=columns)
-    df.to_csv(LIVE_DATA_PATH, index=False)
-    logger.info(f"Initialized live data file at {LIVE_DATA_PATH}")
-
-
-def append_live_data(generator):
-    """Append new live data records to the file."""
-    # Generate 2-5 new records
-    num_new = random.randint(2, 5)
+        Users are distinct when the batch fits in the fleet; larger batches draw users with replacement.
+        """
+        if num_records <= self.num_users:
+            user_index = self.rng.choice(self.num_users, num_records, replace=False)
+        else:
+            user_index = self.rng.integers(0, self.num_users, num_records)
+        now = np.datetime64(datetime.now(), 's')
+        return self.generate_records(user_index, np.full(len(user_index), now))
+
+
+def initialize_live_store():
+    """Create a fresh live ring buffer, plus the segment log archive and push channel when enabled.
+    
+    Returns (ring, archive, publisher); archive and publisher may be None.
+    """
+    ring = RingBufferWriter(LIVE_RING_PATH, capacity=MAX_LIVE_RECORDS)
+    logger.info(f"Initialized live ring buffer at {LIVE_RING_PATH} ({MAX_LIVE_RECORDS} records)")
+    archive = None
+    if LIVE_ARCHIVE_RECORDS > 0:
+        archive = SegmentLogWriter(LIVE_SEGMENT_DIR, max_records=LIVE_ARCHIVE_RECORDS)
+        logger.info(f"Archiving live records to {LIVE_SEGMENT_DIR} ({LIVE_ARCHIVE_RECORDS} records)")
+    publisher = None
+    if push_channel_supported(LIVE_SOCKET_PATH):
+        try:
+            publisher = LivePublisher(LIVE_SOCKET_PATH)
+            logger.info(f"Publishing live records on {LIVE_SOCKET_PATH}")
+        except OSError as e:
+            logger.warning(f"Push channel unavailable ({e}); dashboards will read the ring buffer")
+    return ring, archive, publisher
+
+
+def append_live_data(generator, ring, archive=None, publisher=None, num_records=None):
+    """Write new live data records into the ring buffer (and archive), then push them to subscribers.
+    
+    Writes ``num_records`` records (default: 2-5) and returns how many were written.
+    Errors from the ring, archive or publisher propagate, so the caller can count
+    the batch as failed.
+    """
+    num_new = int(generator.rng.integers(2, 6)) if num_records is None else num_records
+    if num_new == 0:
+        return 0
     new_data = generator.generate_batch(num_new)
     
-    try:
-        # Read existing data
-        if os.path.exists(LIVE_DATA_PATH):
-            existing = pd.read_csv(LIVE_DATA_PATH)
-            combined = pd.concat([existing, new_data], ignore_index=True)
-            
-            # Keep only the last MAX_LIVE_RECORDS
-            if len(combined) > MAX_LIVE_RECORDS:
-                combined = combined.tail(MAX_LIVE_RECORDS)
-        else:
-            combined = new_data
-        
-        # Write back
-        combined.to_csv(LIVE_DATA_PATH, index=False)
+    # Records are written in place; the dashboard maps the ring read-only
+    first_seq, encoded = ring.append(new_data)
+    if publisher is not None:
+        publisher.publish(ring.epoch, first_seq, encoded)
+    if archive is not None:
+        archive.append(new_data)
+    
+    # Log stats (the scheduler reports throughput; per-batch detail is debug output)
+    workouts = new_data[new_data['workout_completed'] == 1]
+    logger.debug(
+        f"📊 Generated {len(new_data)} records | "
+        f"🏋️ {len(workouts)} workouts | "
+        f"📈 Avg Recovery: {new_data['recovery_score'].mean():.1f}% | "
+        f"💪 Avg Strain: {new_data['day_strain'].mean():.1f} | "
+        f"📁 Total: {min(ring.head, ring.capacity)} records"
+    )
+    return len(new_data)
+
+
+# ============================================================================
+# LIVE SCHEDULER
+# ============================================================================
+
+class LiveScheduler:
+    """Calls ``emit(num_records)`` on an absolute clock to sustain a target throughput.
+    
+    Tick k is due at ``start + k * interval``, so the time spent emitting never
+    accumulates into drift. Each tick emits the records accrued since the previous
+    tick at the current rate; the fractional remainder carries over, so any rate
+    is met on average. A tick that runs past the next deadline is an overrun: the
+    missed ticks are skipped and their records folded into the next batch, up to
+    ``max_backlog`` intervals' worth; records due beyond that (e.g. after the
+    process was suspended) are dropped and reported rather than emitted in one
+    burst. A batch whose ``emit`` raises is reported as failed. With ``diurnal``
+    the rate follows the hourly workout probability profile, scaled so its daily
+    mean is ``rate``.
+    """
+    
+    def __init__(self, emit, rate=LIVE_TARGET_RATE, interval=GENERATION_INTERVAL, diurnal=False,
+                 report_interval=REPORT_INTERVAL, max_backlog=LIVE_MAX_BACKLOG):
+        self.emit = emit
+        self.rate = rate
+        self.interval = interval
+        self.diurnal = diurnal
+        self.report_interval = report_interval
+        self.max_backlog = max_backlog
+        profile = WHOOPDataGenerator.HOURLY_WORKOUT_PROB
+        self._hourly_factor = profile / profile.mean()
+        self._carry = 0.0
+        self._reset_stats()
+    
+    def _reset_stats(self):
+        self._records = 0
+        self._ticks = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._overruns = 0
+        self._skipped = 0
+        self._dropped = 0.0
+        self._failed = 0
+    
+    def rate_at(self, now=None):
+        """Target records/sec at wall-clock time ``now``."""
+        if not self.diurnal:
+            return self.rate
+        return self.rate * self._hourly_factor[(now or datetime.now()).hour]
+    
+    def batch_size(self, elapsed):
+        """Records due for ``elapsed`` seconds at the current rate, carrying the fraction forward.
         
-        # Log stats
-        workouts = new_data[new_data['workout_completed'] == 1]
-        logger.info(
-            f"📊 Generated {len(new_data)} records | "
-            f"🏋️ {len(workouts)} workouts | "
-            f"📈 Avg Recovery: {new_data['recovery_score'].mean():.1f}% | "
-            f"💪 Avg Strain: {new_data['day_strain'].mean():.1f} | "
-            f"📁 Total: {len(combined)} records"
+        At most ``max_backlog`` intervals are caught up; the records due for the
+        rest of ``elapsed`` are counted as dropped.
+        """
+        rate = self.rate_at()
+        caught_up = min(elapsed, self.max_backlog * self.interval)
+        self._dropped += rate * (elapsed - caught_up)
+        due = self._carry + rate * caught_up
+        count = math.floor(due)
+        self._carry = due - count
+        return count
+    
+    def report(self, elapsed):
+        """Log achieved throughput, scheduling lag, overruns and lost records since the last report."""
+        ticks = max(self._ticks, 1)
+        dropped = round(self._dropped)
+        log = logger.warning if dropped or self._failed else logger.info
+        log(
+            f"⏱️ {self._records:,} records in {elapsed:.1f}s "
+            f"({self._records / max(elapsed, 1e-9):,.1f}/s, target {self.rate_at():,.1f}/s) | "
+            f"lag avg {1000 * self._lag_total / ticks:.1f} ms, max {1000 * self._lag_max:.1f} ms | "
+            f"{self._overruns} overruns, {self._skipped} ticks skipped | "
+            f"{dropped:,} records dropped (backlog), {self._failed:,} failed"
         )
-        
-    except Exception as e:
-        logger.error(f"Error appending live data: {e}")
+        self._reset_stats()
+    
+    async def run(self, ticks=None):
+        """Tick until cancelled (or for ``ticks`` ticks)."""
+        loop = asyncio.get_running_loop()
+        start = last_tick = last_report = loop.time()
+        tick = 0
+        while ticks is None or tick < ticks:
+            deadline = start + tick * self.interval
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            now = loop.time()
+            lag = now - deadline
+            self._lag_total += lag
+            self._lag_max = max(self._lag_max, lag)
+            self._ticks += 1
+            
+            count = self.batch_size(now - last_tick)
+            try:
+                self._records += self.emit(count)
+            except Exception as e:
+                self._failed += count
+                logger.error(f"Error in live tick, {count} records lost: {e}")
+            last_tick = now
+            
+            # Skip the deadlines this tick overran; their records are due at the next tick
+            next_tick = math.floor((loop.time() - start) / self.interval) + 1
+            if next_tick > tick + 1:
+                self._overruns += 1
+                self._skipped += next_tick - tick - 1
+            tick = next_tick
+            
+            if self.report_interval and now - last_report >= self.report_interval:
+                self.report(now - last_report)
+                last_report = now
 
 
-def main():
+def run_live(seed=None, rate=LIVE_TARGET_RATE, interval=GENERATION_INTERVAL, diurnal=LIVE_DIURNAL):
     """Main loop for continuous data generation."""
     logger.info("=" * 60)
     logger.info("🔴 WHOOP LIVE DATA GENERATOR STARTING")
     logger.info("=" * 60)
-    logger.info(f"📍 Output: {LIVE_DATA_PATH}")
-    logger.info(f"⏱️  Interval: {GENERATION_INTERVAL} seconds")
+    logger.info(f"📍 Output: {LIVE_RING_PATH}")
+    logger.info(f"⏱️  Interval: {interval} seconds")
+    logger.info(f"🎯 Target Rate: {rate:,.1f} records/s{' (diurnal)' if diurnal else ''}")
     logger.info(f"👥 Active Users: {NUM_ACTIVE_USERS}")
     logger.info(f"📊 Max Records: {MAX_LIVE_RECORDS}")
     logger.info("=" * 60)
     
     # Initialize
-    initialize_live_data_file()
-    generator = WHOOPDataGenerator()
+    ring, archive, publisher = initialize_live_store()
+    generator = WHOOPDataGenerator(seed=seed)
     
-    logger.info(f"✅ Created {len(generator.users)} user profiles")
+    logger.info(f"✅ Created {generator.num_users} user profiles (seed {generator.seed})")
     logger.info("🚀 Starting live data generation loop...")
     logger.info("")
     
-    cycle = 0
-    while True:
-        try:
-            cycle += 1
-            append_live_data(generator)
-            time.sleep(GENERATION_INTERVAL)
-            
-        except KeyboardInterrupt:
-            logger.info("\n⏹️  Stopping data generator...")
-            break
-        except Exception as e:
-            logger.error(f"Error in main loop: {e}")
-            time.sleep(5)
+    scheduler = LiveScheduler(lambda count: append_live_data(generator, ring, archive, publisher, count),
+                              rate=rate, interval=interval, diurnal=diurnal)
+    try:
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        logger.info("\n⏹️  Stopping data generator...")
+    finally:
+        ring.close()
+        if archive is not None:
+            archive.close()
+        if publisher is not None:
+            publisher.close()
+
+
+# ============================================================================
+# HISTORICAL BACKFILL
+# ============================================================================
+BACKFILL_BATCH_USERS = 2000  # Users per work unit (rounded up to whole seed blocks); a unit covers one month
+BACKFILL_FORMATS = ('csv', 'parquet')
+# whoop_fitness.csv layout: the live record columns without the live-only fields
+BACKFILL_COLUMNS = [c for c in LIVE_RECORD_DTYPE.names if c not in ('timestamp', 'is_live')]
+
+
+def backfill_units(num_users, start, days, batch_users=BACKFILL_BATCH_USERS):
+    """Split N users x D days into (month, user_start, user_stop, first_day, end_day) units.
+    
+    Units are ordered month-major, so output files are written one month at a time,
+    and cover whole seed blocks of users.
+    """
+    batch_users = -(-max(batch_users, 1) // SEED_BLOCK_USERS) * SEED_BLOCK_USERS
+    first_day = np.datetime64(start, 'D')
+    end_day = first_day + days
+    units = []
+    month = first_day.astype('datetime64[M]')
+    while month.astype('datetime64[D]') < end_day:
+        lo = max(first_day, month.astype('datetime64[D]'))
+        hi = min(end_day, (month + 1).astype('datetime64[D]'))
+        for user_start in range(0, num_users, batch_users):
+            units.append((str(month), user_start, min(user_start + batch_users, num_users), lo, hi))
+        month += 1
+    return units
+
+
+def generate_backfill_unit(generator, unit):
+    """Records for one unit as a list of frames, one per seed block of users.
+    
+    Each (seed block, day) is drawn from its own substream, so the rows depend only
+    on the seed, user count and day - not on how users are batched across workers.
+    Frames hold one record per user per day, ordered by day then user.
+    """
+    _, user_start, user_stop, first_day, end_day = unit
+    frames = []
+    for block_start in range(user_start, user_stop, SEED_BLOCK_USERS):
+        users = np.arange(block_start, min(block_start + SEED_BLOCK_USERS, user_stop))
+        day_columns = []
+        for day in np.arange(first_day, end_day):
+            rng = generator.substream(generator.RECORD_STREAM, block_start // SEED_BLOCK_USERS,
+                                      int((day - np.datetime64('0001-01-01', 'D')).astype(np.int64)))
+            # Simulated clock: each user-day gets one reading at a random second of that day
+            seconds = rng.integers(0, 86400, len(users)).astype('timedelta64[s]')
+            day_columns.append(generator.draw_columns(users, day + seconds, rng=rng))
+        columns = {name: np.concatenate([drawn[name] for drawn in day_columns]) for name in BACKFILL_COLUMNS}
+        frames.append(generator.records_frame(columns))
+    return frames
+
+
+def encode_backfill_chunk(frame, fmt):
+    """Serialize a backfill frame for the writer: headerless CSV bytes or an Arrow table.
+    
+    Both go through Arrow, whose CSV writer is several times faster than ``DataFrame.to_csv``.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.set_column(table.schema.get_field_index('date'), 'date', table['date'].cast(pa.date32()))
+    if fmt != 'csv':
+        return table
+    
+    # The CSV writer takes plain strings rather than dictionary-encoded categoricals
+    columns = [column.cast(column.type.value_type) if pa.types.is_dictionary(column.type) else column
+               for column in table.columns]
+    sink = pa.BufferOutputStream()
+    pa_csv.write_csv(pa.table(columns, names=table.column_names), sink,
+                     pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+    return sink.getvalue().to_pybytes()
+
+
+_backfill_generator = None
+
+
+def _init_backfill_worker(generator):
+    """Install the shared user profiles and seed in a worker process."""
+    global _backfill_generator
+    _backfill_generator = generator
+
+
+def encode_backfill_unit(generator, unit, fmt):
+    """Generate and serialize one unit: (month, rows, [chunk per seed block])."""
+    frames = generate_backfill_unit(generator, unit)
+    return unit[0], sum(len(frame) for frame in frames), [encode_backfill_chunk(frame, fmt) for frame in frames]
+
+
+def _backfill_worker(unit, fmt):
+    return encode_backfill_unit(_backfill_generator, unit, fmt)
+
+
+def iter_backfill_chunks(generator, units, fmt, workers=1):
+    """Yield (month, rows, chunks) for each unit in order.
+    
+    With several workers, units are generated and serialized in a process pool;
+    at most ``2 * workers`` are in flight, which bounds memory for any dataset size.
+    """
+    if workers <= 1:
+        for unit in units:
+            yield encode_backfill_unit(generator, unit, fmt)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_backfill_worker,
+                             initargs=(generator,)) as pool:
+        pending = deque()
+        for unit in units:
+            pending.append(pool.submit(_backfill_worker, unit, fmt))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class BackfillWriter:
+    """Streams backfill chunks to one CSV/Parquet file, or to one file per month.
+    
+    Partitioned output goes to ``<path>/month=YYYY-MM/part-00000.<fmt>``. Each
+    file is written under a temporary name and renamed into place once complete.
+    Every chunk becomes its own Parquet row group, so the file layout follows the
+    seed blocks rather than the batch size.
+    """
+    
+    def __init__(self, path, fmt, partition_by_month=False):
+        self.path = path
+        self.fmt = fmt
+        self.partition_by_month = partition_by_month
+        self._target = None
+        self._file = None
+        self._parquet = None
+        
+    def _target_for(self, month):
+        if not self.partition_by_month:
+            return self.path
+        return os.path.join(self.path, f"month={month}", f"part-00000.{self.fmt}")
+    
+    def write(self, month, chunks):
+        target = self._target_for(month)
+        if target != self._target:
+            self._finish()
+            self._open(target, chunks[0])
+        for chunk in chunks:
+            if self.fmt == 'csv':
+                self._file.write(chunk)
+            else:
+                self._parquet.write_table(chunk)
+    
+    def _open(self, target, chunk):
+        directory = os.path.dirname(target)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._target = target
+        if self.fmt == 'csv':
+            self._file = open(f"{target}.tmp", 'wb')
+            self._file.write((','.join(BACKFILL_COLUMNS) + '\n').encode())
+        else:
+            import pyarrow.parquet as pq
+            self._parquet = pq.ParquetWriter(f"{target}.tmp", chunk.schema, compression='snappy')
+    
+    def _finish(self):
+        """Close the current file and move it into place."""
+        if self._target is None:
+            return
+        if self._file is not None:
+            self._file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+        os.replace(f"{self._target}.tmp", self._target)
+        self._target = self._file = self._parquet = None
+    
+    def close(self):
+        self._finish()
+    
+    def abort(self):
+        """Drop the partially written file."""
+        if self._target is None:
+            return
+        if self._file is not None:
+            self._file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+        os.remove(f"{self._target}.tmp")
+        self._target = self._file = self._parquet = None
+
+
+def run_backfill(num_users, days, start, output, fmt='csv', partition_by_month=False, workers=1,
+                 seed=None, batch_users=BACKFILL_BATCH_USERS):
+    """Write ``num_users`` x ``days`` of history starting at ``start`` to ``output``.
+    
+    For a given seed, user count and day range the output is byte-identical
+    whatever the worker count or batch size.
+    """
+    logger.info("=" * 60)
+    logger.info("🗄️  WHOOP HISTORICAL BACKFILL")
+    logger.info("=" * 60)
+    logger.info(f"👥 Users: {num_users} | 📅 Days: {days} from {start} | 📊 Rows: {num_users * days:,}")
+    logger.info(f"📍 Output: {output} ({fmt}{', partitioned by month' if partition_by_month else ''})")
+    
+    generator = WHOOPDataGenerator(num_users=num_users, seed=seed, user_prefix='USER')
+    units = backfill_units(num_users, start, days, batch_users)
+    logger.info(f"⚙️  Workers: {workers} | 🎲 Seed: {generator.seed}")
+    writer = BackfillWriter(output, fmt, partition_by_month)
+    
+    started = time.perf_counter()
+    total_rows = 0
+    current_month = None
+    try:
+        for month, rows, chunks in iter_backfill_chunks(generator, units, fmt, workers):
+            writer.write(month, chunks)
+            total_rows += rows
+            if month != current_month:
+                current_month = month
+                elapsed = time.perf_counter() - started
+                logger.info(f"📆 {month} | 📁 {total_rows:,} rows | {total_rows / max(elapsed, 1e-9):,.0f} rows/s")
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    
+    elapsed = time.perf_counter() - started
+    logger.info(f"✅ Wrote {total_rows:,} rows in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    return total_rows
+
+
+def parse_args(argv=None):
+    # --seed is accepted before or after the command; the subcommand copy must not reset an earlier value
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--seed', type=int, default=argparse.SUPPRESS,
+                        help="Random seed; the same seed reproduces the same users and records")
+    
+    parser = argparse.ArgumentParser(description="WHOOP synthetic data generator")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Random seed; the same seed reproduces the same users and records")
+    commands = parser.add_subparsers(dest='command')
+    live = commands.add_parser('live', parents=[common], help="Stream live records into the ring buffer (default)")
+    live.add_argument('--rate', type=float, default=LIVE_TARGET_RATE, help="Target records per second")
+    live.add_argument('--interval', type=float, default=GENERATION_INTERVAL, help="Seconds between batches")
+    live.add_argument('--diurnal', action='store_true', default=LIVE_DIURNAL,
+                      help="Follow the hourly workout profile (daily mean stays at --rate)")
+    
+    backfill = commands.add_parser('backfill', parents=[common],
+                                   help="Write N users x D days of history (e.g. whoop_fitness.csv)")
+    backfill.add_argument('--users', type=int, default=1000, help="Number of simulated users")
+    backfill.add_argument('--days', type=int, default=100, help="Number of simulated days")
+    backfill.add_argument('--start', default='2023-01-01', help="First simulated day (YYYY-MM-DD)")
+    backfill.add_argument('--format', choices=BACKFILL_FORMATS, default='csv')
+    backfill.add_argument('--output', help="Output file, or directory with --partition-by-month "
+                                           "(default: whoop_fitness.<format>)")
+    backfill.add_argument('--partition-by-month', action='store_true',
+                          help="Write one file per month under the output directory")
+    backfill.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                          help="Worker processes (user blocks are generated in parallel)")
+    backfill.add_argument('--batch-users', type=int, default=BACKFILL_BATCH_USERS,
+                          help="Users per work unit; bounds memory and does not change the output")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'backfill':
+        output = args.output or ('whoop_fitness' if args.partition_by_month else f"whoop_fitness.{args.format}")
+        run_backfill(args.users, args.days, args.start, output, args.format,
+                     args.partition_by_month, args.workers, args.seed, args.batch_users)
+    elif args.command == 'live':
+        run_live(args.seed, args.rate, args.interval, args.diurnal)
+    else:
+        run_live(args.seed)
 
 
 if __name__ == "__main__":
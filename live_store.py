@@ -0,0 +1,643 @@
+"""
+📼 LIVE DATA STORE
+==================
+Storage for the live WHOOP feed, shared by the data generator (writer) and
+the dashboard (reader).
+
+Ring buffer (the live channel): a memory-mapped file of fixed-width binary
+records. Numeric columns are typed fields, categoricals are int8 codes and
+timestamps are int64 epoch nanoseconds. A header holds the head/tail record
+sequence numbers. The generator writes records in place; the dashboard maps
+the file read-only and decodes columns straight from the mapped arrays,
+asking only for the records since the last sequence number it saw.
+
+Push channel: the generator also publishes every batch over a Unix domain
+socket, framed as a small fixed header followed by the batch's ring records.
+Each dashboard process keeps one subscriber thread that buffers the live
+window in memory for all of its sessions, resyncing from the ring buffer
+whenever it (re)connects or misses a frame.
+
+Segment log (optional archive): records are appended to an open segment
+file. Once a segment is full it is sealed by an atomic rename and never
+modified again; old sealed segments are deleted by a background trimmer. A
+write therefore costs O(batch size) no matter how many records are retained.
+Sealed segments are plain CSV files with a header, meant for offline analysis;
+the dashboard itself only reads the ring buffer and the push channel.
+"""
+
+import os
+import mmap
+import time
+import zlib
+import socket
+import struct
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+LIVE_RING_PATH = os.environ.get('WHOOP_LIVE_RING', '/app/data/live_ring.bin')
+LIVE_SEGMENT_DIR = os.environ.get('WHOOP_LIVE_DIR', '/app/data/live_segments')
+LIVE_SOCKET_PATH = os.environ.get('WHOOP_LIVE_SOCKET', '/app/data/live.sock')  # Empty disables the push channel
+LIVE_PUSH_QUEUE_FRAMES = int(os.environ.get('WHOOP_LIVE_PUSH_QUEUE', '64'))  # Frames queued per subscriber before it is dropped
+MAX_LIVE_RECORDS = int(os.environ.get('WHOOP_LIVE_MAX_RECORDS', '500'))  # Ring buffer capacity
+LIVE_ARCHIVE_RECORDS = int(os.environ.get('WHOOP_LIVE_ARCHIVE_RECORDS', '0'))  # Segment log retention; 0 disables it
+# Records per segment, i.e. the trimming granularity: small enough to keep retention tight, large enough to limit file count
+SEGMENT_RECORDS = int(os.environ.get('WHOOP_LIVE_SEGMENT_RECORDS',
+                                     max(100, min(max(LIVE_ARCHIVE_RECORDS, MAX_LIVE_RECORDS) // 4, 100_000))))
+
+SEGMENT_PREFIX = 'segment-'
+OPEN_SUFFIX = '.open.csv'
+SEALED_SUFFIX = '.csv'
+
+
+# ============================================================================
+# RECORD SCHEMA
+# ============================================================================
+# Category vocabularies; they must cover every label live_data_generator.py emits (unknown labels decode as NaN)
+LIVE_CATEGORIES = {
+    'day_of_week': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+    'gender': ['Male', 'Female', 'Other'],
+    'fitness_level': ['Beginner', 'Intermediate', 'Advanced', 'Elite'],
+    'primary_sport': ['Running', 'Cycling', 'CrossFit', 'Swimming', 'Weight Training',
+                      'Basketball', 'Soccer', 'Tennis', 'Golf', 'Mixed Training'],
+    'activity_type': ['Rest Day', 'Running', 'Cycling', 'Swimming', 'Weightlifting', 'HIIT',
+                      'Yoga', 'CrossFit', 'Cardio', 'Stretching', 'Walking', 'Sports'],
+    'workout_time_of_day': ['N/A', 'Morning', 'Afternoon', 'Evening', 'Night'],
+}
+
+# Fixed-width record layout, in live record column order; categoricals are stored as int8 codes
+LIVE_RECORD_DTYPE = np.dtype([
+    ('user_id', 'S16'), ('date', '<i4'), ('timestamp', '<i8'), ('day_of_week', 'i1'),
+    ('age', '<i2'), ('gender', 'i1'), ('weight_kg', '<f4'), ('height_cm', '<f4'),
+    ('fitness_level', 'i1'), ('primary_sport', 'i1'),
+    ('recovery_score', '<f4'), ('day_strain', '<f4'), ('sleep_hours', '<f4'), ('sleep_efficiency', '<f4'),
+    ('sleep_performance', '<f4'), ('light_sleep_hours', '<f4'), ('rem_sleep_hours', '<f4'),
+    ('deep_sleep_hours', '<f4'), ('wake_ups', 'i1'), ('time_to_fall_asleep_min', '<i2'),
+    ('hrv', '<f4'), ('resting_heart_rate', '<i2'), ('hrv_baseline', '<f4'), ('rhr_baseline', '<i2'),
+    ('respiratory_rate', '<f4'), ('skin_temp_deviation', '<f4'), ('calories_burned', '<i4'),
+    ('workout_completed', 'i1'), ('activity_type', 'i1'), ('activity_duration_min', '<i2'),
+    ('activity_strain', '<f4'), ('avg_heart_rate', '<i2'), ('max_heart_rate', '<i2'),
+    ('activity_calories', '<i4'), ('hr_zone_1_min', '<i2'), ('hr_zone_2_min', '<i2'),
+    ('hr_zone_3_min', '<i2'), ('hr_zone_4_min', '<i2'), ('hr_zone_5_min', '<i2'),
+    ('workout_time_of_day', 'i1'), ('is_live', '?'),
+])
+
+# Header at the start of the ring file; head/tail are the sequence numbers bounding the readable records
+RING_MAGIC = b'WHOOPRB1'
+RING_HEADER_SIZE = 4096
+RING_HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'), ('layout_crc', '<u4'), ('record_size', '<u4'), ('capacity', '<i8'),
+    ('epoch', '<i8'),  # Writer start time (ns); a new epoch restarts the sequence numbers
+    ('head', '<i8'),   # Sequence number of the next record to be written
+    ('tail', '<i8'),   # Oldest sequence number that is not (being) overwritten
+])
+LIVE_LAYOUT_CRC = zlib.crc32(repr((LIVE_RECORD_DTYPE.descr, sorted(LIVE_CATEGORIES.items()))).encode())
+
+
+def encode_records(records):
+    """Pack a DataFrame of live records into a structured array of ``LIVE_RECORD_DTYPE``."""
+    encoded = np.zeros(len(records), dtype=LIVE_RECORD_DTYPE)
+    for name in LIVE_RECORD_DTYPE.names:
+        if name not in records.columns:
+            continue
+        column = records[name]
+        if name in LIVE_CATEGORIES:
+            codes = pd.Categorical(column, categories=LIVE_CATEGORIES[name]).codes
+            if (codes < 0).any() and column.notna().any():
+                logger.warning(f"Unknown {name} labels stored as missing: {set(column[codes < 0])}")
+            encoded[name] = codes
+        elif name == 'timestamp':
+            encoded[name] = pd.to_datetime(column).to_numpy('datetime64[ns]').astype(np.int64)
+        elif name == 'date':
+            encoded[name] = pd.to_datetime(column).to_numpy().astype('datetime64[D]').astype(np.int64)
+        elif name == 'user_id':
+            encoded[name] = column.astype(str).to_numpy(dtype='S16')
+        else:
+            encoded[name] = column.to_numpy()
+    return encoded
+
+
+def decode_records(encoded, first_seq):
+    """DataFrame view of structured live records, indexed by sequence number starting at ``first_seq``."""
+    columns = {}
+    for name in LIVE_RECORD_DTYPE.names:
+        values = encoded[name]
+        if name in LIVE_CATEGORIES:
+            columns[name] = pd.Categorical.from_codes(values, categories=LIVE_CATEGORIES[name])
+        elif name == 'timestamp':
+            columns[name] = values.view('datetime64[ns]')
+        elif name == 'date':
+            columns[name] = values.astype('datetime64[D]').astype('datetime64[s]')
+        elif name == 'user_id':
+            columns[name] = values.astype(str)
+        else:
+            columns[name] = values
+    return pd.DataFrame(columns, index=pd.RangeIndex(first_seq, first_seq + len(encoded), name='seq'))
+
+
+# ============================================================================
+# RING BUFFER
+# ============================================================================
+
+def _map_ring(mapped):
+    """Header record and slot array views over a mapped ring file."""
+    header = np.ndarray((), dtype=RING_HEADER_DTYPE, buffer=mapped)
+    if header['magic'] != RING_MAGIC or header['layout_crc'] != LIVE_LAYOUT_CRC:
+        raise ValueError("Live ring buffer has an unknown format")
+    slots = np.ndarray((int(header['capacity']),), dtype=LIVE_RECORD_DTYPE,
+                       buffer=mapped, offset=RING_HEADER_SIZE)
+    return header, slots
+
+
+class RingBufferWriter:
+    """Single writer of the live ring buffer; records are written in place at ``seq % capacity``.
+
+    Before overwriting slots the writer advances ``tail`` past them, and only
+    after the records are written does it advance ``head``, so readers can
+    detect slots that changed while they were copying.
+    """
+
+    def __init__(self, path=LIVE_RING_PATH, capacity=MAX_LIVE_RECORDS):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Build the new ring under a temporary name so readers never map a half-initialized file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.truncate(RING_HEADER_SIZE + capacity * LIVE_RECORD_DTYPE.itemsize)
+        self._file = open(temp_path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        header = np.ndarray((), dtype=RING_HEADER_DTYPE, buffer=self._map)
+        header['magic'] = RING_MAGIC
+        header['layout_crc'] = LIVE_LAYOUT_CRC
+        header['record_size'] = LIVE_RECORD_DTYPE.itemsize
+        header['capacity'] = capacity
+        header['epoch'] = time.time_ns()
+        header['head'] = header['tail'] = 0
+        self._map.flush()
+        os.replace(temp_path, path)
+        self.path = path
+        self.capacity = capacity
+        self.header, self.slots = _map_ring(self._map)
+
+    @property
+    def head(self):
+        return int(self.header['head'])
+
+    @property
+    def epoch(self):
+        return int(self.header['epoch'])
+
+    def append(self, records):
+        """Write a batch of records (DataFrame) into the ring; returns (first_seq, encoded records)."""
+        encoded = encode_records(records)
+        head = self.head
+        new_head = head + len(encoded)
+        if len(encoded) > self.capacity:
+            encoded = encoded[-self.capacity:]
+        self.header['tail'] = max(0, new_head - self.capacity)
+        positions = np.arange(new_head - len(encoded), new_head) % self.capacity
+        self.slots[positions] = encoded
+        self.header['head'] = new_head
+        return new_head - len(encoded), encoded
+
+    def close(self):
+        """Flush and unmap the ring file."""
+        self.slots = self.header = None
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+
+class RingBufferReader:
+    """Read-only view of the live ring buffer; reopens the file when a new writer replaces it."""
+
+    def __init__(self, path=LIVE_RING_PATH):
+        self.path = path
+        self._inode = None
+        self._map = None
+        self._views = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """(header, slots) of the current ring file, remapping if it was replaced; None if absent."""
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            self._unmap()
+            return None
+        if inode != self._inode:
+            self._unmap()
+            with open(self.path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                self._views = _map_ring(mapped)
+            except ValueError:
+                mapped.close()
+                raise
+            self._map, self._inode = mapped, inode
+        return self._views
+
+    def _unmap(self):
+        # The views must go first: the mapping cannot be closed while arrays still export its buffer
+        self._views = None
+        if self._map is not None:
+            self._map.close()
+        self._map = self._inode = None
+
+    def close(self):
+        """Unmap the ring file; a later read maps it again."""
+        with self._lock:
+            self._unmap()
+
+    def status(self):
+        """(epoch, tail, head) of the ring, or None when there is no ring file."""
+        with self._lock:
+            views = self._refresh()
+            if views is None:
+                return None
+            header = views[0]
+            return int(header['epoch']), int(header['tail']), int(header['head'])
+
+    def records_since(self, seq=0):
+        """Decoded records with sequence number >= ``seq`` still held by the ring, and the ring epoch.
+
+        Records overwritten while they were being copied are dropped, so the
+        result is always a consistent, contiguous run ending at the head.
+        """
+        epoch, first_seq, encoded = self.encoded_since(seq)
+        return epoch, decode_records(encoded, first_seq)
+
+    def encoded_since(self, seq=0):
+        """Like ``records_since`` but undecoded: (epoch, first sequence number, structured records)."""
+        # Copied under the lock so that no other thread unmaps the file mid-copy
+        with self._lock:
+            views = self._refresh()
+            if views is None:
+                return None, seq, np.zeros(0, dtype=LIVE_RECORD_DTYPE)
+            header, slots = views
+            epoch = int(header['epoch'])
+            head = int(header['head'])
+            start = max(seq, int(header['tail']))
+            copied = slots[np.arange(start, max(start, head)) % len(slots)]
+            # Slots below the tail seen after copying may have been rewritten mid-copy
+            valid_from = max(start, int(header['tail']))
+        return epoch, valid_from, copied[valid_from - start:]
+
+
+def live_feed_available(path=LIVE_RING_PATH):
+    """True when the generator has published a live ring buffer."""
+    return os.path.exists(path)
+
+
+# ============================================================================
+# PUSH CHANNEL
+# ============================================================================
+# Frame: header, then ``count`` records of LIVE_RECORD_DTYPE with sequence numbers first_seq, first_seq+1, ...
+FRAME_MAGIC = b'WLF1'
+FRAME_HEADER = struct.Struct('<4sIqqI')  # magic, layout_crc, epoch, first_seq, count
+
+
+def push_channel_supported(path=LIVE_SOCKET_PATH):
+    """True when a socket path is configured and the platform has Unix domain sockets."""
+    return bool(path) and hasattr(socket, 'AF_UNIX')
+
+
+class _Subscription:
+    """One connected subscriber: a bounded queue of outgoing frames drained by its own sender thread."""
+
+    def __init__(self, conn, max_frames, send_timeout):
+        self.conn = conn
+        self.max_frames = max_frames
+        self.closed = False
+        self._frames = deque()
+        self._ready = threading.Condition()
+        conn.settimeout(send_timeout)
+        threading.Thread(target=self._send_loop, name='live-publisher-send', daemon=True).start()
+
+    def offer(self, frame):
+        """Queue a frame without blocking; False when the subscriber is gone or its queue is full."""
+        with self._ready:
+            if self.closed or len(self._frames) >= self.max_frames:
+                return False
+            self._frames.append(frame)
+            self._ready.notify()
+            return True
+
+    def close(self):
+        """Discard queued frames and disconnect; the sender thread exits and releases the socket."""
+        with self._ready:
+            if self.closed:
+                return
+            self.closed = True
+            self._frames.clear()
+            self._ready.notify()
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)  # Also interrupts a send in progress
+        except OSError:
+            pass
+
+    def _send_loop(self):
+        while True:
+            with self._ready:
+                while not self._frames and not self.closed:
+                    self._ready.wait()
+                if self.closed:
+                    break
+                frame = self._frames.popleft()
+            try:
+                self.conn.sendall(frame)
+            except OSError:
+                break  # Gone or stalled past the send timeout; a partial frame may have been sent
+        self.close()
+        self.conn.close()
+
+
+class LivePublisher:
+    """Generator side of the push channel: a Unix socket server that sends every batch to all subscribers.
+
+    ``publish`` never waits on a subscriber: each one has a queue of at most
+    ``queue_frames`` frames drained by its own sender thread. A subscriber whose
+    queue overflows, or that cannot take a frame within ``send_timeout``, is
+    dropped; it reconnects and resyncs from the ring buffer, so a stalled
+    dashboard never holds up the generator.
+    """
+
+    def __init__(self, path=LIVE_SOCKET_PATH, send_timeout=0.5, queue_frames=LIVE_PUSH_QUEUE_FRAMES):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        try:
+            os.unlink(path)  # Left behind by a previous generator
+        except FileNotFoundError:
+            pass
+        self.path = path
+        self.send_timeout = send_timeout
+        self.queue_frames = queue_frames
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        threading.Thread(target=self._accept_loop, name='live-publisher', daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return  # Server socket closed
+            with self._lock:
+                self._subscribers.append(_Subscription(conn, self.queue_frames, self.send_timeout))
+
+    @property
+    def subscribers(self):
+        with self._lock:
+            return sum(not subscription.closed for subscription in self._subscribers)
+
+    def publish(self, epoch, first_seq, encoded):
+        """Queue records ``first_seq``.. of ring ``epoch`` for every connected subscriber."""
+        frame = FRAME_HEADER.pack(FRAME_MAGIC, LIVE_LAYOUT_CRC, epoch, first_seq, len(encoded)) + encoded.tobytes()
+        with self._lock:
+            subscribers = list(self._subscribers)
+        dropped = [subscription for subscription in subscribers if not subscription.offer(frame)]
+        if dropped:
+            with self._lock:
+                self._subscribers = [s for s in self._subscribers if s not in dropped]
+            for subscription in dropped:
+                if not subscription.closed:
+                    logger.info("Dropping a live subscriber that fell behind; it will resync from the ring")
+                subscription.close()
+
+    def close(self):
+        """Stop accepting, disconnect subscribers and remove the socket file."""
+        self._server.close()
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscription in subscribers:
+            subscription.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class LiveSubscriber:
+    """Dashboard side of the push channel: one background thread buffering the live window for a process.
+
+    Offers the same ``status()`` / ``records_since()`` interface as
+    ``RingBufferReader``. While subscribed, reads are served from the in-memory
+    window that the thread extends as frames arrive; the window is reloaded from
+    the ring on (re)connect, on a new epoch and after a gap. When the publisher
+    is unreachable, reads fall through to the ring.
+    """
+
+    def __init__(self, path=LIVE_SOCKET_PATH, ring=None, capacity=MAX_LIVE_RECORDS, retry_interval=1.0):
+        self.path = path
+        self.ring = ring if ring is not None else RingBufferReader()
+        self.capacity = capacity
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._synced = False
+        self._epoch = None
+        self._first_seq = 0
+        self._records = np.zeros(0, dtype=LIVE_RECORD_DTYPE)
+        if push_channel_supported(path):
+            threading.Thread(target=self._run, name='live-subscriber', daemon=True).start()
+
+    @property
+    def subscribed(self):
+        """True while the window is being kept current by pushed frames."""
+        return self._synced
+
+    def _run(self):
+        while True:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+                    conn.connect(self.path)
+                    self._consume(conn.makefile('rb'))
+            except OSError:
+                pass  # No publisher yet, or it went away
+            except ValueError as e:
+                logger.warning(f"Dropping live subscription: {e}")
+            with self._lock:
+                self._synced = False
+            time.sleep(self.retry_interval)
+
+    def _consume(self, stream):
+        while True:
+            header = stream.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            magic, layout_crc, epoch, first_seq, count = FRAME_HEADER.unpack(header)
+            if magic != FRAME_MAGIC or layout_crc != LIVE_LAYOUT_CRC:
+                raise ValueError("live frame has an unknown format")
+            body = stream.read(count * LIVE_RECORD_DTYPE.itemsize)
+            if len(body) < count * LIVE_RECORD_DTYPE.itemsize:
+                return
+            self._apply(epoch, first_seq, np.frombuffer(body, dtype=LIVE_RECORD_DTYPE))
+
+    def _apply(self, epoch, first_seq, records):
+        """Extend the window with a frame, reloading it from the ring when the frame does not follow on."""
+        with self._lock:
+            head = self._first_seq + len(self._records)
+            if not self._synced or epoch != self._epoch or first_seq > head:
+                ring_epoch, ring_first, ring_records = self.ring.encoded_since(0)
+                if ring_epoch == epoch:
+                    self._first_seq, self._records = ring_first, ring_records
+                else:
+                    self._first_seq, self._records = first_seq, records[:0]
+                self._epoch = epoch
+                self._synced = True
+                head = self._first_seq + len(self._records)
+
+            # Only the records beyond the current head are new
+            fresh = records[max(0, head - first_seq):]
+            if len(fresh):
+                window = np.concatenate([self._records, fresh])[-self.capacity:]
+                self._first_seq = head + len(fresh) - len(window)
+                self._records = window
+
+    def status(self):
+        """(epoch, tail, head) of the live window, or None when there is no feed."""
+        with self._lock:
+            if self._synced:
+                return self._epoch, self._first_seq, self._first_seq + len(self._records)
+        return self.ring.status()
+
+    def records_since(self, seq=0):
+        """Decoded records with sequence number >= ``seq`` in the live window, and the feed epoch."""
+        with self._lock:
+            if self._synced:
+                start = max(seq, self._first_seq)
+                return self._epoch, decode_records(self._records[start - self._first_seq:].copy(), start)
+        return self.ring.records_since(seq)
+
+
+def _segment_path(directory, first_seq, sealed):
+    """Path of the segment starting at record ``first_seq``."""
+    suffix = SEALED_SUFFIX if sealed else OPEN_SUFFIX
+    return os.path.join(directory, f"{SEGMENT_PREFIX}{first_seq:016d}{suffix}")
+
+
+def list_segments(directory=LIVE_SEGMENT_DIR):
+    """Segments in the log as (first_seq, path, is_open), oldest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+
+    segments = []
+    for name in names:
+        if not name.startswith(SEGMENT_PREFIX) or not name.endswith(SEALED_SUFFIX):
+            continue
+        is_open = name.endswith(OPEN_SUFFIX)
+        digits = name[len(SEGMENT_PREFIX):-len(OPEN_SUFFIX if is_open else SEALED_SUFFIX)]
+        if digits.isdigit():
+            segments.append((int(digits), os.path.join(directory, name), is_open))
+    return sorted(segments)
+
+
+# ============================================================================
+# WRITER
+# ============================================================================
+
+class SegmentLogWriter:
+    """Appends record batches to the segment log and keeps at least ``max_records`` of them."""
+
+    def __init__(self, directory=LIVE_SEGMENT_DIR, max_records=MAX_LIVE_RECORDS,
+                 segment_records=SEGMENT_RECORDS):
+        self.directory = directory
+        self.max_records = max_records
+        self.segment_records = segment_records
+        self.columns = None
+        self.next_seq = 0
+
+        os.makedirs(directory, exist_ok=True)
+        for _, path, _ in list_segments(directory):
+            os.remove(path)  # Each generator run starts a fresh feed
+
+        self._open_file = None
+        self._open_first = 0
+        self._open_count = 0
+        self._sealed = deque()  # (first_seq, count) of sealed segments, oldest first
+        self._lock = threading.Lock()
+        self._trim_requested = threading.Event()
+        self._closed = False
+        self._trimmer = threading.Thread(target=self._trim_loop, name='live-segment-trimmer', daemon=True)
+        self._trimmer.start()
+
+    @property
+    def retained_records(self):
+        """Records currently kept in the log (sealed plus open segment)."""
+        with self._lock:
+            return sum(count for _, count in self._sealed) + self._open_count
+
+    def append(self, records):
+        """Write a batch of records (DataFrame) to the open segment, sealing it whenever it fills up."""
+        if records.empty:
+            return
+        if self.columns is None:
+            self.columns = list(records.columns)
+        records = records.reindex(columns=self.columns)
+
+        written = 0
+        while written < len(records):
+            if self._open_file is None:
+                self._start_segment()
+            take = min(len(records) - written, self.segment_records - self._open_count)
+            self._open_file.write(records.iloc[written:written + take].to_csv(header=False, index=False))
+            self._open_file.flush()
+            written += take
+            self.next_seq += take
+            with self._lock:
+                self._open_count += take
+            if self._open_count >= self.segment_records:
+                self._seal()
+
+    def close(self):
+        """Seal the open segment and stop the trimmer."""
+        if self._open_file is not None:
+            self._seal()
+        self._closed = True
+        self._trim_requested.set()
+        self._trimmer.join(timeout=5)
+
+    def _start_segment(self):
+        self._open_first = self.next_seq
+        self._open_file = open(_segment_path(self.directory, self._open_first, sealed=False),
+                               'w', newline='', encoding='utf-8')
+        self._open_file.write(','.join(self.columns) + '\n')
+
+    def _seal(self):
+        """Publish the open segment by renaming it; readers never see a sealed segment change."""
+        self._open_file.close()
+        self._open_file = None
+        os.replace(_segment_path(self.directory, self._open_first, sealed=False),
+                   _segment_path(self.directory, self._open_first, sealed=True))
+        with self._lock:
+            self._sealed.append((self._open_first, self._open_count))
+            self._open_count = 0
+        self._trim_requested.set()
+
+    def _trim_loop(self):
+        """Delete the oldest sealed segments once the rest still cover ``max_records``."""
+        while not self._closed:
+            self._trim_requested.wait()
+            self._trim_requested.clear()
+            expired = []
+            with self._lock:
+                retained = sum(count for _, count in self._sealed) + self._open_count
+                while self._sealed and retained - self._sealed[0][1] >= self.max_records:
+                    first_seq, count = self._sealed.popleft()
+                    retained -= count
+                    expired.append(first_seq)
+            for first_seq in expired:
+                try:
+                    os.remove(_segment_path(self.directory, first_seq, sealed=True))
+                except OSError as e:
+                    logger.warning(f"Could not trim live segment {first_seq}: {e}")
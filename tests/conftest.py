@@ -0,0 +1,74 @@
+"""Shared fixtures: app.py's definitions without its Streamlit script, and a small seeded dataset."""
+
+import ast
+import io
+import os
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class _CacheDecorator:
+    """Stand-in for st.cache_data / st.cache_resource: returns the function unchanged."""
+
+    def __call__(self, *args, **kwargs):
+        if args and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+    def clear(self):
+        pass
+
+
+class _Streamlit(types.SimpleNamespace):
+    cache_data = _CacheDecorator()
+    cache_resource = _CacheDecorator()
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def load_app_definitions(path=os.path.join(ROOT, 'app.py')):
+    """Execute only the imports, constants, functions and classes of app.py (not the page script)."""
+    tree = ast.parse(open(path, encoding='utf-8').read())
+    body = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if not any(alias.name == 'streamlit' for alias in node.names):
+                body.append(node)
+        elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            body.append(node)
+        elif isinstance(node, ast.Assign) and all(isinstance(t, ast.Name) and t.id.isupper() for t in node.targets):
+            body.append(node)
+    namespace = {'st': _Streamlit(), '__file__': path, '__name__': 'app'}
+    exec(compile(ast.Module(body=body, type_ignores=[]), path, 'exec'), namespace)
+    return types.SimpleNamespace(**namespace)
+
+
+@pytest.fixture(scope='session')
+def app():
+    return load_app_definitions()
+
+
+@pytest.fixture(scope='session')
+def raw_dataset():
+    """A seeded 300 users x 60 days backfill, read back the way the dashboard reads whoop_fitness.csv."""
+    import live_data_generator as generator
+
+    gen = generator.WHOOPDataGenerator(num_users=300, seed=11, user_prefix='USER')
+    chunks = [','.join(generator.BACKFILL_COLUMNS).encode() + b'\n']
+    for unit in generator.backfill_units(300, '2023-01-20', 60):
+        chunks += generator.encode_backfill_unit(gen, unit, 'csv')[2]
+    return pd.read_csv(io.BytesIO(b''.join(chunks)))
+
+
+@pytest.fixture(scope='session')
+def dataset(app, raw_dataset):
+    """The preprocessed, compact dataset as served to every session."""
+    return app.freeze_frame(app.preprocess_data(raw_dataset.copy()))
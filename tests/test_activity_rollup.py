@@ -0,0 +1,27 @@
+"""The activity aggregation engine against pandas groupby."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope='module')
+def workouts(app, dataset):
+    rows = dataset[dataset['workout_completed'] == 1].copy()
+    rng = np.random.default_rng(9)
+    for metric in ['activity_strain', 'avg_heart_rate']:
+        rows[metric] = rows[metric].astype(np.float64).mask(rng.random(len(rows)) < 0.2)
+    return rows
+
+
+@pytest.mark.parametrize('keys', [['activity_type'], ['fitness_level', 'primary_sport', 'activity_type'],
+                                  ['gender', 'age_group', 'workout_time_of_day', 'activity_type']])
+def test_rollup_matches_groupby(app, workouts, keys):
+    metrics = ['activity_calories', 'activity_strain', 'avg_heart_rate']
+    result = app.rollup_activity(app.build_activity_aggregate(workouts), keys,
+                                 sums=metrics, means=metrics, stds=metrics)
+    grouped = workouts.groupby(keys, observed=True)[metrics]
+    expected = pd.concat([grouped.size().rename('count'), grouped.sum(),
+                          grouped.mean().add_suffix('_mean'), grouped.std().add_suffix('_std')], axis=1)
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False, check_index_type=False,
+                                  check_categorical=False, rtol=1e-6)
@@ -0,0 +1,50 @@
+"""The bitset Apriori engine against brute-force itemset counts."""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def item_masks(app, frame):
+    masks = {}
+    for group, (column, bands) in app.ASSOCIATION_ITEMS.items():
+        if bands is None:
+            labels = frame[column].astype(str).where(frame[column].notna())
+        else:
+            edges, names = bands
+            labels = pd.cut(frame[column], [-np.inf] + edges + [np.inf], right=False, labels=names).astype(str)
+        for label in labels.dropna().unique():
+            masks[(group, label)] = (labels == label).to_numpy()
+    return masks
+
+
+def test_itemset_supports_match_brute_force(app, dataset):
+    frame = dataset.iloc[:6000]
+    supports = app.mine_itemsets(app.encode_transactions(frame), len(frame), min_support=0.02, max_items=3)
+
+    masks = item_masks(app, frame)
+    expected = {}
+    for size in range(1, 4):
+        for itemset in combinations(sorted(masks), size):
+            if len({group for group, _ in itemset}) < size:
+                continue
+            support = np.logical_and.reduce([masks[item] for item in itemset]).mean()
+            if support >= 0.02:
+                expected[itemset] = support
+    assert supports.keys() == expected.keys()
+    for itemset, support in expected.items():
+        assert supports[itemset] == pytest.approx(support)
+
+
+def test_rules_follow_from_supports(app, dataset):
+    supports = app.mine_itemsets(app.encode_transactions(dataset), len(dataset))
+    rules = app.association_rules(supports)
+    assert len(rules) == sum(2 ** len(itemset) - 2 for itemset in supports)
+    assert ((rules['Confidence'] > 0) & (rules['Confidence'] <= 1 + 1e-12)).all()
+    pair = next(itemset for itemset in supports if len(itemset) == 2)
+    (a, b), both = pair, supports[pair]
+    rule = rules[rules['Rule'] == f"{a[0]}: {a[1]} → {b[0]}: {b[1]}"].iloc[0]
+    assert rule['Confidence'] == pytest.approx(both / supports[(a,)])
+    assert rule['Lift'] == pytest.approx(both / (supports[(a,)] * supports[(b,)]))
@@ -0,0 +1,42 @@
+"""Cohort retention against a pandas groupby of distinct users per (cohort, period offset)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope='module')
+def staggered(dataset):
+    """Users joining on different days, so there are several cohorts."""
+    rng = np.random.default_rng(4)
+    joined = pd.Series(pd.Timestamp('2023-01-20') + pd.to_timedelta(rng.integers(0, 50, 300), unit='D'),
+                       index=dataset['user_id'].cat.categories)
+    return dataset[dataset['date'] >= dataset['user_id'].map(joined).astype('datetime64[ns]')]
+
+
+def reference_retention(frame, granularity, max_periods):
+    if granularity == 'M':
+        period = frame['date'].dt.year * 12 + frame['date'].dt.month - 1
+        label = lambda p: f"{p // 12:04d}-{p % 12 + 1:02d}"
+    else:
+        monday = frame['date'] - pd.to_timedelta(frame['date'].dt.dayofweek, unit='D')
+        period = (monday - pd.Timestamp('1970-01-05')).dt.days // 7
+        label = lambda p: str((pd.Timestamp('1970-01-05') + pd.Timedelta(weeks=int(p))).date())
+    first = period.groupby(frame['user_id'], observed=True).transform('min')
+    offset = period - first
+    workouts = (frame['workout_completed'] == 1) & (offset < max_periods)
+    counts = (frame[workouts].groupby([first[workouts], offset[workouts]])['user_id'].nunique()
+              .unstack().reindex(columns=range(max_periods)).head(max_periods))
+    counts = counts.where(counts > 0)
+    retention = counts.div(counts[0], axis=0) * 100
+    retention.index = [label(p) for p in retention.index]
+    retention.columns = [str(c) for c in retention.columns]
+    return retention
+
+
+@pytest.mark.parametrize('granularity, max_periods', [('M', 12), ('W', 12), ('W', 4)])
+def test_retention_matches_groupby(app, staggered, granularity, max_periods):
+    result = app.cohort_retention(staggered, granularity, max_periods=max_periods)
+    expected = reference_retention(staggered, granularity, max_periods)
+    assert len(result) > 1
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_index_type=False)
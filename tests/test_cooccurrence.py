@@ -0,0 +1,19 @@
+"""Activity co-occurrence against a basket x activity crosstab."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope='module')
+def workouts(dataset):
+    return dataset[dataset['workout_completed'] == 1]
+
+
+def test_cooccurrence_matches_basket_crosstab(app, workouts):
+    result = app.activity_cooccurrence(workouts, basket_columns=('user_id', 'week'))
+    incidence = pd.crosstab([workouts['user_id'], workouts['week']], workouts['activity_type']).clip(upper=1)
+    expected = (incidence.T @ incidence).astype(float)
+    expected = expected.loc[result.index, result.columns]
+    assert list(result.index) == list(pd.unique(workouts['activity_type']))
+    np.testing.assert_array_equal(result.to_numpy(), expected.to_numpy())
@@ -0,0 +1,60 @@
+"""CorrelationAccumulator and DailyCorrelationPartitions against DataFrame.corr."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope='module')
+def sparse(app, dataset):
+    """The dataset's correlation columns with values knocked out independently per column."""
+    rng = np.random.default_rng(3)
+    frame = dataset[['date'] + app.CORRELATION_COLUMNS].copy()
+    for column in app.CORRELATION_COLUMNS:
+        frame[column] = frame[column].astype(np.float64).mask(rng.random(len(frame)) < 0.1)
+    return frame
+
+
+def test_from_values_matches_pairwise_corr(app, sparse):
+    columns = app.CORRELATION_COLUMNS
+    acc = app.CorrelationAccumulator.from_values(columns, sparse[columns])
+    pd.testing.assert_frame_equal(acc.corr(), sparse[columns].corr(), atol=1e-10)
+
+
+def test_daily_partitions_between_matches_the_date_slice(app, sparse):
+    columns = app.CORRELATION_COLUMNS
+    partitions = app.DailyCorrelationPartitions(sparse)
+    start, end = pd.Timestamp('2023-02-03'), pd.Timestamp('2023-03-01')
+    expected = sparse.loc[sparse['date'].between(start, end), columns].corr()
+    pd.testing.assert_frame_equal(partitions.between(start, end).corr(), expected, atol=1e-10)
+
+
+def test_sliding_window_update_and_remove(app, sparse):
+    columns = app.CORRELATION_COLUMNS
+    values = sparse[columns]
+    acc = app.CorrelationAccumulator.from_values(columns, values.iloc[:500])
+    for start in range(100, 1000, 100):
+        acc.update(values.iloc[start + 400:start + 500]).remove(values.iloc[start - 100:start])
+        pd.testing.assert_frame_equal(acc.corr(), values.iloc[start:start + 500].corr(), atol=1e-9)
+    acc.remove(values.iloc[900:1400])
+    assert not acc.n.any()
+
+
+def test_merge_matches_concatenation(app, sparse):
+    columns = app.CORRELATION_COLUMNS
+    left, right = sparse[columns].iloc[:3000], sparse[columns].iloc[3000:]
+    merged = app.CorrelationAccumulator.from_values(columns, left).copy().merge(
+        app.CorrelationAccumulator.from_values(columns, right))
+    pd.testing.assert_frame_equal(merged.corr(), sparse[columns].corr(), atol=1e-10)
+
+
+def test_from_ranks_matches_pairwise_spearman(app, sparse):
+    columns = app.CORRELATION_COLUMNS
+    acc = app.CorrelationAccumulator.from_ranks(columns, sparse[columns])
+    pd.testing.assert_frame_equal(acc.corr(), sparse[columns].corr(method='spearman'), atol=1e-10)
+
+
+def test_from_ranks_without_gaps(app, dataset):
+    columns = app.CORRELATION_COLUMNS
+    acc = app.CorrelationAccumulator.from_ranks(columns, dataset[columns])
+    pd.testing.assert_frame_equal(acc.corr(), dataset[columns].astype(np.float64).corr(method='spearman'), atol=1e-10)
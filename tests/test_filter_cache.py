@@ -0,0 +1,36 @@
+"""FilterResultCache: a memory-bounded LRU shared by all sessions."""
+
+import numpy as np
+
+
+def test_hits_misses_and_recency(app):
+    cache = app.FilterResultCache(max_bytes=3 * 800)
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        return np.zeros(100)  # 800 bytes
+
+    for key in ['a', 'b', 'c', 'a', 'd']:  # 'a' is refreshed, so 'b' is the least recently used when 'd' arrives
+        cache.get_or_compute(key, lambda key=key: compute(key))
+    assert calls == ['a', 'b', 'c', 'd']
+    assert cache.stats() == {'hits': 1, 'misses': 4, 'hit_rate': 0.2, 'entries': 3, 'bytes': 2400}
+
+    cache.get_or_compute('b', lambda: compute('b'))
+    cache.get_or_compute('a', lambda: compute('a'))
+    assert calls == ['a', 'b', 'c', 'd', 'b']
+
+
+def test_values_larger_than_the_budget_are_returned_but_not_kept(app):
+    cache = app.FilterResultCache(max_bytes=1000)
+    value = cache.get_or_compute('big', lambda: np.zeros(1000))
+    assert len(value) == 1000
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
+
+
+def test_filter_key_is_canonical(app):
+    first = app.make_filter_key(('2023-01-01', '2023-02-01'), {'gender': ['Male', 'Female'], 'season': ['Winter']},
+                                {'recovery_score': (0, 100)})
+    second = app.make_filter_key(('2023-01-01', '2023-02-01'), {'season': ['Winter'], 'gender': ['Female', 'Male']},
+                                 {'recovery_score': (0.0, 100.0)})
+    assert first == second and hash(first) == hash(second)
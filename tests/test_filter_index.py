@@ -0,0 +1,56 @@
+"""FilterIndex against the equivalent pandas boolean masks."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def reference_rows(frame, date_range, categories, ranges):
+    dates = frame['date'].dt.normalize()
+    mask = (dates >= pd.Timestamp(date_range[0])) & (dates <= pd.Timestamp(date_range[1]))
+    for column, selected in categories.items():
+        mask &= frame[column].isin(selected)
+    for column, (low, high) in ranges.items():
+        mask &= (frame[column] >= low) & (frame[column] <= high)
+    return np.flatnonzero(mask.to_numpy())
+
+
+@pytest.mark.parametrize('date_range, categories, ranges', [
+    (('2023-01-20', '2023-03-20'), {}, {}),
+    (('2023-02-01', '2023-02-10'), {'gender': ['Female']}, {}),
+    (('2023-01-25', '2023-03-01'), {'fitness_level': ['Elite', 'Beginner'], 'activity_type': ['Rest Day', 'Yoga']}, {}),
+    (('2023-01-20', '2023-03-20'), {}, {'recovery_score': (60, 75)}),
+    (('2023-02-01', '2023-03-01'), {'season': ['Winter']}, {'recovery_score': (0, 100), 'day_strain': (5.5, 12.25)}),
+    (('2023-01-20', '2023-03-20'), {}, {'day_strain': (20.9, 21.0)}),  # Narrow range: scatter path
+    (('2023-03-21', '2023-04-01'), {}, {}),  # Outside the data
+])
+def test_select_matches_boolean_mask(app, dataset, date_range, categories, ranges):
+    index = app.FilterIndex(dataset)
+    rows = index.select(date_range, categories=categories, ranges=ranges)
+    np.testing.assert_array_equal(rows, reference_rows(dataset, date_range, categories, ranges))
+
+
+def test_bounds_equal_to_stored_values_are_inclusive(app, dataset):
+    index = app.FilterIndex(dataset)
+    value = float(dataset['day_strain'].iloc[123])
+    rows = index.select(('2023-01-20', '2023-03-20'), ranges={'day_strain': (value, value)})
+    assert 123 in rows
+    np.testing.assert_array_equal(rows, np.flatnonzero(dataset['day_strain'].to_numpy() == value))
+
+
+def test_float32_bounds_use_the_column_precision(app):
+    frame = pd.DataFrame({'date': pd.to_datetime(['2023-01-01'] * 3),
+                          'score': np.array([54.1, 54.2, 60.0], dtype=np.float32)})
+    index = app.FilterIndex(frame, category_columns=[], range_columns=['score'])
+    # float32(54.1) < 54.1, but a slider bound of 54.1 still selects the stored 54.1
+    np.testing.assert_array_equal(index.select(('2023-01-01', '2023-01-01'), ranges={'score': (54.1, 54.15)}), [0])
+    np.testing.assert_array_equal(index.select(('2023-01-01', '2023-01-01'), ranges={'score': (54.1, 59.0)}), [0, 1])
+
+
+def test_refine_matches_boolean_mask(app, dataset):
+    index = app.FilterIndex(dataset)
+    rows = index.select(('2023-02-01', '2023-03-01'))
+    refined = index.refine(rows, categories={'activity_type': ['Running', 'Cycling']}, workouts_only=True)
+    subset = dataset.iloc[rows]
+    expected = rows[((subset['workout_completed'] == 1) & subset['activity_type'].isin(['Running', 'Cycling'])).to_numpy()]
+    np.testing.assert_array_equal(refined, expected)
@@ -0,0 +1,88 @@
+"""Tests for the synthetic data generator: CLI, vectorized records, backfill and scheduler."""
+
+import asyncio
+import logging
+
+import pandas as pd
+import pytest
+
+import live_data_generator as generator
+
+
+def test_seed_is_parsed_before_or_after_the_command():
+    assert generator.parse_args(['--seed', '7', 'backfill']).seed == 7
+    assert generator.parse_args(['--seed', '7', 'live']).seed == 7
+    assert generator.parse_args(['live', '--seed', '7']).seed == 7
+    assert generator.parse_args(['backfill', '--seed', '8']).seed == 8
+    assert generator.parse_args(['backfill']).seed is None
+    assert generator.parse_args([]).seed is None
+
+
+def test_scheduler_carries_fractional_records():
+    scheduler = generator.LiveScheduler(lambda count: count, rate=3.5, interval=1.0, report_interval=0)
+    assert [scheduler.batch_size(1.0) for _ in range(4)] == [3, 4, 3, 4]
+    assert sum(scheduler.batch_size(0.25) for _ in range(40)) == 35
+
+
+def test_scheduler_caps_the_backlog_and_reports_dropped_records(caplog):
+    scheduler = generator.LiveScheduler(lambda count: count, rate=10.0, interval=1.0, report_interval=0, max_backlog=3)
+    assert scheduler.batch_size(100.0) == 30
+    assert scheduler.batch_size(1.0) == 10
+    with caplog.at_level(logging.INFO, logger=generator.logger.name):
+        scheduler.report(101.0)
+    assert caplog.records[-1].levelno == logging.WARNING
+    assert "970 records dropped" in caplog.text
+
+
+def test_scheduler_counts_failed_batches(caplog):
+    emitted = []
+
+    def emit(count):
+        if len(emitted) % 2:
+            emitted.append(None)
+            raise OSError("disk full")
+        emitted.append(count)
+        return count
+
+    scheduler = generator.LiveScheduler(emit, rate=1000.0, interval=0.01, report_interval=0)
+    asyncio.run(scheduler.run(ticks=6))
+    failed = scheduler._failed
+    assert failed > 0 and scheduler._records == sum(c for c in emitted if c)
+    with caplog.at_level(logging.INFO, logger=generator.logger.name):
+        scheduler.report(0.06)
+    assert f"{failed:,} failed" in caplog.text
+
+
+def test_append_live_data_raises_instead_of_losing_the_batch():
+    class FullRing:
+        def append(self, records):
+            raise OSError("no space left on device")
+
+    with pytest.raises(OSError):
+        generator.append_live_data(generator.WHOOPDataGenerator(num_users=10, seed=1), FullRing(), num_records=5)
+
+
+def test_backfill_writes_every_user_day_in_the_dataset_layout(tmp_path):
+    output = tmp_path / 'history'
+    rows = generator.run_backfill(1200, 45, '2024-01-20', str(output), fmt='parquet', partition_by_month=True,
+                                  seed=3, batch_users=1000)
+    assert rows == 1200 * 45
+    assert sorted(p.name for p in output.iterdir()) == ['month=2024-01', 'month=2024-02', 'month=2024-03']
+    history = pd.concat(pd.read_parquet(path) for path in sorted(output.glob('month=*/part-00000.parquet')))
+    assert list(history.columns) == generator.BACKFILL_COLUMNS
+    assert len(history.drop_duplicates(['user_id', 'date'])) == rows
+    assert history['user_id'].nunique() == 1200
+    assert str(history['date'].min())[:10] == '2024-01-20' and str(history['date'].max())[:10] == '2024-03-04'
+
+
+def test_seeded_backfill_is_byte_identical_across_workers_and_batch_sizes(tmp_path):
+    outputs = []
+    for workers, batch_users in [(1, 1000), (2, 1000), (2, 3000)]:
+        path = tmp_path / f'history-{workers}-{batch_users}.csv'
+        generator.run_backfill(2500, 40, '2024-01-20', str(path), seed=17, workers=workers, batch_users=batch_users)
+        outputs.append(path.read_bytes())
+    assert outputs[0] == outputs[1] == outputs[2]
+
+    other_seed = tmp_path / 'other-seed.csv'
+    generator.run_backfill(2500, 40, '2024-01-20', str(other_seed), seed=18)
+    assert other_seed.read_bytes() != outputs[0]
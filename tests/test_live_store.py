@@ -0,0 +1,73 @@
+"""Live ring buffer: record encoding and the writer/reader pair."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import live_store
+from live_data_generator import WHOOPDataGenerator
+
+
+@pytest.fixture
+def batch():
+    return WHOOPDataGenerator(num_users=50, seed=5).generate_batch(40)
+
+
+def assert_same_records(decoded, records):
+    decoded = decoded.reset_index(drop=True)[list(records.columns)]
+    expected = records.reset_index(drop=True).copy()
+    for name, dtype in live_store.LIVE_RECORD_DTYPE.fields.items():
+        if name in expected and dtype[0].kind == 'f':
+            expected[name] = expected[name].astype(dtype[0])
+    expected['date'] = pd.to_datetime(expected['date']).dt.normalize()
+    pd.testing.assert_frame_equal(decoded, expected, check_dtype=False, check_categorical=False)
+
+
+def test_encode_decode_round_trip(batch):
+    decoded = live_store.decode_records(live_store.encode_records(batch), first_seq=7)
+    assert list(decoded.index) == list(range(7, 7 + len(batch)))
+    assert_same_records(decoded, batch)
+
+
+def test_reader_sees_appended_records_and_wraps(tmp_path, batch):
+    path = str(tmp_path / 'ring.bin')
+    writer = live_store.RingBufferWriter(path, capacity=64)
+    reader = live_store.RingBufferReader(path)
+    try:
+        writer.append(batch)
+        epoch, records = reader.records_since(0)
+        assert epoch == writer.epoch
+        assert_same_records(records, batch)
+
+        # Past capacity only the newest 64 records remain, still in sequence order
+        writer.append(batch)
+        assert reader.status() == (writer.epoch, 16, 80)
+        _, records = reader.records_since(0)
+        assert list(records.index) == list(range(16, 80))
+        assert_same_records(records, pd.concat([batch, batch]).iloc[16:])
+
+        _, newest = reader.records_since(75)
+        assert list(newest.index) == list(range(75, 80))
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_reader_remaps_a_replaced_ring_and_closes_the_old_mapping(tmp_path, batch):
+    path = str(tmp_path / 'ring.bin')
+    first = live_store.RingBufferWriter(path, capacity=64)
+    first.append(batch)
+    reader = live_store.RingBufferReader(path)
+    assert reader.status()[2] == len(batch)
+    old_map = reader._map
+    first.close()
+
+    second = live_store.RingBufferWriter(path, capacity=64)
+    try:
+        epoch, records = reader.records_since(0)
+        assert epoch == second.epoch and records.empty
+        assert old_map.closed
+    finally:
+        reader.close()
+        second.close()
+    assert reader._map is None
@@ -0,0 +1,53 @@
+"""MetricCube and the KPI path against pandas over the matching rows."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DATE_RANGE = ('2023-02-01', '2023-03-10')
+SELECTIONS = {'gender': ['Male', 'Other'], 'fitness_level': ['Intermediate', 'Advanced', 'Elite']}
+
+
+@pytest.fixture(scope='module')
+def cube(app, dataset):
+    return app.MetricCube(dataset)
+
+
+@pytest.fixture(scope='module')
+def matching(dataset):
+    mask = dataset['date'].between(*map(pd.Timestamp, DATE_RANGE))
+    for column, values in SELECTIONS.items():
+        mask &= dataset[column].isin(values)
+    return dataset[mask]
+
+
+def test_totals_match_row_means(app, cube, matching):
+    totals = app.MetricCube.totals(app.select_rows(cube.cells, cube.select(DATE_RANGE, SELECTIONS)))
+    assert totals['count'] == len(matching)
+    for metric in app.CUBE_METRICS:
+        assert totals[metric] == pytest.approx(matching[metric].astype(np.float64).mean(), rel=1e-9)
+
+
+@pytest.mark.parametrize('keys', [['week'], ['month_name', 'day_of_week'], ['fitness_level', 'season']])
+def test_grouped_means_match_groupby(app, cube, matching, keys):
+    metrics = ['recovery_score', 'day_strain', 'hrv']
+    result = app.MetricCube.means(app.select_rows(cube.cells, cube.select(DATE_RANGE, SELECTIONS)), keys, metrics)
+    frame = matching.assign(week=matching['date'].dt.isocalendar().week.astype('int8'),
+                            month_name=matching['date'].dt.month_name(),
+                            day_of_week=matching['date'].dt.day_name())
+    expected = frame.groupby(keys, observed=True)[metrics].mean()
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_index_type=False,
+                                  check_categorical=False, rtol=1e-9)
+
+
+def test_filter_result_kpis_match_pandas(app, dataset, cube, matching):
+    activities = list(dataset['activity_type'].cat.categories)
+    result = app.compute_filter_result(dataset, app.FilterIndex(dataset), cube, DATE_RANGE, SELECTIONS, activities, {})
+    assert result['cube_rows'] is not None
+    kpis = result['kpis']
+    assert kpis['records'] == len(matching)
+    assert kpis['workouts'] == int(matching['workout_completed'].sum())
+    assert kpis['users'] == matching['user_id'].nunique()
+    assert kpis['workout_rate'] == pytest.approx(matching['workout_completed'].mean() * 100, rel=1e-9)
+    for column in app.KPI_COLUMNS:
+        assert kpis[column] == pytest.approx(matching[column].astype(np.float64).mean(), rel=1e-9)
@@ -0,0 +1,106 @@
+"""Push channel: a subscriber's window tracks the ring through publishes, late joins and generator restarts."""
+
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import live_store
+import live_data_generator as generator
+
+pytestmark = pytest.mark.skipif(not live_store.push_channel_supported('live.sock'),
+                                reason="needs Unix domain sockets")
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def paths():
+    # Unix socket paths are limited to ~100 bytes, so avoid pytest's long tmp_path
+    directory = tempfile.mkdtemp(prefix='whoop-')
+    yield f'{directory}/ring.bin', f'{directory}/live.sock'
+    shutil.rmtree(directory)
+
+
+def start_generator(ring_path, socket_path, seed):
+    ring = live_store.RingBufferWriter(ring_path, capacity=64)
+    return generator.WHOOPDataGenerator(num_users=30, seed=seed), ring, live_store.LivePublisher(socket_path)
+
+
+def test_subscriber_window_matches_the_ring(paths):
+    ring_path, socket_path = paths
+    gen, ring, publisher = start_generator(ring_path, socket_path, seed=1)
+    reader = live_store.RingBufferReader(ring_path)
+    try:
+        generator.append_live_data(gen, ring, publisher=publisher, num_records=20)  # Before anyone subscribes
+        subscriber = live_store.LiveSubscriber(socket_path, live_store.RingBufferReader(ring_path),
+                                               capacity=64, retry_interval=0.1)
+        wait_for(lambda: publisher.subscribers == 1)
+        for count in [5, 30, 1, 40]:
+            generator.append_live_data(gen, ring, publisher=publisher, num_records=count)
+        wait_for(lambda: subscriber.subscribed and subscriber.status() == reader.status())
+        assert subscriber.status() == (ring.epoch, 32, 96)
+
+        epoch, window = subscriber.records_since(50)
+        expected_epoch, expected = reader.records_since(50)
+        assert epoch == expected_epoch
+        pd.testing.assert_frame_equal(window, expected)
+
+        # A restarted generator starts a new epoch; the subscriber reconnects and drops the old window
+        publisher.close()
+        ring.close()
+        gen, ring, publisher = start_generator(ring_path, socket_path, seed=2)
+        wait_for(lambda: publisher.subscribers == 1)
+        generator.append_live_data(gen, ring, publisher=publisher, num_records=3)
+        wait_for(lambda: subscriber.status() == (ring.epoch, 0, 3))
+        pd.testing.assert_frame_equal(subscriber.records_since(0)[1], reader.records_since(0)[1])
+    finally:
+        publisher.close()
+        reader.close()
+        ring.close()
+
+
+def test_a_subscriber_that_never_reads_cannot_hold_up_publish(paths):
+    _, socket_path = paths
+    publisher = live_store.LivePublisher(socket_path, send_timeout=5.0, queue_frames=4)
+    stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    healthy = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    received = []
+    try:
+        stalled.connect(socket_path)
+        healthy.connect(socket_path)
+        wait_for(lambda: publisher.subscribers == 2)
+
+        def drain():
+            while chunk := healthy.recv(1 << 16):
+                received.append(len(chunk))
+
+        reader = threading.Thread(target=drain, daemon=True)
+        reader.start()
+
+        # Far more than the stalled socket's kernel buffer plus its 4 queued frames
+        records = np.zeros(500, dtype=live_store.LIVE_RECORD_DTYPE)
+        frame_size = live_store.FRAME_HEADER.size + records.nbytes
+        slowest = 0.0
+        for seq in range(0, 100 * 500, 500):
+            started = time.perf_counter()
+            publisher.publish(1, seq, records)
+            slowest = max(slowest, time.perf_counter() - started)
+            time.sleep(0.001)
+        assert slowest < 0.05
+        assert publisher.subscribers == 1  # The stalled subscriber was dropped, the healthy one kept
+        wait_for(lambda: sum(received) == 100 * frame_size)
+    finally:
+        publisher.close()
+        stalled.close()
+        healthy.close()
@@ -0,0 +1,43 @@
+"""RFMModelPool: background k sweeps, and eviction while a session waits on a fit."""
+
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def fits(app, monkeypatch):
+    """Replaces the k-means fit with one that records its calls and blocks until released."""
+    release, calls = threading.Event(), []
+
+    def fake_fit(features, k):
+        calls.append((features, k))
+        release.wait(5)
+        return (features, k)
+
+    monkeypatch.setitem(app.RFMModelPool.submit.__globals__, 'fit_rfm_model', fake_fit)
+    return release, calls
+
+
+def test_eviction_keeps_a_fit_someone_is_waiting_on(app, fits):
+    release, calls = fits
+    pool = app.RFMModelPool(max_workers=1, max_filters=1)
+    first_k = app.RFM_K_RANGE[-1]
+    result = {}
+    waiter = threading.Thread(target=lambda: result.update(model=pool.get('a', 'features-a', first_k)))
+    waiter.start()
+    while not calls:
+        time.sleep(0.001)
+
+    pool.submit('b', 'features-b')  # Evicts 'a' while its first fit is still running
+    release.set()
+    waiter.join(5)
+    assert result['model'] == ('features-a', first_k)
+    assert pool.sweep('a') == {}
+
+    pool.get('b', 'features-b', app.RFM_K_RANGE[0])
+    pool._executor.shutdown(wait=True)
+    # Only the claimed fit of the evicted filter ran; its queued ones were cancelled
+    assert [features for features, _ in calls].count('features-a') == 1
+    assert sorted(pool.sweep('b')) == list(app.RFM_K_RANGE)
@@ -0,0 +1,54 @@
+"""Segment log writer: appends across segment boundaries, sealing and trimming."""
+
+import io
+import time
+
+import pandas as pd
+
+import live_store
+from live_data_generator import WHOOPDataGenerator
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def segments(directory):
+    return [(first, is_open) for first, _, is_open in live_store.list_segments(directory)]
+
+
+def test_appends_rotate_into_sealed_segments_and_old_ones_are_trimmed(tmp_path):
+    directory = str(tmp_path / 'segments')
+    batches = [WHOOPDataGenerator(num_users=20, seed=seed).generate_batch(7) for seed in range(10)]
+    writer = live_store.SegmentLogWriter(directory, max_records=30, segment_records=8)
+    try:
+        for batch in batches:
+            writer.append(batch)
+        # Once a segment is sealed, the oldest sealed segments the rest can spare are trimmed in the background
+        wait_for(lambda: segments(directory) == [(32, False), (40, False), (48, False), (56, False), (64, True)])
+        assert writer.retained_records == 38 and writer.next_seq == 70
+    finally:
+        writer.close()
+    # Closing seals the open segment (which may trim one more); sealed segments are headed CSV in sequence order
+    remaining = live_store.list_segments(directory)
+    assert not any(is_open for _, _, is_open in remaining) and remaining[-1][0] == 64
+    expected = pd.read_csv(io.StringIO(pd.concat(batches).to_csv(index=False)))
+    stored = pd.concat(pd.read_csv(path) for _, path, _ in remaining)
+    pd.testing.assert_frame_equal(stored.reset_index(drop=True), expected.iloc[remaining[0][0]:].reset_index(drop=True))
+
+
+def test_a_new_writer_starts_a_fresh_log(tmp_path):
+    directory = str(tmp_path / 'segments')
+    writer = live_store.SegmentLogWriter(directory, max_records=100, segment_records=4)
+    writer.append(WHOOPDataGenerator(num_users=20, seed=1).generate_batch(10))
+    writer.close()
+    assert len(segments(directory)) == 3
+
+    writer = live_store.SegmentLogWriter(directory, max_records=100, segment_records=4)
+    try:
+        assert segments(directory) == [] and writer.retained_records == 0
+    finally:
+        writer.close()
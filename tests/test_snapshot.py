@@ -0,0 +1,30 @@
+"""Arrow snapshots of the preprocessed dataset are only reused for the CSV they were built from."""
+
+import os
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def source(app, raw_dataset, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.save_snapshot.__globals__, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    path = tmp_path / 'whoop_fitness.csv'
+    raw_dataset.iloc[:500].to_csv(path, index=False)
+    return str(path)
+
+
+def test_snapshot_round_trip(app, source):
+    fingerprint = app.file_fingerprint(source)
+    df = app.preprocess_data(pd.read_csv(source))
+    app.save_snapshot(df, source, fingerprint)
+    pd.testing.assert_frame_equal(app.load_snapshot(source), df)
+
+
+def test_csv_replaced_during_the_read_is_not_snapshotted(app, raw_dataset, source):
+    fingerprint = app.file_fingerprint(source)
+    df = app.preprocess_data(pd.read_csv(source))
+    raw_dataset.iloc[500:900].to_csv(source, index=False)  # Replaced while the old file was being parsed
+    os.utime(source, ns=(fingerprint['mtime_ns'] + 10**9, fingerprint['mtime_ns'] + 10**9))
+    app.save_snapshot(df, source, fingerprint)
+    assert app.load_snapshot(source) is None
@@ -0,0 +1,16 @@
+"""TopKIndex against nlargest over the same rows."""
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('column', ['recovery_score', 'hrv', 'activity_calories'])
+@pytest.mark.parametrize('k', [1, 50, 5000])
+def test_top_matches_nlargest(app, dataset, column, k):
+    index = app.TopKIndex(dataset)
+    rng = np.random.default_rng(k)
+    contiguous = np.arange(2000, 9000)
+    scattered = np.sort(rng.choice(len(dataset), 3000, replace=False))
+    for rows in (contiguous, scattered, np.arange(0)):
+        expected = dataset[column].iloc[rows].nlargest(k, keep='first').index.to_numpy()
+        np.testing.assert_array_equal(index.top(column, rows, k), expected)